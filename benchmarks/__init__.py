@@ -0,0 +1,5 @@
+"""Generator data sintetis & benchmark untuk pipeline pendapatan.
+
+Jalankan dari akar repositori, mis.:
+    python -m benchmarks.bench_income --scales 10k 100k 1m
+"""
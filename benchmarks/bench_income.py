@@ -0,0 +1,212 @@
+"""Benchmark per tahap untuk pipeline pendapatan.
+
+Contoh:
+    python -m benchmarks.bench_income --scales 10k 100k 1m
+    python -m benchmarks.bench_income --scales 10m --no-read
+
+Setiap tahap (baca Excel, merge, alokasi, groupby, biaya, agregat, ekspor Excel) diukur
+waktu dan puncak memorinya (tracemalloc). Hasil ditambahkan ke file riwayat
+JSON dan dibandingkan dengan run sebelumnya pada skala yang sama.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_exports, write_exports
+from excel_reader import read_income_excel, read_orders_excel
+from excel_writer import EXCEL_MAX_ROWS
+from income_core import IncomeApp
+from memory_utils import optimize_dtypes
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), 'results', 'history.json')
+STAGES = ['read', 'merge', 'reconcile', 'allocate', 'cost', 'cube', 'groupby', 'aggregates', 'export']
+
+
+def parse_scale(text):
+    """'10k' -> 10000, '2.5m' -> 2500000"""
+    text = text.strip().lower().replace('_', '')
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+def measure(fn, *args, **kwargs):
+    """Menjalankan fn, mengembalikan (hasil, detik, puncak memori MB)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def run_scale(n_lines, seed=42, include_read=True, include_raw_data=False, workdir=None):
+    """Menjalankan semua tahap untuk satu skala, mengembalikan {tahap: metrik}"""
+    app = IncomeApp()
+    orders, income, cost_data = generate_exports(n_lines, seed=seed)
+    results = {}
+
+    def record(stage, seconds, peak_mb, rows_in, rows_out):
+        results[stage] = {
+            'seconds': round(seconds, 4),
+            'peak_mb': round(peak_mb, 2),
+            'rows_in': int(rows_in),
+            'rows_out': int(rows_out)
+        }
+
+    if include_read and n_lines < EXCEL_MAX_ROWS - 1:
+        with tempfile.TemporaryDirectory(dir=workdir) as folder:
+            orders_path, income_path = write_exports(orders, income, folder)
+
+            def read_both():
+                with open(orders_path, 'rb') as f:
+                    read_orders = read_orders_excel(f.read())
+                with open(income_path, 'rb') as f:
+                    read_income = read_income_excel(f.read())
+                return read_orders, read_income
+
+            (orders, income), seconds, peak = measure(read_both)
+            record('read', seconds, peak, n_lines + len(income), len(orders) + len(income))
+
+    if 'read' not in results:
+        # Tanpa tahap baca: samakan tipe data dengan hasil pembaca Excel
+        orders, income = optimize_dtypes(orders), optimize_dtypes(income)
+
+    merged, seconds, peak = measure(app.merge_orders_income, orders, income)
+    record('merge', seconds, peak, len(orders) + len(income), len(merged))
+
+    settlements = app.aggregate_settlements(income)
+    reconciliation, seconds, peak = measure(app.reconcile, orders, settlements)
+    record('reconcile', seconds, peak, len(orders) + len(settlements),
+           sum(len(reconciliation[name]) for name in ('matched', 'order_only', 'settlement_only')))
+
+    merged, seconds, peak = measure(app.allocate_revenue, merged)
+    record('allocate', seconds, peak, len(merged), len(merged))
+
+    merged = app.add_order_times(merged)
+    merged, seconds, peak = measure(app.resolve_line_costs, merged, cost_data)
+    record('cost', seconds, peak, len(merged), len(merged))
+
+    cube, seconds, peak = measure(app.build_cube, merged)
+    record('cube', seconds, peak, len(merged), cube.lines.size)
+
+    summary, seconds, peak = measure(app.summarize_products, merged, cube)
+    record('groupby', seconds, peak, len(merged), len(summary))
+    summary = app.apply_costs(summary)
+
+    aggregates, seconds, peak = measure(app.build_aggregates, merged, summary, cube)
+    record('aggregates', seconds, peak, len(merged), len(aggregates['orders']))
+    aggregates.update(reconciliation)
+
+    def export():
+        report = app.create_excel_report(merged, summary, cost_data, aggregates,
+                                         include_raw_data=include_raw_data)
+        report.seek(0, os.SEEK_END)
+        size = report.tell()
+        report.close()
+        return size
+
+    _, seconds, peak = measure(export)
+    record('export', seconds, peak, len(merged) if include_raw_data else len(summary), len(summary))
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+
+
+def previous_result(history, scale):
+    """Hasil terakhir untuk skala yang sama di riwayat, atau None"""
+    for run in reversed(history):
+        if str(scale) in run.get('scales', {}):
+            return run['scales'][str(scale)], run.get('commit')
+    return None, None
+
+
+def format_report(scale, results, previous, previous_commit):
+    rows = []
+    for stage in STAGES:
+        if stage not in results:
+            continue
+        metrics = results[stage]
+        row = {
+            'Tahap': stage,
+            'Detik': metrics['seconds'],
+            'Puncak MB': metrics['peak_mb'],
+            'Baris Masuk': metrics['rows_in'],
+            'Baris Keluar': metrics['rows_out']
+        }
+        if previous and stage in previous and previous[stage]['seconds'] > 0:
+            row[f"vs {previous_commit or 'sebelumnya'}"] = f"{metrics['seconds'] / previous[stage]['seconds']:.2f}x"
+        rows.append(row)
+    return f"\n== {scale:,} baris ==\n" + pd.DataFrame(rows).to_string(index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline pendapatan dengan data sintetis")
+    parser.add_argument("--scales", nargs="+", default=['10k', '100k'],
+                        help="Jumlah baris pesanan, mis. 10k 100k 1m 10m (default: 10k 100k)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-read", action="store_true", help="Lewati tahap baca Excel")
+    parser.add_argument("--raw", action="store_true", help="Sertakan lembar Data Mentah saat ekspor")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="File riwayat JSON")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'scales': {}
+    }
+
+    for text in args.scales:
+        scale = parse_scale(text)
+        results = run_scale(scale, seed=args.seed, include_read=not args.no_read,
+                            include_raw_data=args.raw)
+        previous, previous_commit = previous_result(history, scale)
+        print(format_report(scale, results, previous, previous_commit))
+        run['scales'][str(scale)] = results
+
+    history.append(run)
+    save_history(args.history, history)
+    print(f"\n📝 Riwayat disimpan: {args.history}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
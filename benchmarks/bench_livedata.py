@@ -0,0 +1,205 @@
+"""Equivalence check & benchmark for the livedata column parsers.
+
+Example:
+    python -m benchmarks.bench_livedata --rows 100k 500k
+
+Each run first compares the vectorized parsers with the scalar reference
+functions on a golden set of awkward cells, then on synthetic live-session
+columns of the requested sizes, and reports the speedup per parser.
+Exits with status 1 if any value differs.
+"""
+import argparse
+import sys
+import time
+from datetime import time as dtime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import livedata_parsing
+from benchmarks.bench_income import parse_scale
+from livedata_parsing import (
+    NUMERIC_COLUMNS, PERCENTAGE_COLUMNS, duration_column, numeric_column, parse_duration,
+    parse_live_columns, parse_percentage, percentage_column, safe_numeric_conversion
+)
+
+GOLDEN_NUMERIC = [
+    None, np.nan, pd.NA, pd.NaT, '', ' ', '-', '--', '- ', 0, 12, -7, 1.5, -0.0, 1e17, 2.5e-7, np.inf,
+    True, False, '1234', '1.234', '1,5', 'Rp 1.234.567', 'Rp1,234,567', '12.5K', '1-2', '-5', '5-',
+    '.5', '5.', '.', '1.2.3', '  42  ', 'abc', '१२३', '١٢,٥', 'IDR -1.000,50', '3e5', 'nan', 'inf',
+    '12\xa0500', 'Rp\u202f9.999', '99999999999999999999999', dtime(1, 30), timedelta(minutes=95),
+    pd.Timestamp('2024-07-01 10:00')
+]
+GOLDEN_DURATION = [
+    None, np.nan, '', '-', ' ', '1h 30m', '1H30M', '2 h', '45m', '45 min', '0h 0m', '0h 30s', '1:30:00',
+    '01:05', '90', 90, 90.5, '1 jam 30 menit', '2h 15min 10s', 'abc', '12 hours 5 minutes', '0', '00:00',
+    'h1 m2', '3h', '١٢m', '1\xa0h 5\u2003m', '99999999999999999999h', '1h 999999999999999m',
+    '1h 9999999999999999m',
+    dtime(1, 30), timedelta(minutes=95), True
+]
+GOLDEN_PERCENTAGE = [
+    None, np.nan, '', '-', ' ', '12%', '12,5%', ' 7.25 % ', '0.125', 0.125, 3, -1.5, '1e-3', '1_000',
+    'inf', '-Infinity', 'nan', 'abc', '%', '1,000.5', '+4', '.5%', '5.%', '12\xa0%', '\x1c5%', '1e400',
+    '١٢%', True, np.inf, pd.NA
+]
+
+PARSERS = {
+    'numeric': (safe_numeric_conversion, numeric_column),
+    'duration': (parse_duration, duration_column),
+    'percentage': (parse_percentage, percentage_column)
+}
+
+
+def compare(name, series):
+    """Returns the number of cells where the vectorized parser differs from the scalar one"""
+    scalar, vectorized = PARSERS[name]
+    expected = series.apply(scalar).astype('float64').to_numpy()
+    actual = vectorized(series).astype('float64').to_numpy()
+    same = (expected == actual) | (np.isnan(expected) & np.isnan(actual))
+    for idx in np.flatnonzero(~same)[:10]:
+        print(f"  ✗ {name}: {series.iloc[idx]!r} -> scalar {expected[idx]!r}, vectorized {actual[idx]!r}")
+    return int((~same).sum())
+
+
+def golden_columns():
+    """Golden cells as object columns, plus typed numeric columns the Excel reader produces"""
+    return {
+        'numeric': [
+            pd.Series(GOLDEN_NUMERIC, dtype=object),
+            pd.Series([0.0, 12.0, -1.5, np.nan, 1e17, 2.5e-7, 1234567.891, np.inf, -np.inf]),
+            pd.Series([0, 12, -7, 2 ** 53 + 1], dtype='int64'),
+            pd.Series([1, None, 3], dtype='Int64')
+        ],
+        'duration': [
+            pd.Series(GOLDEN_DURATION, dtype=object),
+            pd.Series([90.0, np.nan, 1.5, 125.25])
+        ],
+        'percentage': [
+            pd.Series(GOLDEN_PERCENTAGE, dtype=object),
+            pd.Series([0.125, np.nan, 3.0, -np.inf]),
+            pd.Series([True, False])
+        ]
+    }
+
+
+def synthetic_columns(n_rows, seed=42):
+    """Messy live-session columns similar to creator exports (mixed numbers & text)"""
+    rng = np.random.default_rng(seed)
+    gmv = rng.integers(0, 50_000_000, n_rows)
+    numeric = np.where(
+        rng.random(n_rows) < 0.5,
+        gmv.astype(object),
+        np.array([f"Rp{value:,}".replace(',', '.') for value in gmv], dtype=object)
+    )
+    numeric[rng.random(n_rows) < 0.05] = '-'
+    numeric[rng.random(n_rows) < 0.02] = np.nan
+
+    hours = rng.integers(0, 6, n_rows)
+    minutes = rng.integers(0, 60, n_rows)
+    formats = rng.integers(0, 3, n_rows)
+    duration = np.array([
+        f"{h}h {m}m" if f == 0 else (f"{h:02d}:{m:02d}:00" if f == 1 else f"{h * 60 + m} min")
+        for h, m, f in zip(hours, minutes, formats)
+    ], dtype=object)
+    duration[rng.random(n_rows) < 0.02] = np.nan
+
+    rates = rng.uniform(0, 25, n_rows)
+    percentage = np.array([f"{rate:.2f}%".replace('.', ',') for rate in rates], dtype=object)
+    percentage[rng.random(n_rows) < 0.05] = '-'
+
+    return {
+        'numeric': pd.Series(numeric, dtype=object),
+        'duration': pd.Series(duration, dtype=object),
+        'percentage': pd.Series(percentage, dtype=object)
+    }
+
+
+def synthetic_frame(n_rows, seed=42):
+    """A month of live sessions: typed numeric columns as read_excel returns them, a few
+    currency columns stored as text, and text durations & percentages"""
+    rng = np.random.default_rng(seed)
+    columns = synthetic_columns(n_rows, seed=seed)
+    df = pd.DataFrame({'Kreator': [f"creator_{idx % 500}" for idx in range(n_rows)]})
+    for idx, col in enumerate(NUMERIC_COLUMNS):
+        if col in ('GMV_Bruto', 'GMV_Live', 'Harga_Rata_Rata'):
+            df[col] = columns['numeric'].sample(frac=1.0, random_state=seed + idx).to_numpy()
+        else:
+            values = rng.integers(0, 100_000, n_rows).astype('float64')
+            values[rng.random(n_rows) < 0.01] = np.nan
+            df[col] = values
+    df['Durasi'] = columns['duration'].to_numpy()
+    for col in PERCENTAGE_COLUMNS:
+        df[col] = columns['percentage'].sample(frac=1.0, random_state=seed).to_numpy()
+    return df
+
+
+def parse_with_apply(df):
+    """The former load_data loop: Series.apply with the scalar parsers"""
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(safe_numeric_conversion)
+    if 'Durasi' in df.columns:
+        df['Durasi_Minutes'] = df['Durasi'].apply(parse_duration)
+    for col in PERCENTAGE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].apply(parse_percentage)
+    return df
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden-set check & benchmark for livedata column parsing")
+    parser.add_argument("--rows", nargs="+", default=['100k'], help="Synthetic column sizes, e.g. 100k 1m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-arrow", action="store_true",
+                        help="Use the scalar map fallback (per-cell Series.map) instead of pyarrow")
+    args = parser.parse_args(argv)
+
+    if args.no_arrow:
+        livedata_parsing.pa = livedata_parsing.pc = None
+    print(f"backend: {'scalar map fallback' if livedata_parsing.pc is None else 'pyarrow compute'}")
+
+    mismatches = 0
+    for name, columns in golden_columns().items():
+        cells = sum(len(series) for series in columns)
+        diff = sum(compare(name, series) for series in columns)
+        mismatches += diff
+        print(f"golden {name:<10} {cells:>4} cells  {'OK' if diff == 0 else f'{diff} mismatches'}")
+
+    for text in args.rows:
+        n_rows = parse_scale(text)
+        print(f"\n== {n_rows:,} rows ==")
+        for name, series in synthetic_columns(n_rows, seed=args.seed).items():
+            scalar, vectorized = PARSERS[name]
+            diff = compare(name, series)
+            mismatches += diff
+            scalar_seconds = timed(series.apply, scalar)
+            vectorized_seconds = timed(vectorized, series)
+            print(
+                f"{name:<10} apply {scalar_seconds:7.3f}s  vectorized {vectorized_seconds:7.3f}s  "
+                f"{scalar_seconds / vectorized_seconds:5.1f}x  {'OK' if diff == 0 else f'{diff} mismatches'}"
+            )
+
+        frame = synthetic_frame(n_rows, seed=args.seed)
+        scalar_seconds = timed(parse_with_apply, frame.copy())
+        vectorized_seconds = timed(parse_live_columns, frame.copy())
+        expected = parse_with_apply(frame.copy()).astype('float64', errors='ignore')
+        actual = parse_live_columns(frame.copy()).astype('float64', errors='ignore')
+        same = expected.equals(actual)
+        mismatches += 0 if same else 1
+        print(
+            f"{'frame':<10} apply {scalar_seconds:7.3f}s  vectorized {vectorized_seconds:7.3f}s  "
+            f"{scalar_seconds / vectorized_seconds:5.1f}x  {'OK' if same else 'MISMATCH'}  "
+            f"({len(NUMERIC_COLUMNS) + 1 + len(PERCENTAGE_COLUMNS)} columns)"
+        )
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Generator ekspor pesanan & settlement sintetis yang menyerupai data marketplace."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from excel_writer import open_workbook, write_frame
+from income_core import cost_key
+
+BRANDS = ['DESMARÉ', 'CÉLIA by DESMARÉ', 'ÉLIANE by DESMARÉ', 'Porté by DESMARÉ', 'LIVIA', 'Lune']
+ITEMS = [
+    'Dompet Mini Wanita 2 Resleting', 'Tas Selempang Wanita Elegan', 'Dompet Kartu Wanita Motif Croco',
+    'Mini Satchel Croco', 'Strap Panjang Tas Wanita Adjustable', 'Dompet Koin Wanita Mini',
+    'Dompet Tangan Elegan dengan Detail Gold', 'Shoulder Bag Kulit Premium', 'Tote Bag Kanvas Serbaguna'
+]
+TAGLINES = [
+    '| Kecil, Rapi, Stylish', 'Kekinian Mini Bag Branded Premium Cewek', 'Bordir Elegan Anti Air Uang Kartu',
+    'Tali Selempang Kulit Premium Cocok untuk Shoulder Bag', '2 Ruang untuk HP dan Aksesori Wanita',
+    'Resleting Gold Uang Kulit Original', 'Bahan Tebal Tahan Lama Cocok untuk Hadiah'
+]
+VARIATIONS = ['Hitam', 'Putih', 'Coklat', 'Cream', 'Navy', 'Maroon', 'Hitam, Kecil', 'Hitam, Besar',
+              'Coklat, Kecil', 'Coklat, Besar', 'Cream, Kecil', 'Cream, Besar']
+STATUSES = ['Selesai', 'Dibatalkan', 'Dikirim', 'Menunggu pengiriman']
+STATUS_WEIGHTS = [0.82, 0.08, 0.06, 0.04]
+DATE_COLUMN = 'Order created time(UTC)'
+
+
+def make_catalog(n_products, rng):
+    """Katalog produk dengan nama panjang, SKU dan harga jual"""
+    names = []
+    for idx in range(n_products):
+        name = (
+            f"{BRANDS[idx % len(BRANDS)]} {ITEMS[(idx // len(BRANDS)) % len(ITEMS)]} "
+            f"{TAGLINES[idx % len(TAGLINES)]} Seri {idx + 1:04d}"
+        )
+        names.append(name)
+    return pd.DataFrame({
+        'Seller SKU': [f"DSM-{idx + 1:05d}" for idx in range(n_products)],
+        'Product Name': names,
+        'Price': rng.integers(15, 250, n_products) * 1000.0
+    })
+
+
+def generate_exports(n_lines, seed=42, n_products=None, start='2024-07-01', days=31):
+    """Membuat (pesanan, pendapatan, cost_data) sintetis dengan `n_lines` baris pesanan.
+
+    - Pesanan berisi 1–4 baris item, status campuran
+    - Sebagian pesanan punya beberapa baris settlement (penyesuaian/refund) dengan ID sama
+    - Sebagian kecil pesanan selesai belum punya settlement, dan ada settlement tanpa pesanan
+    - Biaya tersedia untuk ±85% produk; ±10% SKU juga punya biaya per SKU & per variasi
+    """
+    rng = np.random.default_rng(seed)
+    if n_products is None:
+        n_products = int(min(2000, max(50, n_lines ** 0.5)))
+    catalog = make_catalog(n_products, rng)
+
+    # Pesanan multi-item
+    sizes = rng.choice([1, 2, 3, 4], size=n_lines, p=[0.6, 0.25, 0.1, 0.05])
+    n_orders = int(np.searchsorted(np.cumsum(sizes), n_lines) + 1)
+    line_order = np.repeat(np.arange(n_orders), sizes[:n_orders])[:n_lines]
+    order_ids = (np.int64(576_000_000_000_000_000) + line_order).astype(str)
+
+    # Popularitas produk mengikuti distribusi berekor panjang
+    weights = 1.0 / np.arange(1, n_products + 1) ** 1.1
+    product_idx = rng.choice(n_products, size=n_lines, p=weights / weights.sum())
+
+    order_status = np.array(STATUSES, dtype=object)[rng.choice(len(STATUSES), size=n_orders, p=STATUS_WEIGHTS)]
+    order_seconds = rng.integers(0, days * 86400, size=n_orders)
+    order_times = (pd.Timestamp(start) + pd.to_timedelta(order_seconds, unit='s')).strftime('%d/%m/%Y %H:%M:%S')
+
+    quantity = rng.choice([1, 2, 3, 5], size=n_lines, p=[0.7, 0.2, 0.07, 0.03])
+    line_value = quantity * catalog['Price'].to_numpy()[product_idx]
+    orders = pd.DataFrame({
+        'Order ID': order_ids,
+        'Order Status': order_status[line_order],
+        'Seller SKU': catalog['Seller SKU'].to_numpy(dtype=object)[product_idx],
+        'Product Name': catalog['Product Name'].to_numpy(dtype=object)[product_idx],
+        'Variation': np.array(VARIATIONS, dtype=object)[rng.integers(0, len(VARIATIONS), n_lines)],
+        'Quantity': quantity,
+        'SKU Subtotal After Discount': line_value,
+        DATE_COLUMN: np.asarray(order_times, dtype=object)[line_order]
+    })
+
+    # Settlement per pesanan: nilai barang dikurangi potongan marketplace
+    order_value = np.bincount(line_order, weights=line_value, minlength=n_orders)
+    settled = rng.random(n_orders) > 0.02
+    settled_ids = np.flatnonzero(settled)
+    amounts = np.round(order_value[settled_ids] * rng.uniform(0.78, 0.9, settled_ids.size), -2)
+
+    # Penyesuaian (refund sebagian / koreksi biaya) memakai ID pesanan yang sama
+    adjusted = settled_ids[rng.random(settled_ids.size) < 0.05]
+    adjustment_amounts = -np.round(order_value[adjusted] * rng.uniform(0.02, 0.3, adjusted.size), -2)
+
+    # Settlement tanpa pesanan (mis. pesanan bulan lalu)
+    n_orphans = max(1, n_orders // 100)
+    orphan_ids = np.int64(575_000_000_000_000_000) + np.arange(n_orphans)
+    orphan_amounts = np.round(rng.uniform(10_000, 300_000, n_orphans), -2)
+
+    income = pd.DataFrame({
+        'Order/adjustment ID': np.concatenate([
+            (np.int64(576_000_000_000_000_000) + settled_ids).astype(str),
+            (np.int64(576_000_000_000_000_000) + adjusted).astype(str),
+            orphan_ids.astype(str)
+        ]).astype(object),
+        'Total settlement amount': np.concatenate([amounts, adjustment_amounts, orphan_amounts])
+    })
+    income = income.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+    has_cost = rng.random(n_products) < 0.85
+    costs = np.round(catalog['Price'].to_numpy() * rng.uniform(0.3, 0.6, n_products), -2)
+    cost_data = {
+        name: float(cost)
+        for name, cost, keep in zip(catalog['Product Name'], costs, has_cost) if keep
+    }
+    # Sebagian biaya per SKU & per SKU + variasi (lebih spesifik dari nama produk)
+    sku_idx = np.flatnonzero(rng.random(n_products) < 0.1)
+    for idx in sku_idx:
+        cost_data[cost_key(catalog['Seller SKU'].iat[idx])] = float(costs[idx])
+        variation = VARIATIONS[rng.integers(0, len(VARIATIONS))]
+        cost_data[cost_key(catalog['Seller SKU'].iat[idx], variation)] = float(np.round(costs[idx] * 1.1, -2))
+
+    return orders, income, cost_data
+
+
+def write_exports(orders, income, folder, prefix='synthetic'):
+    """Menulis pasangan file Excel seperti ekspor asli (pesanan punya baris keterangan)"""
+    os.makedirs(folder, exist_ok=True)
+    orders_path = os.path.join(folder, f"{prefix}_pesanan.xlsx")
+    income_path = os.path.join(folder, f"{prefix}_income.xlsx")
+
+    description = pd.DataFrame([{col: f"Keterangan {col}" for col in orders.columns}])
+    workbook, _ = open_workbook(orders_path)
+    try:
+        write_frame(workbook, 'OrderSKUList', pd.concat([description, orders], ignore_index=True))
+    finally:
+        workbook.close()
+
+    workbook, _ = open_workbook(income_path)
+    try:
+        write_frame(workbook, 'Income', income)
+    finally:
+        workbook.close()
+
+    return orders_path, income_path
@@ -0,0 +1,114 @@
+"""Ekspor data massal untuk alat BI: Parquet, CSV gzip & Arrow IPC.
+
+Seperti excel_writer, data ditulis per potongan baris sehingga memori tetap
+datar, tetapi tanpa batas 1.048.576 baris per lembar Excel. Hasil ditulis ke
+path atau objek file; jika None, ke file sementara di disk yang dikembalikan
+dalam posisi awal.
+
+Pemakaian:
+    export_file = write_export(merged, 'parquet')
+    write_export(summary, 'csv.gz', output='ringkasan.csv.gz')
+"""
+import gzip
+import io
+import tempfile
+
+from upload_cache import normalize_mixed_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_csv = pq = None
+
+# Jumlah baris per potongan (satu row group Parquet / record batch Arrow)
+CHUNK_ROWS = 250_000
+
+# format -> (label, ekstensi file, tipe MIME, butuh pyarrow)
+EXPORT_FORMATS = {
+    'parquet': ('Parquet (zstd)', '.parquet', 'application/vnd.apache.parquet', True),
+    'csv.gz': ('CSV gzip', '.csv.gz', 'application/gzip', False),
+    'arrow': ('Arrow IPC (lz4)', '.arrow', 'application/vnd.apache.arrow.file', True)
+}
+
+
+def available_formats():
+    """Format yang bisa dipakai (Parquet & Arrow IPC memerlukan pyarrow)"""
+    return [fmt for fmt, spec in EXPORT_FORMATS.items() if pa is not None or not spec[3]]
+
+
+def write_export(df, fmt, output=None, chunk_rows=CHUNK_ROWS):
+    """Menulis DataFrame (tanpa indeks) dalam format `fmt` ke `output`; mengembalikan output"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+    if EXPORT_FORMATS[fmt][3] and pa is None:
+        raise ImportError(f"Format {EXPORT_FORMATS[fmt][0]} memerlukan pyarrow")
+    if output is None:
+        output = tempfile.TemporaryFile(suffix=EXPORT_FORMATS[fmt][1])
+
+    if fmt == 'csv.gz':
+        _write_csv_gz(df, output, chunk_rows)
+    else:
+        _write_arrow_chunks(df, fmt, output, chunk_rows)
+
+    if hasattr(output, 'seek'):
+        output.seek(0)
+    return output
+
+
+def _write_csv_gz(df, output, chunk_rows):
+    # compresslevel 6: hampir sekecil level 9 (bawaan gzip) dengan waktu jauh lebih singkat
+    with gzip.GzipFile(filename=output if isinstance(output, str) else None, mode='wb', compresslevel=6,
+                       fileobj=None if isinstance(output, str) else output) as compressed:
+        if pa is None:
+            text = io.TextIOWrapper(compressed, encoding='utf-8', newline='')
+            for start in range(0, max(len(df), 1), chunk_rows):
+                df.iloc[start:start + chunk_rows].to_csv(text, header=start == 0, index=False)
+            # Dilepas tanpa ditutup: TextIOWrapper.close() ikut menutup file tujuan milik pemanggil
+            text.flush()
+            text.detach()
+            return
+        # Penulis CSV pyarrow ±2x lebih cepat dari DataFrame.to_csv
+        df, schema = _arrow_schema(df)
+        csv_schema = pa.schema([field.with_type(_csv_type(field.type)) for field in schema])
+        writer = pa_csv.CSVWriter(compressed, csv_schema)
+        for table in _arrow_chunks(df, schema, chunk_rows):
+            writer.write_table(table.cast(csv_schema, safe=False))
+        writer.close()
+
+
+def _write_arrow_chunks(df, fmt, output, chunk_rows):
+    df, schema = _arrow_schema(df)
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(output, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(output, schema, options=pa.ipc.IpcWriteOptions(compression='lz4'))
+    with writer:
+        for table in _arrow_chunks(df, schema, chunk_rows):
+            writer.write_table(table)
+
+
+def _arrow_schema(df):
+    # Skema dari seluruh kolom sekaligus agar tiap potongan bertipe sama
+    # (mis. potongan yang kolomnya kosong semua tidak menjadi tipe null)
+    try:
+        return df, pa.Schema.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Kolom object bercampur (mis. SKU angka & teks): samakan menjadi teks
+        df = normalize_mixed_columns(df)
+        return df, pa.Schema.from_pandas(df, preserve_index=False)
+
+
+def _arrow_chunks(df, schema, chunk_rows):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False)
+
+
+def _csv_type(arrow_type):
+    # CSV tidak mengenal kolom kategori; waktu pesanan cukup sampai detik ("2024-07-01 10:00:00")
+    if pa.types.is_dictionary(arrow_type):
+        return arrow_type.value_type
+    if pa.types.is_timestamp(arrow_type):
+        return pa.timestamp('s', tz=arrow_type.tz)
+    return arrow_type
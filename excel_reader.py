@@ -0,0 +1,178 @@
+import importlib.util
+import io
+import zipfile
+from operator import itemgetter
+
+import pandas as pd
+
+from memory_utils import optimize_dtypes
+
+# Kolom yang benar-benar dipakai oleh IncomeApp.process_data & laporan
+ORDER_COLUMNS = ['Order ID', 'Order Status', 'Seller SKU', 'Product Name', 'Variation', 'Quantity']
+INCOME_COLUMNS = ['Order/adjustment ID', 'Total settlement amount']
+
+# Kandidat kolom tanggal pesanan, urut berdasarkan prioritas
+DATE_COLUMN_CANDIDATES = [
+    'Order created time(UTC)', 'Order creation time', 'Order Creation Time',
+    'Creation Time', 'Date', 'Order Date', 'Order created time', 'Created time'
+]
+
+# Kolom nilai baris untuk alokasi settlement ke item pesanan, urut berdasarkan prioritas.
+# Subtotal sudah mencakup kuantitas; harga satuan masih harus dikali Quantity.
+LINE_SUBTOTAL_CANDIDATES = ['SKU Subtotal After Discount', 'SKU Subtotal Before Discount']
+UNIT_PRICE_CANDIDATES = ['SKU Unit Original Price']
+
+# Naikkan jika hasil pembacaan berubah agar cache unggahan lama tidak dipakai
+READER_VERSION = 3
+
+
+def has_calamine():
+    """Cek apakah engine calamine (python-calamine) tersedia"""
+    return importlib.util.find_spec('python_calamine') is not None
+
+
+def find_date_column(columns):
+    """Mengembalikan kolom tanggal pertama yang tersedia, atau None"""
+    for col in DATE_COLUMN_CANDIDATES:
+        if col in columns:
+            return col
+    return None
+
+
+def find_price_column(columns):
+    """Mengembalikan (kolom nilai baris, sudah_subtotal) pertama yang tersedia, atau (None, False)"""
+    for col in LINE_SUBTOTAL_CANDIDATES:
+        if col in columns:
+            return col, True
+    for col in UNIT_PRICE_CANDIDATES:
+        if col in columns:
+            return col, False
+    return None, False
+
+
+def read_orders_excel(data):
+    """Membaca file pesanan (baris ke-2 berisi keterangan, dilewati)"""
+    return optimize_dtypes(read_excel_columns(
+        data,
+        required=ORDER_COLUMNS,
+        optional=DATE_COLUMN_CANDIDATES + LINE_SUBTOTAL_CANDIDATES + UNIT_PRICE_CANDIDATES,
+        skip_rows=1,
+        numeric=['Quantity'] + LINE_SUBTOTAL_CANDIDATES + UNIT_PRICE_CANDIDATES,
+        text=['Order ID', 'Seller SKU']
+    ))
+
+
+def read_income_excel(data):
+    """Membaca file pendapatan/settlement"""
+    return optimize_dtypes(read_excel_columns(
+        data,
+        required=INCOME_COLUMNS,
+        numeric=['Total settlement amount'],
+        text=['Order/adjustment ID']
+    ))
+
+
+def read_excel_columns(data, required, optional=(), skip_rows=0, numeric=(), text=()):
+    """Membaca hanya kolom yang dibutuhkan dari lembar pertama file Excel.
+
+    Baris header dibaca lebih dulu untuk menentukan posisi kolom, lalu hanya
+    kolom tersebut yang dialirkan ke DataFrame. Nama kolom di-strip, kolom
+    pada `numeric` dikonversi ke angka dan kolom pada `text` (ID, SKU) ke teks
+    agar kunci gabungan selalu bertipe sama apa pun cara penyimpanannya di Excel.
+    """
+    wanted = list(dict.fromkeys(list(required) + list(optional)))
+
+    if has_calamine():
+        df = _read_with_pandas(data, wanted, skip_rows, engine='calamine')
+    elif zipfile.is_zipfile(io.BytesIO(data)):
+        df = _read_with_openpyxl(data, wanted, skip_rows)
+    else:
+        # Format .xls lama tidak didukung openpyxl mode read-only
+        df = _read_with_pandas(data, wanted, skip_rows, engine=None)
+
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+    for col in df.columns:
+        if col in numeric:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        elif col in text:
+            df[col] = df[col].map(_to_text, na_action='ignore')
+        else:
+            df[col] = df[col].infer_objects()
+
+    return df
+
+
+def _to_text(value):
+    # Angka bulat yang tersimpan sebagai float (mis. 123.0) ditulis tanpa desimal
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _read_with_pandas(data, wanted, skip_rows, engine):
+    wanted_set = set(wanted)
+    df = pd.read_excel(
+        io.BytesIO(data),
+        header=0,
+        skiprows=list(range(1, skip_rows + 1)),
+        usecols=lambda col: str(col).strip() in wanted_set,
+        dtype=object,
+        engine=engine
+    )
+    df.columns = df.columns.str.strip()
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def _read_with_openpyxl(data, wanted, skip_rows):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, ())
+
+        # Posisi kolom berdasarkan nama header (kemunculan pertama)
+        positions = {}
+        for idx, name in enumerate(header):
+            if name is None:
+                continue
+            name = str(name).strip()
+            if name in wanted and name not in positions:
+                positions[name] = idx
+
+        names = [col for col in wanted if col in positions]
+        indices = [positions[col] for col in names]
+        if not indices:
+            return pd.DataFrame(columns=names)
+
+        width = max(indices) + 1
+        getter = itemgetter(*indices)
+        columns = [[] for _ in names]
+
+        for _ in range(skip_rows):
+            next(rows, None)
+
+        for row in rows:
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            values = getter(row)
+            if len(indices) == 1:
+                values = (values,)
+            for column, value in zip(columns, values):
+                column.append(value)
+    finally:
+        workbook.close()
+
+    # Buang baris kosong di akhir lembar (sama seperti pd.read_excel)
+    length = len(columns[0])
+    while length and all(column[length - 1] is None for column in columns):
+        length -= 1
+
+    return pd.DataFrame({
+        name: pd.Series(column[:length], dtype=object)
+        for name, column in zip(names, columns)
+    })
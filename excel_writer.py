@@ -0,0 +1,117 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+# Batas baris per lembar Excel (termasuk baris header)
+EXCEL_MAX_ROWS = 1_048_576
+
+# Jumlah baris yang dikonversi sekaligus; menjaga memori tetap datar untuk data besar
+CHUNK_ROWS = 50_000
+
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+
+def open_workbook(output=None):
+    """Membuka workbook xlsxwriter mode constant_memory.
+
+    `output` boleh berupa path atau objek file; jika None, hasil ditulis ke
+    file sementara di disk (bukan BytesIO) agar memori tidak ikut membesar.
+    Mengembalikan (workbook, output).
+    """
+    if output is None:
+        output = tempfile.TemporaryFile(suffix='.xlsx')
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'default_date_format': 'dd/mm/yyyy',
+        # Nama produk bisa diawali "=" atau berisi URL; tulis apa adanya
+        'strings_to_formulas': False,
+        'strings_to_urls': False
+    })
+    return workbook, output
+
+
+def write_frame(workbook, sheet_name, df, header_format=None, datetime_format=None, chunk_rows=CHUNK_ROWS,
+                progress=None):
+    """Menulis DataFrame ke satu atau beberapa lembar secara berurutan per baris.
+
+    Kolom dikonversi per potongan `chunk_rows` baris langsung dari array NumPy
+    ke nilai Python, lalu ditulis dengan penulis bertipe (angka/tanggal/teks)
+    tanpa melewati formatter sel pandas. Data melebihi batas baris Excel
+    dilanjutkan ke lembar "<nama> (2)", "<nama> (3)", dst. `progress(baris)`
+    (opsional) dipanggil dengan jumlah baris setiap potongan selesai ditulis.
+    Mengembalikan daftar nama lembar yang ditulis.
+    """
+    if datetime_format is None:
+        datetime_format = workbook.add_format({'num_format': 'dd/mm/yyyy hh:mm:ss'})
+
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    total_rows = len(df)
+    sheet_names = []
+    sheet_start = 0
+
+    while True:
+        name = sheet_name if not sheet_names else f"{sheet_name[:25]} ({len(sheet_names) + 1})"
+        worksheet = workbook.add_worksheet(name)
+        sheet_names.append(name)
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+
+        sheet_end = min(sheet_start + rows_per_sheet, total_rows)
+        for chunk_start in range(sheet_start, sheet_end, chunk_rows):
+            chunk = df.iloc[chunk_start:min(chunk_start + chunk_rows, sheet_end)]
+            _write_chunk(worksheet, chunk, chunk_start - sheet_start + 1, datetime_format)
+            if progress is not None:
+                progress(len(chunk))
+
+        sheet_start = sheet_end
+        if sheet_start >= total_rows:
+            return sheet_names
+
+
+def _write_chunk(worksheet, chunk, first_row, datetime_format):
+    writers = []
+    formats = []
+    columns = []
+    for col in range(chunk.shape[1]):
+        writer, fmt, values = _column_values(worksheet, chunk.iloc[:, col], datetime_format)
+        writers.append(writer)
+        formats.append(fmt)
+        columns.append(values)
+
+    for offset, row_values in enumerate(zip(*columns)):
+        row = first_row + offset
+        for col, value in enumerate(row_values):
+            if value is not None:
+                writers[col](row, col, value, formats[col])
+
+
+def _column_values(worksheet, series, datetime_format):
+    """Mengembalikan (fungsi penulis, format, daftar nilai) untuk satu kolom"""
+    if pd.api.types.is_bool_dtype(series):
+        values = series.astype(object)
+        return worksheet.write_boolean, None, values.where(values.notna(), None).tolist()
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            series = series.dt.tz_localize(None)
+        serials = ((series - EXCEL_EPOCH) / pd.Timedelta(days=1)).to_numpy(dtype=float, na_value=np.nan)
+        return worksheet.write_number, datetime_format, _with_none(serials)
+
+    if pd.api.types.is_numeric_dtype(series):
+        numbers = series.to_numpy(dtype=float, na_value=np.nan)
+        return worksheet.write_number, None, _with_none(numbers)
+
+    # Teks, kategori, tanggal Python, dan kolom campuran
+    values = series.astype(object)
+    return worksheet.write, None, values.where(values.notna(), None).tolist()
+
+
+def _with_none(numbers):
+    # NaN/inf tidak valid di Excel: tulis sebagai sel kosong
+    invalid = ~np.isfinite(numbers)
+    values = numbers.tolist()
+    if invalid.any():
+        for idx in np.flatnonzero(invalid).tolist():
+            values[idx] = None
+    return values
@@ -0,0 +1,177 @@
+"""Pemrosesan batch laporan pendapatan tanpa antarmuka Streamlit.
+
+Memasangkan file pesanan & pendapatan per periode dalam satu folder, lalu
+memproses tiap periode secara paralel dan menulis satu workbook per periode.
+
+Contoh:
+    python income_batch.py exports/2024-07 --output reports --workers 4
+
+Nama file dipasangkan berdasarkan kata kunci: file yang namanya mengandung
+"pendapatan", "income" atau "settlement" dianggap data pendapatan, sedangkan
+"pesanan" atau "order" dianggap data pesanan. Sisa nama file (tanpa kata
+kunci) menjadi nama periode, mis. "2024-07_pesanan.xlsx" & "2024-07_income.xlsx".
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from data_export import EXPORT_FORMATS, write_export
+from excel_reader import read_income_excel, read_orders_excel
+from income_core import IncomeApp
+from warehouse import Warehouse
+
+INCOME_KEYWORDS = ('pendapatan', 'income', 'settlement')
+ORDER_KEYWORDS = ('pesanan', 'orders', 'order')
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+
+def period_key(stem, keyword):
+    """Membuang kata kunci & pemisah dari nama file untuk mendapatkan nama periode"""
+    key = re.sub(re.escape(keyword), '', stem, flags=re.IGNORECASE)
+    key = re.sub(r'[\s_\-.]+', '-', key).strip('-')
+    return key or 'default'
+
+
+def find_file_pairs(folder):
+    """Mengembalikan {periode: (file_pesanan, file_pendapatan)} dan daftar file tanpa pasangan"""
+    orders, incomes = {}, {}
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in EXCEL_EXTENSIONS or name.startswith('~$'):
+            continue
+        lowered = stem.lower()
+        path = os.path.join(folder, name)
+        # Kata kunci pendapatan dicek lebih dulu ("settlement_orders" adalah data pendapatan)
+        keyword = next((k for k in INCOME_KEYWORDS if k in lowered), None)
+        if keyword:
+            incomes[period_key(stem, keyword)] = path
+            continue
+        keyword = next((k for k in ORDER_KEYWORDS if k in lowered), None)
+        if keyword:
+            orders[period_key(stem, keyword)] = path
+
+    pairs = {period: (orders[period], incomes[period]) for period in sorted(orders.keys() & incomes.keys())}
+    unmatched = sorted(
+        [path for period, path in orders.items() if period not in incomes] +
+        [path for period, path in incomes.items() if period not in orders]
+    )
+    return pairs, unmatched
+
+
+def process_period(period, orders_path, income_path, cost_data, output_dir, include_raw_data=False,
+                   warehouse_path=None, export_format=None):
+    """Memproses satu periode (dijalankan di proses pekerja)"""
+    result = {'Periode': period, 'Status': 'OK', 'Baris Pesanan': 0, 'Baris Pendapatan': 0,
+              'Baris Gabungan': 0, 'Baca (s)': 0.0, 'Proses (s)': 0.0, 'Laporan (s)': 0.0,
+              'Gudang (s)': 0.0, 'Ekspor (s)': 0.0, 'Total (s)': 0.0, 'File Laporan': '', 'File Data': ''}
+    app = IncomeApp()
+    started = time.perf_counter()
+    try:
+        with open(orders_path, 'rb') as f:
+            pesanan_data = read_orders_excel(f.read())
+        with open(income_path, 'rb') as f:
+            income_data = read_income_excel(f.read())
+        result['Baris Pesanan'] = len(pesanan_data)
+        result['Baris Pendapatan'] = len(income_data)
+        after_read = time.perf_counter()
+        result['Baca (s)'] = after_read - started
+
+        merged, summary, aggregates = app.process_data(pesanan_data, income_data, cost_data)
+        after_process = time.perf_counter()
+        result['Proses (s)'] = after_process - after_read
+        if merged is None:
+            result['Status'] = 'Tidak ada data yang cocok'
+            return result
+        result['Baris Gabungan'] = len(merged)
+
+        report_path = os.path.join(output_dir, f"income_report_{period}.xlsx")
+        app.create_excel_report(merged, summary, cost_data, aggregates,
+                                include_raw_data=include_raw_data, output=report_path)
+        after_report = time.perf_counter()
+        result['Laporan (s)'] = after_report - after_process
+        result['File Laporan'] = report_path
+
+        if warehouse_path:
+            # Pekerja lain menunggu kunci tulis SQLite (upsert membuka BEGIN IMMEDIATE, menunggu sampai timeout Warehouse)
+            Warehouse(warehouse_path).upsert(merged, app.aggregate_settlements(income_data))
+            result['Gudang (s)'] = time.perf_counter() - after_report
+
+        if export_format:
+            after_warehouse = time.perf_counter()
+            data_path = os.path.join(output_dir, f"merged_{period}{EXPORT_FORMATS[export_format][1]}")
+            write_export(merged, export_format, output=data_path)
+            result['Ekspor (s)'] = time.perf_counter() - after_warehouse
+            result['File Data'] = data_path
+    except Exception as e:
+        result['Status'] = f"Gagal: {e}"
+    finally:
+        result['Total (s)'] = time.perf_counter() - started
+    return result
+
+
+def run_batch(folder, output_dir, cost_file="product_costs.json", workers=None, include_raw_data=False,
+              warehouse_path=None, export_format=None):
+    """Memproses semua pasangan file dalam folder, mengembalikan DataFrame ringkasan waktu"""
+    pairs, unmatched = find_file_pairs(folder)
+    for path in unmatched:
+        print(f"⚠️  Tidak berpasangan, dilewati: {path}", file=sys.stderr)
+    if not pairs:
+        return pd.DataFrame()
+
+    os.makedirs(output_dir, exist_ok=True)
+    cost_data = IncomeApp(cost_file).load_cost_data()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_period, period, orders_path, income_path, cost_data, output_dir,
+                            include_raw_data, warehouse_path, export_format)
+            for period, (orders_path, income_path) in pairs.items()
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"{'✅' if result['Status'] == 'OK' else '❌'} {result['Periode']}: "
+                  f"{result['Status']} ({result['Total (s)']:.2f} s)")
+            results.append(result)
+
+    return pd.DataFrame(results).sort_values('Periode').reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat laporan Excel pendapatan untuk banyak periode sekaligus")
+    parser.add_argument("folder", help="Folder berisi pasangan file pesanan & pendapatan")
+    parser.add_argument("-o", "--output", default="reports", help="Folder tujuan laporan (default: reports)")
+    parser.add_argument("-c", "--costs", default="product_costs.json", help="File JSON biaya produk")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Jumlah proses paralel (default: jumlah core CPU)")
+    parser.add_argument("--raw", action="store_true",
+                        help="Sertakan lembar 'Data Mentah' berisi seluruh baris gabungan")
+    parser.add_argument("--warehouse", metavar="PATH", default=None,
+                        help="Simpan (upsert) hasil tiap periode ke gudang data SQLite, mis. income_warehouse.sqlite")
+    parser.add_argument("--export", choices=list(EXPORT_FORMATS), default=None,
+                        help="Tulis juga data gabungan tiap periode (merged_<periode>.<format>) untuk alat BI")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    summary = run_batch(args.folder, args.output, cost_file=args.costs, workers=args.workers,
+                        include_raw_data=args.raw, warehouse_path=args.warehouse,
+                        export_format=args.export)
+    if summary.empty:
+        print("❌ Tidak ditemukan pasangan file pesanan & pendapatan", file=sys.stderr)
+        return 1
+
+    summary_path = os.path.join(args.output, "batch_summary.csv")
+    summary.to_csv(summary_path, index=False)
+    print()
+    print(summary.drop(columns=['File Laporan', 'File Data']).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"\n⏱️  Selesai {len(summary)} periode dalam {time.perf_counter() - started:.2f} s — ringkasan: {summary_path}")
+    return 0 if (summary['Status'] == 'OK').all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
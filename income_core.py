@@ -0,0 +1,691 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from excel_reader import find_date_column, find_price_column
+from excel_writer import open_workbook, write_frame
+import perf
+from sales_cube import SalesCube
+
+# Kunci product_costs.json selain nama produk: "sku:<SKU>", "sku:<SKU>::<Variasi>" & "*" (default)
+SKU_KEY_PREFIX = 'sku:'
+VARIATION_SEPARATOR = '::'
+DEFAULT_COST_KEY = '*'
+# Urutan pencocokan biaya, dari yang paling spesifik
+COST_SOURCES = ['SKU + Variation', 'SKU', 'Product Name', 'Default', 'None']
+# Status rekonsiliasi pesanan selesai & settlement (lihat IncomeApp.reconcile)
+RECONCILIATION_STATUSES = ['Matched', 'Order Only', 'Settlement Only']
+
+
+def cost_key(sku, variation=None):
+    """Kunci product_costs.json untuk biaya per SKU (atau per SKU + variasi)"""
+    key = f"{SKU_KEY_PREFIX}{sku}"
+    return f"{key}{VARIATION_SEPARATOR}{variation}" if variation else key
+
+
+def cost_revisions(entry):
+    """Daftar (berlaku_mulai, biaya) dari satu entri product_costs.json.
+    
+    Entri berupa angka (biaya tetap) atau daftar revisi
+    [{"from": "2024-07-01", "cost": 25000}, ...]; berlaku_mulai None = sejak awal.
+    """
+    if isinstance(entry, list):
+        return [
+            (pd.Timestamp(revision['from']) if revision.get('from') else None, float(revision['cost']))
+            for revision in entry
+        ]
+    return [(None, float(entry))]
+
+
+def latest_cost(entry):
+    """Biaya revisi terbaru dari satu entri product_costs.json"""
+    revisions = cost_revisions(entry)
+    if not revisions:
+        return 0.0
+    return max(revisions, key=lambda revision: revision[0] or pd.Timestamp.min)[1]
+
+
+def current_costs(cost_data):
+    """Biaya terbaru per produk {nama: biaya}"""
+    return {name: latest_cost(entry) for name, entry in cost_data.items()}
+
+
+def add_cost_revision(cost_data, product_name, cost, effective_from=None):
+    """Menyimpan biaya produk ke cost_data (diubah langsung).
+    
+    Tanpa `effective_from`, entri diganti menjadi satu biaya tetap (seperti
+    sebelumnya). Dengan tanggal, biaya ditambahkan sebagai revisi yang
+    berlaku mulai tanggal itu; revisi pada tanggal yang sama diganti.
+    """
+    if effective_from is None:
+        cost_data[product_name] = float(cost)
+        return cost_data
+    
+    effective_from = pd.Timestamp(effective_from).strftime('%Y-%m-%d')
+    revisions = [
+        {'from': start.strftime('%Y-%m-%d') if start is not None else None, 'cost': value}
+        for start, value in cost_revisions(cost_data[product_name])
+    ] if product_name in cost_data else []
+    revisions = [revision for revision in revisions if revision['from'] != effective_from]
+    revisions.append({'from': effective_from, 'cost': float(cost)})
+    revisions.sort(key=lambda revision: revision['from'] or '')
+    cost_data[product_name] = revisions
+    return cost_data
+
+
+def frame_fingerprint(df):
+    """Sidik jari isi DataFrame (untuk data yang tidak berasal dari unggahan file)"""
+    digest = hashlib.sha1(str((df.shape, list(df.columns))).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class IncomeApp:
+    """Logika pemrosesan data & laporan (tanpa ketergantungan Streamlit)"""
+    
+    def __init__(self, cost_file="product_costs.json"):
+        self.cost_file = cost_file
+        self.load_cost_data()
+    
+    def load_cost_data(self):
+        """Memuat data biaya dari file JSON"""
+        try:
+            if os.path.exists(self.cost_file):
+                with open(self.cost_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except:
+            return {}
+        return {}
+    
+    def save_cost_data(self, cost_data):
+        """Menyimpan data biaya ke file JSON"""
+        with open(self.cost_file, 'w', encoding='utf-8') as f:
+            json.dump(cost_data, f, ensure_ascii=False, indent=2)
+    
+    def get_product_cost(self, product_name, cost_data):
+        """Mendapatkan biaya produk terbaru dari data biaya"""
+        return latest_cost(cost_data.get(product_name, 0.0))
+    
+    def cost_table(self, cost_data):
+        """Semua revisi biaya sebagai tabel (Product Name, Effective From, Cost per Unit)"""
+        rows = [
+            (name, start, cost)
+            for name, entry in cost_data.items()
+            for start, cost in cost_revisions(entry)
+        ]
+        table = pd.DataFrame(rows, columns=['Product Name', 'Effective From', 'Cost per Unit'])
+        table['Effective From'] = pd.to_datetime(table['Effective From'])
+        return table.sort_values(['Product Name', 'Effective From'], na_position='first', ignore_index=True)
+    
+    @perf.timed('Proses data')
+    def process_data(self, pesanan_data, income_data, cost_data):
+        """Memproses dan menggabungkan data.
+        
+        Mengembalikan (merged, summary, aggregates); lihat build_aggregates &
+        reconcile (tabel rekonsiliasi ikut disimpan di aggregates).
+        """
+        settlements = self.aggregate_settlements(income_data)
+        merged = self.merge_orders_income(pesanan_data, income_data, settlements)
+        
+        if merged.empty:
+            return None, None, None
+        
+        merged = self.allocate_revenue(merged)
+        merged = self.add_order_times(merged)
+        merged = self.resolve_line_costs(merged, cost_data)
+        cube = self.build_cube(merged)
+        summary = self.summarize_products(merged, cube)
+        summary = self.apply_costs(summary)
+        aggregates = self.build_aggregates(merged, summary, cube)
+        aggregates.update(self.reconcile(pesanan_data, settlements))
+        
+        return merged, summary, aggregates
+    
+    @perf.timed('Gabung pesanan & pendapatan')
+    def merge_orders_income(self, pesanan_data, income_data, settlements=None):
+        """Menggabungkan pesanan selesai dengan data pendapatan"""
+        # Filter pesanan selesai
+        df1 = pesanan_data[pesanan_data['Order Status'] == 'Selesai']
+        
+        # Satu baris settlement per ID (termasuk penyesuaian/refund)
+        df2 = self.aggregate_settlements(income_data) if settlements is None else settlements
+        
+        # Gabungkan data
+        return pd.merge(df1, df2, left_on='Order ID', right_on='Order/adjustment ID', how='inner')
+    
+    @perf.timed('Rekonsiliasi')
+    def reconcile(self, pesanan_data, settlements):
+        """Mencocokkan pesanan selesai dengan settlement per Order ID (outer join satu lintasan).
+        
+        Baris pesanan diringkas per Order ID, lalu setiap ID dicari sekali di
+        indeks hash ID settlement; posisi hasil pencarian menjadi indikator
+        outer join (tanpa pengurutan kunci, waktu linear). `settlements` adalah
+        hasil aggregate_settlements. Mengembalikan dict:
+        - 'matched'         : pesanan dengan settlement (dan selisih terhadap nilai pesanan)
+        - 'order_only'      : pesanan selesai yang belum punya settlement
+        - 'settlement_only' : settlement/penyesuaian tanpa pesanan selesai (beserta
+                              status pesanannya bila ID ada dengan status lain)
+        - 'reconciliation'  : jumlah ID, baris & nominal per status
+        Ketiga tabel rincian diindeks Order ID.
+        """
+        is_completed = (pesanan_data['Order Status'] == 'Selesai').to_numpy()
+        completed = pesanan_data[is_completed]
+        order_agg = {
+            'Lines': ('Quantity', 'size'),
+            'Quantity': ('Quantity', 'sum')
+        }
+        price_column, is_subtotal = find_price_column(completed.columns)
+        if price_column:
+            amount = pd.to_numeric(completed[price_column], errors='coerce')
+            if not is_subtotal:
+                amount = amount * completed['Quantity']
+            completed = completed.assign(**{'Order Amount': amount})
+            order_agg['Order Amount'] = ('Order Amount', 'sum')
+        date_column = find_date_column(completed.columns)
+        if date_column:
+            order_agg[date_column] = (date_column, 'first')
+        orders = completed.groupby('Order ID', sort=False, observed=True).agg(**order_agg)
+        settled = settlements.set_index('Order/adjustment ID').rename_axis('Order ID')
+        
+        # Indikator outer join: posisi settlement tiap pesanan (-1 = belum ada settlement)
+        positions = settled.index.get_indexer(orders.index)
+        has_settlement = positions >= 0
+        settlement_matched = np.zeros(len(settled), dtype=bool)
+        settlement_matched[positions[has_settlement]] = True
+        
+        # Waktu pesanan yang cocok sudah ada di aggregates['orders']; hanya sisi
+        # pesanan-saja yang diurai di sini
+        matched = orders[has_settlement]
+        if date_column:
+            matched = matched.drop(columns=date_column)
+        matched = pd.concat([matched, settled.iloc[positions[has_settlement]].set_index(matched.index)], axis=1)
+        if 'Order Amount' in matched.columns:
+            matched['Difference'] = matched['Total settlement amount'] - matched['Order Amount']
+        order_only = orders[~has_settlement]
+        if date_column:
+            order_only = self.add_order_times(order_only).drop(columns=date_column)
+        
+        # Settlement tanpa pesanan selesai sering milik pesanan batal/retur: sertakan statusnya
+        settlement_only = settled[~settlement_matched]
+        others = pesanan_data.loc[~is_completed, ['Order ID', 'Order Status']]
+        hits = settlement_only.index.get_indexer(others['Order ID'])
+        found = np.flatnonzero(hits >= 0)
+        statuses = np.full(len(settlement_only), None, dtype=object)
+        statuses[hits[found]] = np.asarray(others['Order Status'].iloc[found], dtype=object)
+        settlement_only = settlement_only.assign(**{'Order Status': statuses})
+        
+        reconciliation = pd.DataFrame({
+            'Status': RECONCILIATION_STATUSES,
+            'Orders': [len(matched), len(order_only), len(settlement_only)],
+            'Lines': [matched['Lines'].sum(), order_only['Lines'].sum(), 0],
+            'Order Amount': [
+                frame['Order Amount'].sum() if 'Order Amount' in frame.columns else np.nan
+                for frame in (matched, order_only)
+            ] + [np.nan],
+            'Settlement Amount': [
+                matched['Total settlement amount'].sum(), 0, settlement_only['Total settlement amount'].sum()
+            ]
+        })
+        
+        return {
+            'matched': matched,
+            'order_only': order_only,
+            'settlement_only': settlement_only,
+            'reconciliation': reconciliation
+        }
+    
+    @perf.timed('Agregasi settlement')
+    def aggregate_settlements(self, income_data):
+        """Menjumlahkan semua baris settlement per Order/adjustment ID.
+        
+        Pesanan dengan penyesuaian (refund sebagian, koreksi biaya) punya
+        beberapa baris dengan ID sama; semuanya dijumlahkan, dan jumlah
+        barisnya disimpan di kolom 'Settlement Rows'.
+        """
+        return income_data.groupby('Order/adjustment ID', as_index=False, sort=False, observed=True).agg(**{
+            'Total settlement amount': ('Total settlement amount', 'sum'),
+            'Settlement Rows': ('Total settlement amount', 'size')
+        })
+    
+    @perf.timed('Alokasi pendapatan')
+    def allocate_revenue(self, merged):
+        """Membagi settlement tiap pesanan ke baris itemnya (kolom 'Allocated Revenue').
+        
+        Bobot baris: kolom subtotal/harga jika ada (lihat find_price_column),
+        jika tidak ada atau bernilai nol memakai Quantity, dan terakhir dibagi
+        rata. Hasil dibulatkan ke satuan Rupiah; selisih pembulatan diberikan
+        ke baris berbobot terbesar sehingga jumlah per pesanan sama persis
+        dengan settlement-nya.
+        """
+        codes, uniques = pd.factorize(merged['Order ID'])
+        n_orders = len(uniques)
+        
+        quantity = self._positive(merged['Quantity'])
+        price_column, is_subtotal = find_price_column(merged.columns)
+        if price_column:
+            weights = self._positive(merged[price_column])
+            if not is_subtotal:
+                weights = weights * quantity
+        else:
+            weights = quantity
+        
+        # Pesanan tanpa bobot: pakai Quantity, lalu bagi rata
+        for fallback in (quantity, np.ones(len(merged))):
+            no_weight = np.bincount(codes, weights, minlength=n_orders)[codes] == 0
+            if not no_weight.any():
+                break
+            weights = np.where(no_weight, fallback, weights)
+        
+        amount = merged['Total settlement amount'].to_numpy(dtype='float64', na_value=np.nan)
+        allocated = np.round(amount * weights / np.bincount(codes, weights, minlength=n_orders)[codes])
+        
+        # Selisih pembulatan ke baris pertama berbobot terbesar di tiap pesanan
+        residual = amount - np.bincount(codes, np.nan_to_num(allocated), minlength=n_orders)[codes]
+        max_weight = np.zeros(n_orders)
+        np.maximum.at(max_weight, codes, weights)
+        candidates = np.flatnonzero(weights == max_weight[codes])
+        _, first = np.unique(codes[candidates], return_index=True)
+        anchors = candidates[first]
+        allocated[anchors] += residual[anchors]
+        
+        if pd.api.types.is_integer_dtype(merged['Total settlement amount']):
+            allocated = allocated.astype('int64')
+        return merged.assign(**{'Allocated Revenue': allocated})
+    
+    @staticmethod
+    def _positive(series):
+        # Nilai kosong, negatif atau bukan angka tidak dipakai sebagai bobot
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        return np.where(np.isfinite(values) & (values > 0), values, 0.0)
+    
+    @perf.timed('Waktu pesanan')
+    def add_order_times(self, merged):
+        """Menambahkan kolom 'Order Time' (datetime) dari kolom tanggal pesanan, jika ada"""
+        date_column = find_date_column(merged.columns)
+        if not date_column:
+            return merged
+        try:
+            # Ekspor marketplace memakai format hari/bulan/tahun
+            order_times = pd.to_datetime(merged[date_column], dayfirst=True)
+        except Exception:
+            return merged
+        return merged.assign(**{'Order Time': order_times})
+    
+    @perf.timed('Biaya per baris')
+    def resolve_line_costs(self, merged, cost_data):
+        """Menentukan biaya satuan tiap baris sesuai tanggal pesanan ('Unit Cost', 'Line Cost' & 'Cost Source').
+        
+        Kunci biaya dipilih per baris lewat match_cost_keys (SKU + variasi, SKU,
+        nama produk, lalu default). Revisi biaya dicocokkan dengan as-of join
+        terurut (merge_asof): revisi terakhir yang berlaku mulai pada/sebelum
+        waktu pesanan. Baris sebelum revisi pertama memakai revisi paling awal;
+        baris tanpa tanggal memakai biaya terbaru; baris tanpa biaya bernilai 0.
+        """
+        table = self.cost_table(cost_data)
+        names = pd.Index(table['Product Name'].unique())
+        table_codes = names.get_indexer(table['Product Name'])
+        line_codes, line_source = self.match_cost_keys(merged, names)
+        
+        # Revisi paling awal & terbaru per produk (tabel sudah urut per tanggal); minimal satu
+        # elemen agar indeks baris tanpa biaya tetap valid saat data biaya kosong
+        first_cost = np.zeros(max(len(names), 1))
+        latest = np.zeros(len(names))
+        if len(table):
+            costs = table['Cost per Unit'].to_numpy()
+            first_cost[table_codes[::-1]] = costs[::-1]
+            latest[table_codes] = costs
+        unit_cost = np.where(line_codes >= 0, first_cost[np.maximum(line_codes, 0)], 0.0)
+        
+        if 'Order Time' in merged.columns:
+            times = merged['Order Time'].to_numpy()
+            dated = (line_codes >= 0) & ~np.isnat(times)
+            undated = (line_codes >= 0) & np.isnat(times)
+            unit_cost[undated] = latest[line_codes[undated]]
+            
+            revisions = table[table['Effective From'].notna()]
+            if dated.any() and len(revisions):
+                positions = np.flatnonzero(dated)
+                lines = pd.DataFrame({
+                    'time': times[positions],
+                    'code': line_codes[positions],
+                    'position': positions
+                }).sort_values('time', kind='stable')
+                right = pd.DataFrame({
+                    'time': revisions['Effective From'].to_numpy(),
+                    'code': names.get_indexer(revisions['Product Name']),
+                    'cost': revisions['Cost per Unit'].to_numpy()
+                }).sort_values('time', kind='stable')
+                # Revisi tanpa tanggal berlaku sejak awal
+                undated_base = table[table['Effective From'].isna()]
+                if len(undated_base):
+                    right = pd.concat([pd.DataFrame({
+                        'time': pd.Timestamp.min,
+                        'code': names.get_indexer(undated_base['Product Name']),
+                        'cost': undated_base['Cost per Unit'].to_numpy()
+                    }), right], ignore_index=True)
+                matched = pd.merge_asof(lines, right, on='time', by='code', direction='backward')
+                found = matched['cost'].notna().to_numpy()
+                unit_cost[matched['position'].to_numpy()[found]] = matched['cost'].to_numpy()[found]
+        else:
+            known = line_codes >= 0
+            unit_cost[known] = latest[line_codes[known]]
+        
+        quantity = merged['Quantity'].to_numpy(dtype='float64', na_value=0.0)
+        return merged.assign(**{
+            'Unit Cost': unit_cost,
+            'Line Cost': quantity * unit_cost,
+            'Cost Source': line_source
+        })
+    
+    def match_cost_keys(self, merged, names):
+        """Posisi kunci biaya di `names` (-1 = tanpa biaya) & tingkat kecocokan per baris.
+        
+        Pencocokan dilakukan pada kombinasi unik (Seller SKU, Variation, Product
+        Name), bukan per baris: kunci tiap tingkat dicari sekaligus dengan
+        get_indexer, lalu tingkat pertama yang cocok dipakai.
+        """
+        key_columns = [col for col in ('Seller SKU', 'Variation', 'Product Name') if col in merged.columns]
+        line_combo = merged.groupby(key_columns, observed=True, dropna=False, sort=False).ngroup().to_numpy()
+        _, first_rows = np.unique(line_combo, return_index=True)
+        combos = merged[key_columns].iloc[first_rows].reset_index(drop=True)
+        
+        def key_text(col):
+            if col not in combos.columns:
+                return pd.Series(pd.NA, index=combos.index, dtype='string')
+            return combos[col].astype(object).astype('string')
+        
+        sku, variation = key_text('Seller SKU'), key_text('Variation')
+        candidates = [
+            SKU_KEY_PREFIX + sku + VARIATION_SEPARATOR + variation.where(variation != ''),
+            SKU_KEY_PREFIX + sku,
+            key_text('Product Name'),
+            pd.Series(DEFAULT_COST_KEY, index=combos.index, dtype='string')
+        ]
+        codes = np.column_stack([
+            names.get_indexer(candidate.astype(object).where(candidate.notna(), None))
+            for candidate in candidates
+        ]) if len(combos) else np.empty((0, len(candidates)), dtype='int64')
+        
+        matched = codes >= 0
+        level = np.where(matched.any(axis=1), matched.argmax(axis=1), len(candidates))
+        combo_codes = np.where(level < len(candidates),
+                               codes[np.arange(len(combos)), np.minimum(level, len(candidates) - 1)], -1)
+        line_source = pd.Categorical.from_codes(level[line_combo], COST_SOURCES)
+        return combo_codes[line_combo], line_source
+    
+    @perf.timed('Kubus penjualan')
+    def build_cube(self, merged):
+        """Kubus produk × hari (lihat sales_cube) untuk ringkasan & filter tanggal tanpa groupby ulang"""
+        return SalesCube.from_lines(merged)
+    
+    @perf.timed('Ringkasan produk')
+    def summarize_products(self, merged, cube=None):
+        """Ringkasan kuantitas & pendapatan per SKU/produk/variasi (dijumlahkan dari kubus penjualan)"""
+        if cube is None:
+            cube = self.build_cube(merged)
+        return cube.by_product()
+    
+    @perf.timed('Perhitungan biaya')
+    def apply_costs(self, summary):
+        """Menambahkan perhitungan biaya, profit & pembagian ke ringkasan.
+        
+        'Total Cost' berasal dari biaya per baris (lihat resolve_line_costs);
+        'Cost per Unit' adalah rata-rata tertimbangnya.
+        """
+        summary.insert(
+            summary.columns.get_loc('Total Cost'), 'Cost per Unit',
+            (summary['Total Cost'] / summary['TotalQty']).where(summary['TotalQty'] > 0, 0.0)
+        )
+        summary['Profit'] = summary['Revenue'] - summary['Total Cost']
+        summary['Profit Margin %'] = (summary['Profit'] / summary['Revenue'] * 100).round(2)
+        summary['Share 60%'] = summary['Profit'] * 0.6
+        summary['Share 40%'] = summary['Profit'] * 0.4
+        return summary
+    
+    @perf.timed('Agregat')
+    def build_aggregates(self, merged, summary, cube=None):
+        """Menghitung sekali semua agregat yang dipakai dasbor, analisis, ringkasan AI & laporan.
+        
+        Ringkasan per SKU & harian dijumlahkan dari kubus penjualan (dibangun
+        bila `cube` tidak diberikan). Mengembalikan dict berisi:
+        - 'orders'     : satu baris per Order ID (kuantitas, pendapatan, jumlah baris, waktu pesanan)
+        - 'by_sku'     : ringkasan per Seller SKU
+        - 'by_product' : ringkasan per SKU/produk/variasi (sama dengan summary)
+        - 'daily'      : penjualan harian
+        - 'totals'     : total keseluruhan (pesanan, kuantitas, pendapatan, biaya, profit, dst.)
+        - 'date_column': nama kolom tanggal yang dipakai, atau None
+        - 'cube'       : SalesCube untuk ringkasan per rentang tanggal & rincian per SKU
+        """
+        if cube is None:
+            cube = self.build_cube(merged)
+        date_column = find_date_column(merged.columns)
+        order_times = merged['Order Time'] if 'Order Time' in merged.columns else None
+        
+        # Tabel tingkat pesanan
+        order_agg = {
+            'Quantity': ('Quantity', 'sum'),
+            'Revenue': ('Total settlement amount', 'first'),
+            'Lines': ('Quantity', 'size')
+        }
+        if order_times is not None:
+            order_lines = merged[['Order ID', 'Quantity', 'Total settlement amount', 'Order Time']]
+            order_agg['Order Time'] = ('Order Time', 'first')
+        else:
+            order_lines = merged[['Order ID', 'Quantity', 'Total settlement amount']]
+        orders = order_lines.groupby('Order ID', as_index=False, sort=False).agg(**order_agg)
+        
+        # Ringkasan berdasarkan SKU
+        summary_by_sku = self.apply_sku_costs(cube.by_sku())
+        
+        # Analisis penjualan harian
+        if order_times is not None:
+            daily_sales = cube.daily()
+        else:
+            daily_sales = pd.DataFrame({
+                'Order Date': ['Data tidak tersedia' if date_column else 'Kolom tanggal tidak ditemukan'],
+                'Daily Quantity': [0],
+                'Daily Orders': [0],
+                'Daily Revenue': [0]
+            })
+        
+        date_start = order_times.min() if order_times is not None else None
+        date_end = order_times.max() if order_times is not None else None
+        
+        # Total keseluruhan (pendapatan dihitung per pesanan unik)
+        total_orders = len(orders)
+        total_revenue = orders['Revenue'].sum()
+        total_cost = summary['Total Cost'].sum()
+        total_profit = total_revenue - total_cost
+        totals = {
+            'total_orders': total_orders,
+            'total_qty': orders['Quantity'].sum(),
+            'total_revenue': total_revenue,
+            'total_cost': total_cost,
+            'total_profit': total_profit,
+            'share_60': total_profit * 0.6,
+            'share_40': total_profit * 0.4,
+            'avg_order_value': total_revenue / total_orders if total_orders > 0 else 0,
+            'avg_profit_per_order': total_profit / total_orders if total_orders > 0 else 0,
+            'profit_margin': (total_profit / total_revenue * 100) if total_revenue > 0 else 0,
+            'avg_margin': summary['Profit Margin %'].mean(),
+            'date_start': None if pd.isna(date_start) else date_start,
+            'date_end': None if pd.isna(date_end) else date_end
+        }
+        
+        return {
+            'orders': orders,
+            'by_sku': summary_by_sku,
+            'by_product': summary,
+            'daily': daily_sales,
+            'totals': totals,
+            'date_column': date_column,
+            'cube': cube
+        }
+    
+    def apply_sku_costs(self, summary_by_sku):
+        """Menambahkan biaya per unit, profit & pembagian ke ringkasan per SKU"""
+        # Biaya per SKU dari biaya per baris (rata-rata tertimbang per unit)
+        summary_by_sku.insert(
+            summary_by_sku.columns.get_loc('Total Cost'), 'Cost per Unit',
+            (summary_by_sku['Total Cost'] / summary_by_sku['Total Quantity'])
+            .where(summary_by_sku['Total Quantity'] > 0, 0.0)
+        )
+        summary_by_sku['Profit'] = summary_by_sku['Total Revenue'] - summary_by_sku['Total Cost']
+        summary_by_sku['Profit Margin %'] = (summary_by_sku['Profit'] / summary_by_sku['Total Revenue'] * 100).round(2)
+        summary_by_sku['Share 60%'] = summary_by_sku['Profit'] * 0.6
+        summary_by_sku['Share 40%'] = summary_by_sku['Profit'] * 0.4
+        return summary_by_sku
+    
+    @perf.timed('Ekspor Excel')
+    def create_excel_report(self, merged_data, summary_data, cost_data, aggregates=None,
+                            include_raw_data=False, output=None, progress=None):
+        """Membuat laporan Excel.
+        
+        Workbook ditulis dalam mode constant_memory ke `output` (path atau objek
+        file); jika None, ke file sementara di disk yang dikembalikan dalam posisi
+        awal. `include_raw_data` menambahkan lembar "Data Mentah" berisi seluruh
+        baris gabungan (otomatis dipecah per 1.048.575 baris). `progress(fraksi,
+        lembar)` (opsional) dipanggil setiap potongan baris selesai ditulis.
+        """
+        if aggregates is None:
+            aggregates = self.build_aggregates(merged_data, summary_data)
+        totals = aggregates['totals']
+        
+        # Produk terbaik berdasarkan profit
+        top_products = summary_data.nlargest(10, 'Profit')
+        
+        # Buat workbook (mode constant_memory: baris ditulis berurutan, memori datar)
+        workbook, output = open_workbook(output)
+        try:
+            # Tentukan format
+            title_format = workbook.add_format({
+                'bold': True, 'font_size': 16, 'align': 'center',
+                'bg_color': '#4472C4', 'font_color': 'white'
+            })
+            
+            header_format = workbook.add_format({
+                'bold': True, 'font_size': 12,
+                'bg_color': '#D9E2F3', 'border': 1
+            })
+            
+            currency_format = workbook.add_format({
+                'num_format': '#,##0', 'border': 1
+            })
+            
+            number_format = workbook.add_format({
+                'num_format': '#,##0', 'border': 1
+            })
+            
+            percent_format = workbook.add_format({
+                'num_format': '0.00%', 'border': 1
+            })
+            
+            table_header_format = workbook.add_format({
+                'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'
+            })
+            
+            # Lembar ringkasan
+            overview_sheet = workbook.add_worksheet('Ringkasan')
+            overview_sheet.set_column('A:B', 25)
+            overview_sheet.set_column('C:C', 20)
+            
+            row = 0
+            overview_sheet.merge_range(f'A{row+1}:C{row+1}', 'LAPORAN PENJUALAN & ANALISIS PROFIT', title_format)
+            row += 2
+            
+            # Rentang tanggal
+            date_range_start = totals['date_start'] if totals['date_start'] is not None else datetime.now()
+            date_range_end = totals['date_end'] if totals['date_end'] is not None else datetime.now()
+            
+            overview_sheet.write(row, 0, f'Periode:', header_format)
+            overview_sheet.write(row, 1, f'{date_range_start.strftime("%d/%m/%Y")} - {date_range_end.strftime("%d/%m/%Y")}')
+            row += 1
+            
+            overview_sheet.write(row, 0, f'Dibuat:', header_format)
+            overview_sheet.write(row, 1, f'{datetime.now().strftime("%d %B %Y %H:%M")}')
+            row += 3
+            
+            # Metrik kunci
+            overview_sheet.write(row, 0, 'RINGKASAN PENJUALAN & PROFIT', header_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Total Pesanan:')
+            overview_sheet.write(row, 1, totals['total_orders'], number_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Total Kuantitas:')
+            overview_sheet.write(row, 1, totals['total_qty'], number_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Total Pendapatan:')
+            overview_sheet.write(row, 1, totals['total_revenue'], currency_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Total Biaya:')
+            overview_sheet.write(row, 1, totals['total_cost'], currency_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Total Profit:')
+            overview_sheet.write(row, 1, totals['total_profit'], currency_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Bagian 60%:')
+            overview_sheet.write(row, 1, totals['share_60'], currency_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Bagian 40%:')
+            overview_sheet.write(row, 1, totals['share_40'], currency_format)
+            row += 2
+            
+            # Metrik tambahan
+            overview_sheet.write(row, 0, 'Nilai Rata-rata Pesanan:')
+            overview_sheet.write(row, 1, totals['avg_order_value'], currency_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Rata-rata Profit per Pesanan:')
+            overview_sheet.write(row, 1, totals['avg_profit_per_order'], currency_format)
+            row += 1
+            overview_sheet.write(row, 0, 'Margin Profit Keseluruhan:')
+            overview_sheet.write(row, 1, totals['profit_margin'] / 100, percent_format)
+            
+            # Lembar tabel lainnya
+            sheets = [
+                ('Ringkasan per Produk', summary_data),
+                ('Ringkasan per SKU', aggregates['by_sku']),
+                ('Penjualan Harian', aggregates['daily']),
+                ('Produk Teratas', top_products)
+            ]
+            
+            # Daftar biaya produk
+            if cost_data:
+                sheets.append(('Daftar Biaya Produk', self.cost_table(cost_data)))
+            
+            # Rekonsiliasi: pesanan cocok (beserta selisihnya), pesanan tanpa settlement & settlement tanpa pesanan
+            if 'reconciliation' in aggregates:
+                sheets.append(('Rekonsiliasi', aggregates['reconciliation']))
+                # Snapshot lama belum menyimpan tabel pesanan cocok
+                if 'matched' in aggregates:
+                    sheets.append(('Pesanan Cocok', aggregates['matched'].reset_index()))
+                sheets.append(('Pesanan Tanpa Settlement', aggregates['order_only'].reset_index()))
+                sheets.append(('Settlement Tanpa Pesanan', aggregates['settlement_only'].reset_index()))
+            
+            # Seluruh baris gabungan untuk auditor
+            if include_raw_data:
+                sheets.append(('Data Mentah', merged_data))
+            
+            # Kemajuan dihitung dari jumlah baris tabel yang sudah ditulis
+            total_rows = max(sum(len(df) for _, df in sheets), 1)
+            written = 0
+            for sheet_name, df in sheets:
+                if progress is not None:
+                    progress(written / total_rows, sheet_name)
+                
+                def on_chunk(rows, sheet_name=sheet_name):
+                    nonlocal written
+                    written += rows
+                    progress(written / total_rows, sheet_name)
+                
+                write_frame(workbook, sheet_name, df, table_header_format,
+                            progress=on_chunk if progress is not None else None)
+        finally:
+            workbook.close()
+        
+        if hasattr(output, 'seek'):
+            output.seek(0)
+        return output
@@ -1,5 +1,8 @@
 import streamlit as st
 import pandas as pd
+import copy
+import functools
+import hashlib
 import json
 import os
 from datetime import datetime
@@ -12,6 +15,24 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from openai import OpenAI
 
+from excel_reader import READER_VERSION, read_income_excel, read_orders_excel
+from collections import deque
+import perf
+from data_export import EXPORT_FORMATS, available_formats, write_export
+from income_core import (
+    DEFAULT_COST_KEY, RECONCILIATION_STATUSES, IncomeApp as BaseIncomeApp, add_cost_revision, cost_key,
+    current_costs, frame_fingerprint
+)
+from memory_utils import memory_report
+from report_jobs import FAILED, ReportJobs
+from sales_cube import SalesCube
+from session_store import SessionDataStore, SessionRegistry
+from shared_cache import SharedDatasetCache
+from snapshots import SnapshotStore, snapshots_available
+from sql_console import PAGE_SIZE, TIMEOUT_SECONDS, SqlConsole, engine_name, table_schema
+from upload_cache import UploadCache
+from warehouse import DEFAULT_PATH as WAREHOUSE_PATH, Warehouse
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="📊 Analisis Pendapatan & Pesanan",
@@ -96,270 +117,75 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class IncomeApp:
-    def __init__(self):
-        self.cost_file = "product_costs.json"
-        self.load_cost_data()
-    
-    def load_cost_data(self):
-        """Memuat data biaya dari file JSON"""
-        try:
-            if os.path.exists(self.cost_file):
-                with open(self.cost_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            return {}
-        return {}
-    
-    def save_cost_data(self, cost_data):
-        """Menyimpan data biaya ke file JSON"""
-        with open(self.cost_file, 'w', encoding='utf-8') as f:
-            json.dump(cost_data, f, ensure_ascii=False, indent=2)
-    
-    def get_product_cost(self, product_name, cost_data):
-        """Mendapatkan biaya produk dari data biaya"""
-        return float(cost_data.get(product_name, 0.0))
-    
-    def process_data(self, pesanan_data, income_data, cost_data):
-        """Memproses dan menggabungkan data"""
-        # Filter pesanan selesai
-        df1 = pesanan_data[pesanan_data['Order Status'] == 'Selesai']
-        
-        # Hapus duplikat dari data pendapatan
-        df2 = income_data.drop_duplicates(subset=['Order/adjustment ID'])
-        
-        # Gabungkan data
-        merged = pd.merge(df1, df2, left_on='Order ID', right_on='Order/adjustment ID', how='inner')
-        
-        if merged.empty:
-            return None, None
-        
-        # Buat ringkasan
-        summary = merged.groupby(['Seller SKU', 'Product Name', 'Variation'], as_index=False).agg(
-            TotalQty=('Quantity', 'sum'),
-            Revenue=('Total settlement amount', 'sum')
-        )
-        
-        # Tambahkan perhitungan biaya
-        summary['Cost per Unit'] = summary['Product Name'].apply(
-            lambda x: self.get_product_cost(x, cost_data)
-        )
-        summary['Total Cost'] = summary['TotalQty'] * summary['Cost per Unit']
-        summary['Profit'] = summary['Revenue'] - summary['Total Cost']
-        summary['Profit Margin %'] = (summary['Profit'] / summary['Revenue'] * 100).round(2)
-        summary['Share 60%'] = summary['Profit'] * 0.6
-        summary['Share 40%'] = summary['Profit'] * 0.4
-        
-        return merged, summary
-    
-    def create_excel_report(self, merged_data, summary_data, cost_data):
-        """Membuat laporan Excel"""
-        output = io.BytesIO()
-        
-        # Hitung total
-        unique_orders = merged_data.drop_duplicates(subset=['Order ID'])
-        total_orders = unique_orders['Order ID'].nunique()
-        total_revenue = unique_orders['Total settlement amount'].sum()
-        total_qty = merged_data['Quantity'].sum()
-        
-        # Ringkasan berdasarkan SKU
-        summary_by_sku = (
-            merged_data.groupby('Seller SKU', as_index=False)
-            .agg({
-                'Quantity': 'sum',
-                'Order ID': 'nunique',
-                'Total settlement amount': 'sum'
-            })
-            .rename(columns={
-                'Quantity': 'Total Quantity',
-                'Order ID': 'Total Orders',
-                'Total settlement amount': 'Total Revenue'
-            })
-        )
-        
-        # Dapatkan nama produk pertama untuk setiap SKU
-        sku_products = merged_data.groupby('Seller SKU')['Product Name'].first().to_dict()
-        summary_by_sku['Cost per Unit'] = summary_by_sku['Seller SKU'].map(
-            lambda sku: self.get_product_cost(sku_products.get(sku, ''), cost_data)
-        )
-        summary_by_sku['Total Cost'] = summary_by_sku['Total Quantity'] * summary_by_sku['Cost per Unit']
-        summary_by_sku['Profit'] = summary_by_sku['Total Revenue'] - summary_by_sku['Total Cost']
-        summary_by_sku['Profit Margin %'] = (summary_by_sku['Profit'] / summary_by_sku['Total Revenue'] * 100).round(2)
-        summary_by_sku['Share 60%'] = summary_by_sku['Profit'] * 0.6
-        summary_by_sku['Share 40%'] = summary_by_sku['Profit'] * 0.4
-        
-        # Hitung total biaya dan profit
-        total_cost = summary_by_sku['Total Cost'].sum()
-        total_profit = total_revenue - total_cost
-        total_share_60 = total_profit * 0.6
-        total_share_40 = total_profit * 0.4
-        
-        # Analisis penjualan harian
-        date_column = None
-        possible_date_columns = [
-            'Order created time(UTC)', 'Order creation time', 'Order Creation Time', 
-            'Creation Time', 'Date', 'Order Date', 'Order created time', 'Created time'
-        ]
-        
-        for col in possible_date_columns:
-            if col in merged_data.columns:
-                date_column = col
-                break
-        
-        if date_column:
-            try:
-                merged_data_copy = merged_data.copy()
-                merged_data_copy['Order Date'] = pd.to_datetime(merged_data_copy[date_column]).dt.date
-                daily_sales = (
-                    merged_data_copy.groupby('Order Date', as_index=False)
-                    .agg({
-                        'Quantity': 'sum',
-                        'Order ID': 'nunique',
-                        'Total settlement amount': 'sum'
-                    })
-                    .rename(columns={
-                        'Quantity': 'Daily Quantity',
-                        'Order ID': 'Daily Orders',
-                        'Total settlement amount': 'Daily Revenue'
-                    })
-                )
-            except:
-                daily_sales = pd.DataFrame({
-                    'Order Date': ['Data tidak tersedia'],
-                    'Daily Quantity': [0],
-                    'Daily Orders': [0],
-                    'Daily Revenue': [0]
-                })
-        else:
-            daily_sales = pd.DataFrame({
-                'Order Date': ['Kolom tanggal tidak ditemukan'],
-                'Daily Quantity': [0],
-                'Daily Orders': [0],
-                'Daily Revenue': [0]
-            })
-        
-        # Produk terbaik berdasarkan profit
-        top_products = summary_data.nlargest(10, 'Profit')
-        
-        # Buat penulis Excel
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            workbook = writer.book
-            
-            # Tentukan format
-            title_format = workbook.add_format({
-                'bold': True, 'font_size': 16, 'align': 'center',
-                'bg_color': '#4472C4', 'font_color': 'white'
-            })
-            
-            header_format = workbook.add_format({
-                'bold': True, 'font_size': 12,
-                'bg_color': '#D9E2F3', 'border': 1
-            })
-            
-            currency_format = workbook.add_format({
-                'num_format': '#,##0', 'border': 1
-            })
-            
-            number_format = workbook.add_format({
-                'num_format': '#,##0', 'border': 1
-            })
-            
-            percent_format = workbook.add_format({
-                'num_format': '0.00%', 'border': 1
-            })
-            
-            # Lembar ringkasan
-            overview_sheet = workbook.add_worksheet('Ringkasan')
-            overview_sheet.set_column('A:B', 25)
-            overview_sheet.set_column('C:C', 20)
-            
-            row = 0
-            overview_sheet.merge_range(f'A{row+1}:C{row+1}', 'LAPORAN PENJUALAN & ANALISIS PROFIT', title_format)
-            row += 2
-            
-            # Rentang tanggal
-            if date_column and date_column in merged_data.columns:
-                try:
-                    date_range_start = pd.to_datetime(merged_data[date_column]).min()
-                    date_range_end = pd.to_datetime(merged_data[date_column]).max()
-                except:
-                    date_range_start = datetime.now()
-                    date_range_end = datetime.now()
-            else:
-                date_range_start = datetime.now()
-                date_range_end = datetime.now()
-            
-            overview_sheet.write(row, 0, f'Periode:', header_format)
-            overview_sheet.write(row, 1, f'{date_range_start.strftime("%d/%m/%Y")} - {date_range_end.strftime("%d/%m/%Y")}')
-            row += 1
-            
-            overview_sheet.write(row, 0, f'Dibuat:', header_format)
-            overview_sheet.write(row, 1, f'{datetime.now().strftime("%d %B %Y %H:%M")}')
-            row += 3
-            
-            # Metrik kunci
-            overview_sheet.write(row, 0, 'RINGKASAN PENJUALAN & PROFIT', header_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Total Pesanan:')
-            overview_sheet.write(row, 1, total_orders, number_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Total Kuantitas:')
-            overview_sheet.write(row, 1, total_qty, number_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Total Pendapatan:')
-            overview_sheet.write(row, 1, total_revenue, currency_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Total Biaya:')
-            overview_sheet.write(row, 1, total_cost, currency_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Total Profit:')
-            overview_sheet.write(row, 1, total_profit, currency_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Bagian 60%:')
-            overview_sheet.write(row, 1, total_share_60, currency_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Bagian 40%:')
-            overview_sheet.write(row, 1, total_share_40, currency_format)
-            row += 2
-            
-            # Hitung metrik tambahan
-            avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-            avg_profit_per_order = total_profit / total_orders if total_orders > 0 else 0
-            overall_profit_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
-            
-            overview_sheet.write(row, 0, 'Nilai Rata-rata Pesanan:')
-            overview_sheet.write(row, 1, avg_order_value, currency_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Rata-rata Profit per Pesanan:')
-            overview_sheet.write(row, 1, avg_profit_per_order, currency_format)
-            row += 1
-            overview_sheet.write(row, 0, 'Margin Profit Keseluruhan:')
-            overview_sheet.write(row, 1, overall_profit_margin / 100, percent_format)
-            
-            # Tulis lembar lainnya
-            summary_data.to_excel(writer, index=False, sheet_name='Ringkasan per Produk')
-            summary_by_sku.to_excel(writer, index=False, sheet_name='Ringkasan per SKU')
-            daily_sales.to_excel(writer, index=False, sheet_name='Penjualan Harian')
-            top_products.to_excel(writer, index=False, sheet_name='Produk Teratas')
-            
-            # Daftar biaya produk
-            if cost_data:
-                cost_df = pd.DataFrame(list(cost_data.items()), columns=["Product Name", "Cost per Unit"])
-                cost_df = cost_df.sort_values(by="Product Name")
-                cost_df.to_excel(writer, index=False, sheet_name='Daftar Biaya Produk')
-        
-        output.seek(0)
-        return output
+# Cache Parquet untuk file unggahan (dibagi antar sesi & rerun)
+upload_cache = UploadCache()
+
+# Snapshot hasil proses di disk, agar hasil tidak hilang saat server dimulai ulang
+snapshot_store = SnapshotStore() if snapshots_available() else None
+
+# Anggaran memori cache dataset bersama (hasil baca & proses yang dipakai banyak sesi)
+SHARED_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+
+# Anggaran memori laporan Excel yang sudah jadi (unduhan ulang tanpa membuat ulang)
+REPORT_CACHE_BYTES = 512 * 1024 * 1024
+
+# Jumlah hasil process_data yang disimpan per sesi
+PROCESS_CACHE_SIZE = 4
+
+# Jumlah rerun terakhir yang ditampilkan di panel performa
+PERF_HISTORY_RUNS = 20
 
+def save_perf_run(replace_same=False):
+    """Menyimpan catatan tahap rerun saat ini ke riwayat sesi.
     
+    `replace_same`: rerun ini menggantikan rerun lama yang tahap utamanya sama
+    (fragmen berkala tidak mendesak rerun lain keluar riwayat).
+    """
+    recorder = perf.finish_run()
+    if recorder is not None and recorder.records:
+        runs = st.session_state.perf_runs
+        if replace_same:
+            top = [r['stage'] for r in recorder.records if r['depth'] == 0]
+            for run in [run for run in runs if [r['stage'] for r in run['records'] if r['depth'] == 0] == top]:
+                runs.remove(run)
+        st.session_state.perf_run_id += 1
+        runs.append({
+            'run': st.session_state.perf_run_id,
+            'started_at': recorder.started_at,
+            'records': recorder.records
+        })
 
+def timed_fragment(name, run_every=None):
+    """st.fragment yang waktunya tercatat di panel performa.
+    
+    Di dalam rerun penuh, fragmen menjadi satu tahap di perekam main(); rerun
+    fragmen saja dicatat sebagai rerun tersendiri.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            if perf.current_recorder() is not None:
+                with perf.stage(name):
+                    return fn(*args, **kwargs)
+            perf.start_run()
+            try:
+                with perf.stage(name):
+                    return fn(*args, **kwargs)
+            finally:
+                save_perf_run(replace_same=run_every is not None)
+        return st.fragment(body, run_every=run_every)
+    return decorator
+
+class IncomeApp(BaseIncomeApp):
+    """IncomeApp dengan fitur yang membutuhkan antarmuka Streamlit"""
+    
     def generate_ai_summary(self, summary_df):
         # --- Hitung metrik BERSIH (tanpa duplikat order) ---
-        if st.session_state.merged_data is None:
+        if st.session_state.aggregates is None:
             return "Data belum diproses."
 
-        unique_orders = st.session_state.merged_data.drop_duplicates(subset=['Order ID'])
-        total_r = unique_orders['Total settlement amount'].sum()
+        totals = st.session_state.aggregates['totals']
+        total_r = totals['total_revenue']
         total_cost = summary_df['Total Cost'].sum()
         total_p = total_r - total_cost
         avg_m   = summary_df['Profit Margin %'].mean()
@@ -398,6 +224,352 @@ class IncomeApp:
         #return prompt  # opsional, sudah tampil di text_area
         
 
+@st.cache_resource(show_spinner=False)
+def get_dataset_cache():
+    """Cache dataset bersama untuk semua sesi dalam proses server ini"""
+    return SharedDatasetCache(SHARED_CACHE_BYTES)
+
+@st.cache_resource(show_spinner=False)
+def get_report_jobs():
+    """Pembuatan laporan Excel di thread latar & cache laporan jadi untuk semua sesi"""
+    return ReportJobs(max_bytes=REPORT_CACHE_BYTES)
+
+@st.cache_resource(show_spinner=False)
+def get_session_registry():
+    """Daftar penyimpanan frame semua sesi dalam proses server ini"""
+    return SessionRegistry()
+
+def session_store():
+    """Penyimpanan frame besar sesi ini (dikompresi/dipindah ke disk saat sesi menganggur)"""
+    if 'data_store' not in st.session_state:
+        st.session_state.data_store = get_session_registry().register(
+            SessionDataStore(release=lambda key, token: get_dataset_cache().release(key, token))
+        )
+    return st.session_state.data_store
+
+# Agregat besar (tabel per pesanan/SKU/harian, rekonsiliasi per ID & kubus penjualan) disimpan di
+# penyimpanan sesi agar ikut dikompresi/dipindah ke disk & dihitung dalam anggaran memori;
+# state sesi hanya memegang tabel kecil (totals, reconciliation, by_product)
+STORED_AGGREGATES = ('orders', 'by_sku', 'daily', 'matched', 'order_only', 'settlement_only', 'cube')
+
+def set_session_aggregates(aggregates):
+    """Menyimpan hasil build_aggregates sesi ini (dipanggil setelah merged_data disimpan)"""
+    store = session_store()
+    for name in STORED_AGGREGATES:
+        if name not in aggregates:
+            store.drop(f"aggregate_{name}")
+        elif name == 'cube':
+            # Kubus tidak ditulis ke disk: dibangun ulang dari data gabungan bila sudah dilepas
+            store.put('aggregate_cube', aggregates[name], reload=lambda: SalesCube.from_lines(store.get('merged_data')))
+        else:
+            store.put(f"aggregate_{name}", aggregates[name])
+    st.session_state.aggregates = {
+        name: value for name, value in aggregates.items() if name not in STORED_AGGREGATES
+    }
+
+def session_aggregate(name):
+    """Satu agregat sesi ini (dipulihkan dari penyimpanan sesi bila perlu); None bila tidak ada"""
+    if name in STORED_AGGREGATES:
+        return session_store().get(f"aggregate_{name}")
+    return (st.session_state.aggregates or {}).get(name)
+
+def session_aggregates():
+    """Semua tabel agregat sesi ini (tanpa kubus), mis. untuk laporan Excel"""
+    aggregates = dict(st.session_state.aggregates or {})
+    for name in STORED_AGGREGATES:
+        if name != 'cube' and session_store().has(f"aggregate_{name}"):
+            aggregates[name] = session_aggregate(name)
+    return aggregates
+
+def session_token():
+    """Token pemegang referensi cache bersama untuk sesi ini"""
+    return session_store().token
+
+def load_uploaded_excel(uploaded_file, reader, data_key):
+    """Membaca file Excel unggahan ke penyimpanan sesi melalui cache bersama & cache Parquet berbasis hash konten.
+    
+    Mengembalikan True bila data tidak perlu dibaca ulang dari Excel. Jumlah baris
+    & pratinjau disimpan di state sesi, sehingga frame mentah boleh dilepas setelah diproses.
+    """
+    data = uploaded_file.getvalue()
+    store = session_store()
+    
+    # Pembaca & versinya ikut menjadi bagian kunci agar hasil baca lama tidak tertukar
+    fingerprint = upload_cache.content_hash(data, f"{reader.__name__}-v{READER_VERSION}")
+    
+    # File yang sama sudah dimuat di sesi ini: tidak perlu dibaca ulang
+    if st.session_state.get(f"{data_key}_fingerprint") == fingerprint and store.has(data_key):
+        return True
+    
+    # Sesi lain dengan file yang sama memakai DataFrame yang sama; jika belum
+    # ada di memori, coba cache Parquet di disk sebelum membaca Excel
+    from_disk = False
+    
+    def read():
+        nonlocal from_disk
+        df, from_disk = upload_cache.load(fingerprint, lambda: reader(data))
+        return df
+    
+    def reload():
+        # Frame yang sudah dilepas dimuat ulang tanpa perlu ditulis ke disk sesi
+        return get_dataset_cache().acquire(fingerprint, store.token, read)[0]
+    
+    with perf.stage(f"Baca {uploaded_file.name}") as info:
+        df, shared = get_dataset_cache().acquire(fingerprint, store.token, read)
+        from_cache = shared or from_disk
+        info['rows_out'] = len(df)
+    # Frame sebelumnya (file lain) ikut melepas referensi cache bersamanya
+    store.put(data_key, df, shared_key=fingerprint, reload=reload)
+    st.session_state[f"{data_key}_fingerprint"] = fingerprint
+    st.session_state[f"{data_key}_name"] = uploaded_file.name
+    st.session_state[f"{data_key}_rows"] = len(df)
+    st.session_state[f"{data_key}_preview"] = df.head()
+    st.session_state[f"{data_key}_memory"] = memory_report(df)
+    return from_cache
+
+def show_memory_report(data_key):
+    """Menampilkan pemakaian memori per kolom setelah optimasi tipe data"""
+    report = st.session_state.get(f"{data_key}_memory")
+    if report is None:
+        return
+    current_mb = report['MB'].sum()
+    baseline_mb = report['MB (bawaan)'].sum()
+    saved = (1 - current_mb / baseline_mb) * 100 if baseline_mb > 0 else 0
+    st.caption(f"💾 Memori: {current_mb:,.1f} MB (tanpa optimasi ±{baseline_mb:,.1f} MB, hemat {saved:.0f}%)")
+    st.dataframe(
+        report.style.format({'MB': '{:,.2f}', 'MB (bawaan)': '{:,.2f}', 'Hemat %': '{:.0f}%'}),
+        use_container_width=True,
+        hide_index=True
+    )
+
+def data_fingerprint(data_key):
+    """Sidik jari data sesi: hash konten unggahan, atau hash isi DataFrame"""
+    fingerprint = st.session_state.get(f"{data_key}_fingerprint")
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(session_store().get(data_key))
+        st.session_state[f"{data_key}_fingerprint"] = fingerprint
+    return fingerprint
+
+def order_catalog():
+    """Kombinasi unik Seller SKU, Product Name & Variation dari data pesanan (untuk pilihan biaya)"""
+    store = session_store()
+    if not store.has('pesanan_data'):
+        return None
+    fingerprint = data_fingerprint('pesanan_data')
+    cached = st.session_state.get('order_catalog')
+    if cached is None or cached[0] != fingerprint:
+        orders = store.get('pesanan_data')
+        columns = [col for col in ('Seller SKU', 'Product Name', 'Variation') if col in orders.columns]
+        cached = (fingerprint, orders[columns].drop_duplicates().reset_index(drop=True))
+        st.session_state.order_catalog = cached
+    return cached[1]
+
+def show_session_memory(store):
+    """Pemakaian memori frame sesi ini & semua sesi di server"""
+    registry = get_session_registry()
+    sessions = registry.usage()
+    with st.expander("🧠 Memori Sesi"):
+        st.caption(f"Sesi ini: {store.memory_bytes() / 1024 / 1024:,.1f} MB")
+        st.dataframe(
+            store.usage().style.format({'Baris': '{:,}', 'MB Memori': '{:,.1f}', 'MB Disk': '{:,.1f}'}),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(
+            f"Semua sesi: {len(sessions)} sesi, {sessions['MB Memori'].sum():,.1f} MB "
+            f"dari anggaran {registry.max_bytes / 1024 / 1024 / 1024:,.0f} GB"
+        )
+        st.dataframe(
+            sessions.style.format({'Menganggur (menit)': '{:,.0f}', 'MB Memori': '{:,.1f}'}),
+            use_container_width=True,
+            hide_index=True
+        )
+
+def show_data_export():
+    """Ekspor data gabungan & ringkasan sebagai Parquet, CSV gzip atau Arrow IPC untuk alat BI"""
+    datasets = {
+        'Data gabungan': lambda: session_store().get('merged_data'),
+        'Ringkasan per produk': lambda: st.session_state.summary_data,
+        'Ringkasan per SKU': lambda: session_aggregate('by_sku'),
+        'Penjualan harian': lambda: session_aggregate('daily')
+    }
+    if session_store().has('aggregate_matched'):
+        datasets['Pesanan cocok'] = lambda: session_aggregate('matched').reset_index()
+    if session_store().has('aggregate_order_only'):
+        datasets['Pesanan tanpa settlement'] = lambda: session_aggregate('order_only').reset_index()
+        datasets['Settlement tanpa pesanan'] = lambda: session_aggregate('settlement_only').reset_index()
+
+    with st.expander("📦 Ekspor Data (Parquet/CSV/Arrow)"):
+        st.caption(
+            "Tanpa batas baris Excel; ditulis bertahap per potongan baris ke file sementara. "
+            "Tombol unduh menyimpan file jadi (terkompresi) di memori server; untuk ekspor "
+            "sangat besar pakai `income_batch.py --export`, yang menulis langsung ke disk."
+        )
+        name = st.selectbox("Data", list(datasets), key="export_dataset")
+        fmt = st.radio(
+            "Format",
+            available_formats(),
+            format_func=lambda key: EXPORT_FORMATS[key][0],
+            horizontal=True,
+            key="export_format"
+        )
+        if st.button("⚙️ Siapkan File", use_container_width=True):
+            label, extension, mime, _ = EXPORT_FORMATS[fmt]
+            try:
+                with st.spinner(f"Menulis {label}..."):
+                    with perf.stage(f"Ekspor {label}") as info:
+                        df = datasets[name]()
+                        info['rows_in'] = len(df)
+                        export_file = write_export(df, fmt)
+                        # Penulisan tidak menyalin seluruh frame ke memori, tetapi st.download_button
+                        # (Streamlit 1.37) hanya menerima bytes dan menyimpannya di media store di
+                        # memori: yang tertahan adalah file jadi yang sudah terkompresi
+                        with export_file:
+                            export_data = export_file.read()
+                st.download_button(
+                    label=f"💾 Unduh {label} ({len(export_data) / 1024 / 1024:,.1f} MB)",
+                    data=export_data,
+                    file_name=f"{name.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}",
+                    mime=mime,
+                    use_container_width=True
+                )
+            except Exception as e:
+                st.error(f"Kesalahan: {str(e)}")
+
+def report_key(include_raw_data):
+    """Kunci laporan: hasil proses yang ditampilkan, isi data biaya & opsi data mentah"""
+    return ":".join([
+        st.session_state.report_source or "",
+        cost_fingerprint()[:16],
+        "mentah" if include_raw_data else "ringkas"
+    ])
+
+def start_report(key, include_raw_data):
+    """Memulai pembuatan laporan Excel di thread pekerja"""
+    # Data diambil saat tombol diklik: sesi tetap bisa memproses ulang/mengubah biaya selama laporan dibuat
+    merged = session_store().get('merged_data')
+    summary = st.session_state.summary_data
+    aggregates = session_aggregates()
+    cost_data = copy.deepcopy(st.session_state.cost_data)
+    create_report = app.create_excel_report
+    
+    def build(progress):
+        report_file = create_report(merged, summary, cost_data, aggregates,
+                                    include_raw_data=include_raw_data, progress=progress)
+        with report_file:
+            return report_file.read()
+    
+    return get_report_jobs().submit(key, build)
+
+@timed_fragment('Fragmen: kemajuan laporan', run_every=1)
+def show_report_progress(key):
+    """Kemajuan pembuatan laporan; hanya bagian ini yang dijalankan ulang tiap detik"""
+    job = get_report_jobs().get(key)
+    if job is None or job.done:
+        # Selesai: jalankan ulang seluruh halaman untuk menampilkan tombol unduh
+        st.rerun()
+    st.progress(job.progress, text=f"⏳ Membuat laporan... {job.stage} ({job.progress:.0%})")
+
+def mark_cost_data_changed():
+    """Menaikkan versi data biaya agar hasil proses yang di-cache tidak dipakai lagi"""
+    st.session_state.cost_version += 1
+
+def cost_fingerprint():
+    """Hash isi data biaya (sama untuk semua sesi dengan biaya yang sama)"""
+    content = json.dumps(st.session_state.cost_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def processed_key():
+    """Kunci hasil proses lintas sesi: sidik jari kedua input & isi data biaya"""
+    return hashlib.sha256("|".join([
+        data_fingerprint('pesanan_data'),
+        data_fingerprint('income_data'),
+        cost_fingerprint()
+    ]).encode("utf-8")).hexdigest()[:16]
+
+def process_data_cached():
+    """Menjalankan process_data dengan memoisasi berdasarkan sidik jari input & versi biaya.
+    
+    Hasil yang belum ada di sesi ini diambil dari cache bersama bila sesi lain
+    sudah memproses input & biaya yang sama.
+    """
+    key = (
+        data_fingerprint('pesanan_data'),
+        data_fingerprint('income_data'),
+        st.session_state.cost_version
+    )
+    store = session_store()
+    cache = store.process_cache
+    
+    if key in cache:
+        cache.move_to_end(key)
+        st.session_state.process_cache_hits += 1
+        with perf.stage('Proses data (cache)'):
+            return cache[key][1]
+    
+    st.session_state.process_cache_misses += 1
+    shared_key = f"proses:{processed_key()}"
+    result, _ = get_dataset_cache().acquire(shared_key, store.token, lambda: app.process_data(
+        store.get('pesanan_data'), 
+        store.get('income_data'), 
+        st.session_state.cost_data
+    ))
+    cache[key] = (shared_key, result)
+    while len(cache) > PROCESS_CACHE_SIZE:
+        evicted_key, _ = cache.popitem(last=False)[1]
+        get_dataset_cache().release(evicted_key, store.token)
+    return result
+
+def save_snapshot(merged, summary, aggregates):
+    """Menyimpan hasil proses sebagai snapshot (dikunci sidik jari input & isi data biaya)"""
+    if snapshot_store is None:
+        return None
+    key = processed_key()
+    label = " + ".join(
+        st.session_state.get(f"{data_key}_name") or data_key
+        for data_key in ('pesanan_data', 'income_data')
+    )
+    try:
+        with perf.stage('Simpan snapshot', rows_in=len(merged)):
+            return snapshot_store.save(key, merged, summary, aggregates, label=label)
+    except Exception:
+        # Snapshot hanya pelengkap: kegagalan tulis (disk penuh dll.) tidak menghentikan aplikasi
+        return None
+
+def show_snapshot_picker():
+    """Daftar snapshot terbaru di sidebar untuk melanjutkan hasil proses sebelumnya"""
+    if snapshot_store is None:
+        return
+    entries = snapshot_store.entries()
+    if not entries:
+        return
+    
+    st.markdown("---")
+    st.markdown("**🕘 Snapshot Tersimpan:**")
+    by_id = {entry['id']: entry for entry in entries}
+    selected = st.selectbox(
+        "Snapshot",
+        options=list(by_id),
+        format_func=lambda key: (
+            f"{by_id[key]['created_at'].replace('T', ' ')[:16]} — {by_id[key]['label']} "
+            f"({by_id[key]['rows']:,} baris)"
+        ),
+        key="snapshot_select",
+        label_visibility="collapsed"
+    )
+    if st.button("📂 Buka Snapshot", use_container_width=True):
+        with st.spinner("Membuka snapshot..."):
+            with perf.stage('Buka snapshot') as info:
+                merged, summary, aggregates = snapshot_store.load(selected)
+                info['rows_out'] = len(merged)
+        session_store().put('merged_data', merged)
+        st.session_state.report_source = selected
+        st.session_state.summary_data = summary
+        set_session_aggregates(aggregates)
+        st.success(f"✅ Snapshot dibuka: {by_id[selected]['label']}")
+        save_perf_run()
+        st.rerun()
+
 def show_data_upload_section():
     """Bagian unggah data yang ditingkatkan"""
     st.markdown("### 📁 Unggah Data")
@@ -416,13 +588,14 @@ def show_data_upload_section():
         
         if pesanan_file:
             try:
-                df = pd.read_excel(pesanan_file, header=0, skiprows=[1])
-                df.columns = df.columns.str.strip()
-                st.session_state.pesanan_data = df
-                st.markdown(f'<div class="status-success">✅ Pesanan dimuat: {len(df):,} baris</div>', unsafe_allow_html=True)
+                from_cache = load_uploaded_excel(pesanan_file, read_orders_excel, 'pesanan_data')
+                cache_note = " (dari cache)" if from_cache else ""
+                rows = st.session_state.pesanan_data_rows
+                st.markdown(f'<div class="status-success">✅ Pesanan dimuat: {rows:,} baris{cache_note}</div>', unsafe_allow_html=True)
                 
                 with st.expander("📋 Pratinjau Data"):
-                    st.dataframe(df.head(), use_container_width=True)
+                    st.dataframe(st.session_state.pesanan_data_preview, use_container_width=True)
+                    show_memory_report('pesanan_data')
                     
             except Exception as e:
                 st.markdown(f'<div class="status-error">❌ Kesalahan memuat file: {str(e)}</div>', unsafe_allow_html=True)
@@ -441,34 +614,36 @@ def show_data_upload_section():
         
         if income_file:
             try:
-                df = pd.read_excel(income_file)
-                df.columns = df.columns.str.strip()
-                st.session_state.income_data = df
-                st.markdown(f'<div class="status-success">✅ Pendapatan dimuat: {len(df):,} baris</div>', unsafe_allow_html=True)
+                from_cache = load_uploaded_excel(income_file, read_income_excel, 'income_data')
+                cache_note = " (dari cache)" if from_cache else ""
+                rows = st.session_state.income_data_rows
+                st.markdown(f'<div class="status-success">✅ Pendapatan dimuat: {rows:,} baris{cache_note}</div>', unsafe_allow_html=True)
                 
                 with st.expander("📋 Pratinjau Data"):
-                    st.dataframe(df.head(), use_container_width=True)
+                    st.dataframe(st.session_state.income_data_preview, use_container_width=True)
+                    show_memory_report('income_data')
                     
             except Exception as e:
                 st.markdown(f'<div class="status-error">❌ Kesalahan memuat file: {str(e)}</div>', unsafe_allow_html=True)
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+@timed_fragment('Fragmen: dasbor')
 def show_metrics_dashboard():
-    """Dasbor metrik yang ditingkatkan"""
+    """Dasbor metrik yang ditingkatkan (fragmen: tombol ringkasan tidak menjalankan ulang tab lain)"""
     if st.session_state.summary_data is not None:
         st.markdown("### 📊 Dasbor Kinerja")
         
-        # Hitung metrik kunci
-        unique_orders = st.session_state.merged_data.drop_duplicates(subset=['Order ID'])
-        total_orders = unique_orders['Order ID'].nunique()
-        total_revenue = unique_orders['Total settlement amount'].sum()
-        total_cost = st.session_state.summary_data['Total Cost'].sum()
-        total_profit = total_revenue - total_cost
-        total_share_60 = total_profit * 0.6
-        total_share_40 = total_profit * 0.4
-        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-        profit_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
+        # Metrik kunci (dihitung sekali di process_data)
+        totals = st.session_state.aggregates['totals']
+        total_orders = totals['total_orders']
+        total_revenue = totals['total_revenue']
+        total_cost = totals['total_cost']
+        total_profit = totals['total_profit']
+        total_share_60 = totals['share_60']
+        total_share_40 = totals['share_40']
+        avg_order_value = totals['avg_order_value']
+        profit_margin = totals['profit_margin']
         
         # Metrik utama
         col1, col2, col3, col4 = st.columns(4)
@@ -501,6 +676,8 @@ def show_metrics_dashboard():
                 delta=f"40%: Rp {total_share_40:,.0f}"
             )
         
+        show_reconciliation(st.session_state.aggregates)
+        
         # AI Summary
         st.markdown("---")
         if st.button("📄 Tampilkan Ringkasan (Copy ke ChatGPT)", type="secondary"):
@@ -589,6 +766,42 @@ def show_metrics_dashboard():
             
             st.dataframe(low_margin, use_container_width=True, hide_index=True)
 
+def show_reconciliation(aggregates):
+    """Rekonsiliasi pesanan selesai vs settlement: cocok, pesanan tanpa settlement & settlement tanpa pesanan"""
+    # Snapshot lama belum memiliki tabel rekonsiliasi
+    if 'reconciliation' not in aggregates:
+        return
+    
+    st.markdown("---")
+    st.markdown("**🔎 Rekonsiliasi Pesanan & Settlement**")
+    reconciliation = aggregates['reconciliation'].set_index('Status')
+    labels = {
+        'Matched': "✅ Cocok",
+        'Order Only': "⏳ Pesanan Tanpa Settlement",
+        'Settlement Only': "❓ Settlement Tanpa Pesanan"
+    }
+    for col, status in zip(st.columns(len(RECONCILIATION_STATUSES)), RECONCILIATION_STATUSES):
+        row = reconciliation.loc[status]
+        if status != 'Order Only':
+            delta = f"Settlement: Rp {row['Settlement Amount']:,.0f}"
+        elif pd.notna(row['Order Amount']):
+            delta = f"Nilai pesanan: Rp {row['Order Amount']:,.0f}"
+        else:
+            delta = f"{int(row['Lines']):,} baris item"
+        with col:
+            st.metric(label=labels[status], value=f"{int(row['Orders']):,} ID", delta=delta, delta_color="off")
+    
+    # Jumlah ID dari tabel rekonsiliasi: daftar ID baru dipulihkan dari penyimpanan sesi saat dibuka
+    if session_store().has('aggregate_matched'):
+        with st.expander(f"✅ Pesanan cocok ({int(reconciliation.loc['Matched', 'Orders']):,})"):
+            st.caption("Kolom Difference = settlement − nilai pesanan (bila ekspor pesanan memuat harga/subtotal).")
+            st.dataframe(session_aggregate('matched'), use_container_width=True)
+    with st.expander(f"⏳ Pesanan selesai tanpa settlement ({int(reconciliation.loc['Order Only', 'Orders']):,})"):
+        st.dataframe(session_aggregate('order_only'), use_container_width=True)
+    with st.expander(f"❓ Settlement tanpa pesanan selesai ({int(reconciliation.loc['Settlement Only', 'Orders']):,})"):
+        st.caption("Kolom Order Status terisi bila ID ada di data pesanan dengan status lain (mis. dibatalkan).")
+        st.dataframe(session_aggregate('settlement_only'), use_container_width=True)
+
 def show_cost_management():
     """Antarmuka manajemen biaya yang ditingkatkan"""
     st.markdown("### 💸 Manajemen Biaya")
@@ -612,6 +825,7 @@ def show_cost_management():
     with action_col3:
         if st.button("🔄 Segarkan Data", help="Muat ulang data biaya dari file"):
             st.session_state.cost_data = app.load_cost_data()
+            mark_cost_data_changed()
             st.rerun()
     
     st.markdown("---")
@@ -622,9 +836,38 @@ def show_cost_management():
     with col1:
         st.markdown("**Tambah/Edit Biaya Produk**")
         
+        # Biaya dicocokkan berurutan: SKU + variasi, SKU, nama produk, lalu default
+        cost_level = st.radio(
+            "🏷️ Tingkat Biaya",
+            options=["Nama Produk", "SKU", "SKU + Variasi", "Default"],
+            horizontal=True,
+            key="cost_level",
+            help="Biaya SKU + variasi dipakai lebih dulu, lalu SKU, nama produk, dan terakhir biaya default"
+        )
+        orders = order_catalog()
+        
         # Pemilihan produk dengan pencarian
-        if st.session_state.pesanan_data is not None:
-            products = sorted(st.session_state.pesanan_data['Product Name'].astype(str).unique())
+        if cost_level == "Default":
+            selected_product = DEFAULT_COST_KEY
+        elif cost_level != "Nama Produk" and orders is not None and 'Seller SKU' in orders.columns:
+            skus = sorted(orders['Seller SKU'].dropna().astype(str).unique())
+            selected_sku = st.selectbox("🔍 Pilih SKU", options=skus, key="sku_select")
+            selected_variation = None
+            if cost_level == "SKU + Variasi" and 'Variation' in orders.columns:
+                variations = sorted(
+                    orders.loc[orders['Seller SKU'].astype(str) == selected_sku, 'Variation']
+                    .dropna().astype(str).unique()
+                )
+                selected_variation = st.selectbox("🎨 Pilih Variasi", options=variations, key="variation_select")
+            selected_product = cost_key(selected_sku, selected_variation) if selected_sku else None
+        elif cost_level != "Nama Produk":
+            selected_sku = st.text_input("📝 Seller SKU", key="sku_input")
+            selected_variation = (
+                st.text_input("📝 Variasi", key="variation_input") if cost_level == "SKU + Variasi" else None
+            )
+            selected_product = cost_key(selected_sku, selected_variation) if selected_sku else None
+        elif orders is not None:
+            products = sorted(orders['Product Name'].astype(str).unique())
             selected_product = st.selectbox(
                 "🔍 Pilih Produk",
                 options=products,
@@ -639,7 +882,7 @@ def show_cost_management():
             )
         
         # Input biaya dengan nilai saat ini
-        current_cost = st.session_state.cost_data.get(selected_product, 0.0)
+        current_cost = app.get_product_cost(selected_product, st.session_state.cost_data)
         cost_input = st.number_input(
             "💰 Biaya per Unit",
             min_value=0.0,
@@ -649,14 +892,23 @@ def show_cost_management():
             help=f"Biaya saat ini: Rp {current_cost:,.2f}"
         )
         
+        # Revisi bertanggal: biaya lama tetap berlaku untuk pesanan sebelum tanggal ini
+        dated_revision = st.checkbox(
+            "📅 Berlaku mulai tanggal tertentu",
+            key="cost_dated",
+            help="Tanpa tanggal, biaya menggantikan seluruh riwayat biaya produk ini"
+        )
+        effective_from = st.date_input("Berlaku mulai", key="cost_effective_from") if dated_revision else None
+        
         # Tombol aksi
         btn_col1, btn_col2, btn_col3 = st.columns(3)
         
         with btn_col1:
             if st.button("💾 Simpan Biaya", type="primary"):
                 if selected_product and cost_input >= 0:
-                    st.session_state.cost_data[selected_product] = cost_input
+                    add_cost_revision(st.session_state.cost_data, selected_product, cost_input, effective_from)
                     app.save_cost_data(st.session_state.cost_data)
+                    mark_cost_data_changed()
                     st.success(f"✅ Biaya disimpan untuk {selected_product}")
                     st.rerun()
                 else:
@@ -667,6 +919,7 @@ def show_cost_management():
                 if selected_product in st.session_state.cost_data:
                     del st.session_state.cost_data[selected_product]
                     app.save_cost_data(st.session_state.cost_data)
+                    mark_cost_data_changed()
                     st.success(f"✅ Biaya dihapus untuk {selected_product}")
                     st.rerun()
                 else:
@@ -680,10 +933,11 @@ def show_cost_management():
         st.markdown("**📊 Statistik Biaya**")
         
         if st.session_state.cost_data:
-            total_products = len(st.session_state.cost_data)
-            avg_cost = sum(st.session_state.cost_data.values()) / total_products
-            min_cost = min(st.session_state.cost_data.values())
-            max_cost = max(st.session_state.cost_data.values())
+            latest_costs = current_costs(st.session_state.cost_data)
+            total_products = len(latest_costs)
+            avg_cost = sum(latest_costs.values()) / total_products
+            min_cost = min(latest_costs.values())
+            max_cost = max(latest_costs.values())
             
             st.metric("📦 Total Produk", total_products)
             st.metric("💰 Rata-rata Biaya", f"Rp {avg_cost:,.0f}")
@@ -700,38 +954,65 @@ def show_cost_management():
         # Cari dan filter
         search_term = st.text_input("🔍 Cari produk", placeholder="Ketik untuk mencari...")
         
-        cost_df = pd.DataFrame(
-            list(st.session_state.cost_data.items()),
-            columns=["Product Name", "Cost per Unit"]
-        )
+        # Satu baris per revisi biaya (Effective From kosong = berlaku sejak awal)
+        cost_df = app.cost_table(st.session_state.cost_data)
         
         if search_term:
             cost_df = cost_df[cost_df['Product Name'].str.contains(search_term, case=False, na=False)]
         
-        cost_df = cost_df.sort_values("Product Name")
-        
         # Format untuk tampilan
         cost_display = cost_df.copy()
+        cost_display['Effective From'] = cost_display['Effective From'].dt.strftime('%Y-%m-%d').fillna('-')
         cost_display['Cost per Unit'] = cost_display['Cost per Unit'].apply(lambda x: f"Rp {x:,.0f}")
         
         st.dataframe(cost_display, use_container_width=True, hide_index=True)
     else:
         st.info("ℹ️ Tidak ada data biaya. Tambahkan beberapa biaya produk untuk memulai.")
 
+def analysis_period(cube):
+    """Pilihan rentang tanggal analisis; (None, None) berarti seluruh periode"""
+    if cube is None or cube.date_range[0] is None:
+        return None, None
+    first_day, last_day = cube.date_range
+    if cube.out_of_range:
+        st.caption(f"⚠️ {cube.out_of_range:,} baris bertanggal jauh di luar periode data hanya dihitung pada seluruh periode")
+    selected = st.date_input(
+        "📅 Rentang Tanggal",
+        value=(first_day, last_day),
+        min_value=first_day,
+        max_value=last_day,
+        # Kunci ikut periode data agar pilihan lama tidak keluar dari batas data baru
+        key=f"analysis_range_{first_day}_{last_day}"
+    )
+    # Baru satu tanggal dipilih, atau seluruh periode: pakai ringkasan utama
+    if len(selected) != 2 or tuple(selected) == (first_day, last_day):
+        return None, None
+    start, end = selected
+    st.caption(f"📅 Analisis {start:%d/%m/%Y} – {end:%d/%m/%Y} (dari kubus penjualan harian)")
+    return start, end
+
+@timed_fragment('Fragmen: analisis lanjutan')
 def show_advanced_analytics():
-    """Analisis lanjutan dengan grafik interaktif"""
+    """Analisis lanjutan dengan grafik interaktif (fragmen: pilihan grafik & tanggal hanya menggambar ulang tab ini)"""
     if st.session_state.summary_data is not None:
         st.markdown("### 📊 Analisis Lanjutan")
         
+        # Rentang tanggal dijawab dari kubus penjualan tanpa mengelompokkan ulang baris pesanan
+        cube = session_aggregate('cube')
+        start, end = analysis_period(cube)
+        summary = st.session_state.summary_data if start is None else app.apply_costs(cube.by_product(start, end))
+        
         # Pemilihan grafik
         chart_type = st.selectbox(
             "📈 Pilih Jenis Grafik",
-            ["Pendapatan vs Profit (Scatter)", "Analisis Margin Profit", "Matriks Kinerja Produk", "Distribusi Penjualan"]
+            ["Pendapatan vs Profit (Scatter)", "Analisis Margin Profit", "Matriks Kinerja Produk", "Distribusi Penjualan",
+             "Tren Harian per SKU"],
+            key="analysis_chart_type"
         )
         
         if chart_type == "Pendapatan vs Profit (Scatter)":
             fig = px.scatter(
-                st.session_state.summary_data,
+                summary,
                 x='Revenue',
                 y='Profit',
                 size='TotalQty',
@@ -757,13 +1038,13 @@ def show_advanced_analytics():
             
             # Histogram
             fig.add_trace(
-                go.Histogram(x=st.session_state.summary_data['Profit Margin %'], 
+                go.Histogram(x=summary['Profit Margin %'], 
                            name="Distribusi Margin", showlegend=False),
                 row=1, col=1
             )
             
             # Produk teratas berdasarkan margin
-            top_margin = st.session_state.summary_data.nlargest(10, 'Profit Margin %')
+            top_margin = summary.nlargest(10, 'Profit Margin %')
             fig.add_trace(
                 go.Bar(x=top_margin['Product Name'], y=top_margin['Profit Margin %'],
                       name="Margin Tertinggi", showlegend=False),
@@ -772,16 +1053,16 @@ def show_advanced_analytics():
             
             # Scatter pendapatan vs margin
             fig.add_trace(
-                go.Scatter(x=st.session_state.summary_data['Revenue'], 
-                          y=st.session_state.summary_data['Profit Margin %'],
+                go.Scatter(x=summary['Revenue'], 
+                          y=summary['Profit Margin %'],
                           mode='markers', name="Pendapatan vs Margin", showlegend=False),
                 row=2, col=1
             )
             
             # Scatter kuantitas vs margin
             fig.add_trace(
-                go.Scatter(x=st.session_state.summary_data['TotalQty'], 
-                          y=st.session_state.summary_data['Profit Margin %'],
+                go.Scatter(x=summary['TotalQty'], 
+                          y=summary['Profit Margin %'],
                           mode='markers', name="Kuantitas vs Margin", showlegend=False),
                 row=2, col=2
             )
@@ -791,7 +1072,7 @@ def show_advanced_analytics():
         
         elif chart_type == "Matriks Kinerja Produk":
             # Buat matriks kinerja dengan perbaikan untuk nilai negatif
-            plot_data = st.session_state.summary_data.copy()
+            plot_data = summary.copy()
             
             # Pastikan nilai size selalu positif (gunakan absolut + offset kecil)
             plot_data['size_value'] = plot_data['Revenue'].abs() + 1
@@ -943,27 +1224,27 @@ def show_advanced_analytics():
             
             # Distribusi pendapatan
             fig.add_trace(
-                go.Box(y=st.session_state.summary_data['Revenue'], 
+                go.Box(y=summary['Revenue'], 
                       name="Pendapatan", showlegend=False),
                 row=1, col=1
             )
             
             # Distribusi profit
             fig.add_trace(
-                go.Box(y=st.session_state.summary_data['Profit'], 
+                go.Box(y=summary['Profit'], 
                       name="Profit", showlegend=False),
                 row=1, col=2
             )
             
             # Distribusi kuantitas
             fig.add_trace(
-                go.Box(y=st.session_state.summary_data['TotalQty'], 
+                go.Box(y=summary['TotalQty'], 
                       name="Kuantitas", showlegend=False),
                 row=2, col=1
             )
             
             # Pendapatan kumulatif (Pareto)
-            sorted_data = st.session_state.summary_data.sort_values('Revenue', ascending=False)
+            sorted_data = summary.sort_values('Revenue', ascending=False)
             sorted_data['Cumulative Revenue'] = sorted_data['Revenue'].cumsum()
             sorted_data['Cumulative %'] = (sorted_data['Cumulative Revenue'] / sorted_data['Revenue'].sum()) * 100
             
@@ -977,14 +1258,31 @@ def show_advanced_analytics():
             fig.update_layout(height=600, title_text="Analisis Distribusi Penjualan")
             st.plotly_chart(fig, use_container_width=True)
         
+        elif chart_type == "Tren Harian per SKU":
+            if cube is None or cube.date_range[0] is None:
+                st.info("ℹ️ Data tidak memiliki tanggal pesanan.")
+            else:
+                sku = st.selectbox("🔍 Pilih SKU", options=list(cube.skus), key="trend_sku")
+                trend = cube.sku_daily(sku, start, end)
+                fig = px.line(
+                    trend,
+                    x='Order Date',
+                    y=['Revenue', 'Total Cost', 'Profit'],
+                    title=f"Tren Harian {sku}",
+                    labels={'Order Date': 'Tanggal', 'value': 'Rp', 'variable': ''}
+                )
+                fig.update_layout(height=450)
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(trend, use_container_width=True, hide_index=True)
+        
         # Wawasan tambahan
 
                 # --- 🔗 Tombol Ringkas + Lanjut ke ChatGPT ---
         st.markdown("---")
         if st.button("💬 Ringkas & Lanjut ke ChatGPT", type="primary"):
-            if st.session_state.summary_data is not None:
+            if summary is not None:
                 # --- ringkas data ---
-                df = st.session_state.summary_data
+                df = summary
                 total_sku   = len(df)
                 untung      = len(df[df['Profit'] > 0])
                 hi_margin   = len(df[df['Profit Margin %'] > 20])
@@ -1032,25 +1330,25 @@ Buat:
             st.markdown("**📈 Wawasan Kinerja**")
             
             # Hitung wawasan
-            total_products = len(st.session_state.summary_data)
-            profitable_products = len(st.session_state.summary_data[st.session_state.summary_data['Profit'] > 0])
-            high_margin_products = len(st.session_state.summary_data[st.session_state.summary_data['Profit Margin %'] > 20])
+            total_products = len(summary)
+            profitable_products = len(summary[summary['Profit'] > 0])
+            high_margin_products = len(summary[summary['Profit Margin %'] > 20])
             
             st.write(f"• **{profitable_products}/{total_products}** produk menghasilkan profit")
             st.write(f"• **{high_margin_products}** produk memiliki margin >20%")
-            st.write(f"• **Produk 20% teratas** menghasilkan **{(st.session_state.summary_data.nlargest(int(total_products*0.2), 'Revenue')['Revenue'].sum() / st.session_state.summary_data['Revenue'].sum() * 100):.1f}%** pendapatan")
+            st.write(f"• **Produk 20% teratas** menghasilkan **{(summary.nlargest(int(total_products*0.2), 'Revenue')['Revenue'].sum() / summary['Revenue'].sum() * 100):.1f}%** pendapatan")
         
         with insight_col2:
             st.markdown("**💡 Rekomendasi**")
             
             # Rekomendasi utama
-            low_margin = st.session_state.summary_data[st.session_state.summary_data['Profit Margin %'] < 10]
+            low_margin = summary[summary['Profit Margin %'] < 10]
             if not low_margin.empty:
                 st.write(f"• Tinjau penetapan harga untuk **{len(low_margin)}** produk margin rendah")
             
-            high_volume_low_margin = st.session_state.summary_data[
-                (st.session_state.summary_data['TotalQty'] >= st.session_state.summary_data['TotalQty'].median()) & 
-                (st.session_state.summary_data['Profit Margin %'] < 15)
+            high_volume_low_margin = summary[
+                (summary['TotalQty'] >= summary['TotalQty'].median()) & 
+                (summary['Profit Margin %'] < 15)
             ]
             if not high_volume_low_margin.empty:
                 st.write(f"• Optimalkan biaya untuk **{len(high_volume_low_margin)}** produk volume tinggi")
@@ -1061,7 +1359,345 @@ Buat:
     else:
         st.info("ℹ️ Silakan proses data Anda terlebih dahulu untuk melihat analisis lanjutan")
 
+@st.cache_resource(show_spinner=False)
+def get_warehouse():
+    """Gudang data SQLite bersama (file dibuat saat pertama kali dipakai)"""
+    return Warehouse(WAREHOUSE_PATH)
+
+# Hasil kueri gudang di-cache per versi gudang (naik setiap upsert), sehingga
+# rerun tanpa perubahan data tidak mengulang kueri
+@st.cache_data(show_spinner=False, max_entries=64)
+def warehouse_stats(version):
+    return get_warehouse().stats()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def warehouse_monthly(version, start, end, sku):
+    return get_warehouse().monthly_summary(start=start, end=end, sku=sku)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def warehouse_top_skus(version, start, end):
+    return get_warehouse().top_skus(start=start, end=end, limit=20)
+
+def save_to_warehouse():
+    """Menyimpan hasil proses sesi ini ke gudang data (upsert per Order ID)"""
+    with perf.stage('Simpan ke gudang') as info:
+        # Hasil dari snapshot tidak membawa data pendapatan mentah: simpan baris pesanan saja
+        store = session_store()
+        income_data = store.get('income_data')
+        settlements = app.aggregate_settlements(income_data) if income_data is not None else None
+        info['rows_out'] = get_warehouse().upsert(store.get('merged_data'), settlements)
+    return info['rows_out']
+
+@timed_fragment('Fragmen: gudang data')
+def show_warehouse():
+    """Analisis multi-bulan dari gudang data lokal (fragment: filter hanya merender ulang tab ini)"""
+    st.markdown("### 🗄️ Gudang Data")
+    
+    if not os.path.exists(WAREHOUSE_PATH):
+        st.info("ℹ️ Gudang data masih kosong. Proses data lalu klik **🗄️ Simpan ke Gudang** di sidebar untuk menyimpan periode ini.")
+        return
+    
+    version = get_warehouse().version()
+    stats = warehouse_stats(version)
+    if not stats['lines']:
+        st.info("ℹ️ Gudang data masih kosong.")
+        return
+    
+    stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
+    with stat_col1:
+        st.metric("📦 Baris Pesanan", f"{stats['lines']:,}")
+    with stat_col2:
+        st.metric("💼 Pesanan", f"{stats['orders']:,}")
+    with stat_col3:
+        st.metric("🧾 Settlement", f"{stats['settlements']:,}")
+    with stat_col4:
+        st.metric("💾 Ukuran", f"{stats['bytes'] / 1024 / 1024:,.1f} MB")
+    
+    # Rentang tanggal (kueri membaca rollup harian)
+    first_day = pd.Timestamp(stats['first_order']).date() if stats['first_order'] else datetime.now().date()
+    last_day = pd.Timestamp(stats['last_order']).date() if stats['last_order'] else datetime.now().date()
+    range_col1, range_col2, range_col3 = st.columns(3)
+    with range_col1:
+        start = st.date_input("Dari", value=first_day, min_value=first_day, max_value=last_day, key="warehouse_start")
+    with range_col2:
+        end = st.date_input("Sampai", value=last_day, min_value=first_day, max_value=last_day, key="warehouse_end")
+    with range_col3:
+        sku = st.text_input("Seller SKU (opsional)", key="warehouse_sku").strip() or None
+    
+    with perf.stage('Kueri gudang'):
+        monthly = warehouse_monthly(version, start, end, sku)
+    
+    st.markdown(f"**📅 Tren Bulanan{f' — {sku}' if sku else ''}**")
+    if monthly.empty:
+        st.warning("⚠️ Tidak ada data pada rentang ini")
+        return
+    
+    fig = px.bar(
+        monthly,
+        x='Month',
+        y=['Revenue', 'Total Cost', 'Profit'],
+        barmode='group',
+        title="Pendapatan, Biaya & Profit per Bulan"
+    )
+    fig.update_layout(height=400, legend_title_text='')
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(
+        monthly.style.format({
+            'Revenue': 'Rp {:,.0f}', 'Total Cost': 'Rp {:,.0f}', 'Profit': 'Rp {:,.0f}',
+            'Orders': '{:,}', 'Quantity': '{:,}'
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    if sku is None:
+        st.markdown("**🏆 SKU Teratas**")
+        with perf.stage('Kueri gudang'):
+            top = warehouse_top_skus(version, start, end)
+        st.dataframe(
+            top.style.format({
+                'Total Revenue': 'Rp {:,.0f}', 'Total Cost': 'Rp {:,.0f}', 'Profit': 'Rp {:,.0f}',
+                'Total Quantity': '{:,}'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+SQL_EXAMPLE = """-- Margin per variasi untuk SKU dengan lebih dari 50 pesanan
+SELECT seller_sku, variation,
+       COUNT(DISTINCT order_id) AS orders,
+       SUM(allocated_revenue) AS revenue,
+       SUM(line_cost) AS cost,
+       1.0 - SUM(line_cost) / NULLIF(SUM(allocated_revenue), 0) AS margin
+FROM merged_data
+WHERE seller_sku IN (
+    SELECT seller_sku FROM merged_data
+    GROUP BY seller_sku HAVING COUNT(DISTINCT order_id) > 50
+)
+GROUP BY seller_sku, variation
+ORDER BY margin DESC"""
+
+def sql_tables():
+    """Tabel yang bisa dikueri di konsol SQL"""
+    return {
+        'merged_data': session_store().get('merged_data'),
+        'summary_data': st.session_state.summary_data,
+        'cost_data': app.cost_table(st.session_state.cost_data),
+        'by_sku': session_aggregate('by_sku'),
+        'daily': session_aggregate('daily')
+    }
+
+def sql_console():
+    """Konsol SQL sesi ini; dibuat saat kueri pertama & dibuat ulang bila hasil proses atau data biaya berubah"""
+    source = (st.session_state.report_source, id(st.session_state.summary_data), cost_fingerprint())
+    cached = st.session_state.get('sql_console')
+    if cached is None or cached[0] != source:
+        if cached is not None:
+            cached[1].close()
+        cached = (source, SqlConsole(sql_tables()))
+        st.session_state.sql_console = cached
+    return cached[1]
+
+def show_sql_console():
+    """Kueri SQL ad-hoc atas data gabungan, ringkasan & daftar biaya sesi ini"""
+    st.markdown("### 🧮 Konsol SQL")
+    
+    if st.session_state.summary_data is None:
+        st.info("ℹ️ Silakan proses data Anda terlebih dahulu untuk menjalankan kueri SQL")
+        return
+    
+    st.caption(
+        f"Mesin: {engine_name()}. Hanya kueri SELECT/WITH; nama kolom memakai snake_case "
+        "(mis. \"Seller SKU\" → seller_sku)."
+    )
+    with st.expander("📚 Tabel & Kolom"):
+        tables = sql_tables()
+        for table_tab, (name, df) in zip(st.tabs(list(tables)), tables.items()):
+            with table_tab:
+                st.caption(f"{len(df):,} baris")
+                st.dataframe(table_schema(df), use_container_width=True, hide_index=True)
+    
+    with st.form("sql_form"):
+        sql = st.text_area("Kueri", value=SQL_EXAMPLE, height=260, key="sql_text")
+        form_col1, form_col2 = st.columns(2)
+        with form_col1:
+            page_size = st.selectbox("Baris per halaman", [50, PAGE_SIZE, 500, 1000], index=1, key="sql_page_size")
+        with form_col2:
+            timeout = st.number_input("Batas waktu (detik)", min_value=1, max_value=300, value=TIMEOUT_SECONDS,
+                                      key="sql_timeout")
+        if st.form_submit_button("▶️ Jalankan", type="primary"):
+            st.session_state.sql_active = sql
+            st.session_state.sql_page = 1
+    
+    active = st.session_state.get('sql_active')
+    if not active:
+        return
+    
+    page = st.session_state.get('sql_page', 1)
+    try:
+        with st.spinner("Menjalankan kueri..."):
+            with perf.stage('Kueri SQL') as info:
+                result = sql_console().run(active, page=page - 1, page_size=page_size, timeout=timeout)
+                info['rows_out'] = result['total_rows']
+    except TimeoutError as e:
+        st.warning(f"⏱️ {e}. Persempit kueri atau naikkan batas waktu.")
+        return
+    except Exception as e:
+        st.error(f"Kesalahan SQL: {str(e)}")
+        return
+    
+    st.caption(
+        f"{result['total_rows']:,} baris · halaman {result['page'] + 1:,} dari {result['pages']:,} · "
+        f"{result['elapsed']:.2f} s"
+    )
+    st.dataframe(result['frame'], use_container_width=True, hide_index=True)
+    if result['pages'] > 1:
+        st.number_input("Halaman", min_value=1, max_value=result['pages'], key="sql_page")
+
+@timed_fragment('Fragmen: detail data')
+def show_filtered_data():
+    """Tabel ringkasan tersaring; mengubah filter hanya menjalankan ulang bagian ini"""
+    st.markdown("### 📋 Detail Data")
+    
+    if st.session_state.summary_data is not None:
+        # Tabel ringkasan dengan pencarian dan filter
+        st.markdown("**📊 Tabel Ringkasan Lengkap**")
+        
+        # Filter
+        filter_col1, filter_col2, filter_col3 = st.columns(3)
+        
+        with filter_col1:
+            min_revenue = st.number_input("Pendapatan Minimum", min_value=0, value=0, key="filter_min_revenue")
+        with filter_col2:
+            min_profit = st.number_input("Profit Minimum", value=0, key="filter_min_profit")
+        with filter_col3:
+            min_margin = st.number_input("Margin Minimum %", min_value=0.0, max_value=100.0, value=0.0,
+                                         key="filter_min_margin")
+        
+        # Terapkan filter
+        filtered_data = st.session_state.summary_data[
+            (st.session_state.summary_data['Revenue'] >= min_revenue) &
+            (st.session_state.summary_data['Profit'] >= min_profit) &
+            (st.session_state.summary_data['Profit Margin %'] >= min_margin)
+        ]
+        
+        # Format untuk tampilan
+        display_data = filtered_data.copy()
+        display_data['Revenue'] = display_data['Revenue'].apply(lambda x: f"Rp {x:,.0f}")
+        display_data['Total Cost'] = display_data['Total Cost'].apply(lambda x: f"Rp {x:,.0f}")
+        display_data['Profit'] = display_data['Profit'].apply(lambda x: f"Rp {x:,.0f}")
+        display_data['Share 60%'] = display_data['Share 60%'].apply(lambda x: f"Rp {x:,.0f}")
+        display_data['Share 40%'] = display_data['Share 40%'].apply(lambda x: f"Rp {x:,.0f}")
+        display_data['Profit Margin %'] = display_data['Profit Margin %'].apply(lambda x: f"{x:.1f}%")
+        
+        st.dataframe(display_data, use_container_width=True, hide_index=True)
+        
+        # Ringkasan statistik
+        st.markdown("**📊 Ringkasan Data Tersaring**")
+        st.info("ℹ️ **Catatan:** Metrik di bawah menunjukkan data produk tersaring saja. Untuk total bisnis akurat, lihat Dasbor Kinerja yang menangani perhitungan tingkat pesanan dengan benar.")
+        
+        summary_col1, summary_col2, summary_col3, summary_col4 = st.columns(4)
+        
+        with summary_col1:
+            st.metric("Produk Tersaring", len(filtered_data))
+        with summary_col2:
+            st.metric("Jumlah Pendapatan Produk", f"Rp {filtered_data['Revenue'].sum():,.0f}")
+        with summary_col3:
+            st.metric("Jumlah Profit Produk", f"Rp {filtered_data['Profit'].sum():,.0f}")
+        with summary_col4:
+            avg_margin = filtered_data['Profit Margin %'].mean()
+            st.metric("Margin Rata-rata", f"{avg_margin:.1f}%")
+        
+        # Tambahkan perbandingan dengan total bisnis aktual
+        if st.session_state.aggregates is not None:
+            st.markdown("---")
+            st.markdown("**🔍 Perbandingan Total Bisnis**")
+            
+            # Total bisnis aktual (sama seperti Dasbor Kinerja)
+            totals = st.session_state.aggregates['totals']
+            actual_total_revenue = totals['total_revenue']
+            actual_total_profit = totals['total_profit']
+            
+            comp_col1, comp_col2, comp_col3 = st.columns(3)
+            
+            with comp_col1:
+                st.metric(
+                    "Total Pendapatan Aktual", 
+                    f"Rp {actual_total_revenue:,.0f}",
+                    help="Dihitung dari pesanan unik (metode Dasbor Kinerja)"
+                )
+            with comp_col2:
+                st.metric(
+                    "Total Profit Aktual", 
+                    f"Rp {actual_total_profit:,.0f}",
+                    help="Pendapatan dikurangi total biaya (metode Dasbor Kinerja)"
+                )
+            with comp_col3:
+                filter_coverage = (filtered_data['Revenue'].sum() / actual_total_revenue * 100) if actual_total_revenue > 0 else 0
+                st.metric(
+                    "Cakupan Filter", 
+                    f"{filter_coverage:.1f}%",
+                    help="Persentase total pendapatan yang dicakup oleh produk tersaring"
+                )
+    
+    else:
+        st.info("ℹ️ Tidak ada data untuk ditampilkan. Silakan unggah dan proses data Anda terlebih dahulu.")
+
+def perf_runs_frame(runs):
+    """Menggabungkan catatan tahap beberapa rerun menjadi satu DataFrame"""
+    rows = []
+    for run in runs:
+        for record in run['records']:
+            rows.append({
+                'Rerun': run['run'],
+                'Waktu': run['started_at'].strftime('%H:%M:%S'),
+                'Tahap': '  ' * record['depth'] + record['stage'],
+                'Detik': record['seconds'],
+                'Baris Masuk': record['rows_in'],
+                'Baris Keluar': record['rows_out'],
+                'Δ Memori MB': record['mem_delta_mb'],
+                'Puncak MB': record['mem_peak_mb']
+            })
+    return pd.DataFrame(rows)
+
+def show_performance_panel():
+    """Panel waktu & memori per tahap untuk beberapa rerun terakhir"""
+    with st.expander("⏱️ Performa"):
+        track_memory = st.checkbox(
+            "Lacak memori (tracemalloc)",
+            value=perf.memory_tracking_enabled(),
+            help="Mencatat delta & puncak memori per tahap. Menambah overhead dan berlaku untuk seluruh server."
+        )
+        perf.set_memory_tracking(track_memory)
+        
+        if not st.session_state.perf_runs:
+            st.caption("Belum ada tahap yang tercatat.")
+            return
+        
+        timings = perf_runs_frame(st.session_state.perf_runs)
+        latest = timings[timings['Rerun'] == timings['Rerun'].max()]
+        st.caption(f"Rerun terakhir: {latest.loc[latest['Tahap'].str[0] != ' ', 'Detik'].sum():.2f} s tercatat")
+        st.dataframe(
+            timings.sort_values('Rerun', ascending=False, kind='stable'),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Detik': st.column_config.NumberColumn(format="%.3f"),
+                'Δ Memori MB': st.column_config.NumberColumn(format="%.1f"),
+                'Puncak MB': st.column_config.NumberColumn(format="%.1f")
+            }
+        )
+        st.download_button(
+            label="💾 Unduh CSV",
+            data=timings.to_csv(index=False),
+            file_name=f"timings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
 def main():
+    perf.start_run()
+    
     # Header
     st.markdown("""
     <div class="main-header">
@@ -1077,14 +1713,25 @@ def main():
     # Inisialisasi state sesi
     if 'cost_data' not in st.session_state:
         st.session_state.cost_data = app.load_cost_data()
-    if 'pesanan_data' not in st.session_state:
-        st.session_state.pesanan_data = None
-    if 'income_data' not in st.session_state:
-        st.session_state.income_data = None
-    if 'merged_data' not in st.session_state:
-        st.session_state.merged_data = None
+    if 'cost_version' not in st.session_state:
+        st.session_state.cost_version = 0
+    if 'process_cache_hits' not in st.session_state:
+        st.session_state.process_cache_hits = 0
+        st.session_state.process_cache_misses = 0
     if 'summary_data' not in st.session_state:
         st.session_state.summary_data = None
+    if 'aggregates' not in st.session_state:
+        st.session_state.aggregates = None
+    if 'report_source' not in st.session_state:
+        st.session_state.report_source = None
+    if 'perf_runs' not in st.session_state:
+        st.session_state.perf_runs = deque(maxlen=PERF_HISTORY_RUNS)
+        st.session_state.perf_run_id = 0
+    
+    # Frame besar sesi ini dipulihkan saat diakses; sesi lain yang menganggur dikompresi/dipindah ke disk
+    store = session_store()
+    store.touch()
+    get_session_registry().enforce(current=store)
     
     # Sidebar
     with st.sidebar:
@@ -1092,13 +1739,28 @@ def main():
         
         # Status data
         st.markdown("**📊 Status Data:**")
-        pesanan_status = "✅ Dimuat" if st.session_state.pesanan_data is not None else "❌ Tidak dimuat"
-        income_status = "✅ Dimuat" if st.session_state.income_data is not None else "❌ Tidak dimuat"
+        pesanan_status = "✅ Dimuat" if store.has('pesanan_data') else "❌ Tidak dimuat"
+        income_status = "✅ Dimuat" if store.has('income_data') else "❌ Tidak dimuat"
         processed_status = "✅ Diproses" if st.session_state.summary_data is not None else "❌ Tidak diproses"
         
         st.write(f"Pesanan: {pesanan_status}")
         st.write(f"Pendapatan: {income_status}")
         st.write(f"Analisis: {processed_status}")
+        st.caption(
+            f"Cache proses: {st.session_state.process_cache_hits} hit / "
+            f"{st.session_state.process_cache_misses} miss"
+        )
+        shared_stats = get_dataset_cache().stats()
+        st.caption(
+            f"Cache bersama: {shared_stats['entries']} dataset "
+            f"({shared_stats['bytes'] / 1024 / 1024:,.1f} MB), {shared_stats['references']} referensi sesi"
+        )
+        report_stats = get_report_jobs().stats()
+        st.caption(
+            f"Laporan Excel tersimpan: {report_stats['entries']} "
+            f"({report_stats['bytes'] / 1024 / 1024:,.1f} MB), {report_stats['running']} sedang dibuat"
+        )
+        show_session_memory(store)
         
         st.markdown("---")
         
@@ -1106,18 +1768,21 @@ def main():
         st.markdown("**⚡ Aksi Cepat:**")
         
         if st.button("🔄 Proses Data", type="primary", use_container_width=True):
-            if st.session_state.pesanan_data is not None and st.session_state.income_data is not None:
+            if store.has('pesanan_data') and store.has('income_data'):
                 with st.spinner("Memproses data..."):
-                    merged, summary = app.process_data(
-                        st.session_state.pesanan_data, 
-                        st.session_state.income_data, 
-                        st.session_state.cost_data
-                    )
+                    merged, summary, aggregates = process_data_cached()
                     
                     if merged is not None:
-                        st.session_state.merged_data = merged
+                        store.put('merged_data', merged)
+                        st.session_state.report_source = processed_key()
                         st.session_state.summary_data = summary
+                        set_session_aggregates(aggregates)
+                        save_snapshot(merged, summary, aggregates)
+                        # Data mentah tidak dipakai tampilan lagi: dilepas (dimuat ulang dari cache
+                        # unggahan bila biaya berubah) atau dipindah ke disk
+                        store.spill(['pesanan_data', 'income_data'])
                         st.success("✅ Data diproses!")
+                        save_perf_run()
                         st.rerun()
                     else:
                         st.error("❌ Tidak ditemukan data yang cocok")
@@ -1125,23 +1790,40 @@ def main():
                 st.warning("⚠️ Unggah kedua file terlebih dahulu")
         
         if st.session_state.summary_data is not None:
-            if st.button("📥 Ekspor Laporan", use_container_width=True):
+            include_raw_data = st.checkbox(
+                "Sertakan data mentah",
+                help="Tambahkan lembar 'Data Mentah' berisi seluruh baris gabungan (untuk audit)"
+            )
+            # Laporan dibuat di thread latar; laporan yang sudah jadi langsung bisa diunduh ulang
+            key = report_key(include_raw_data)
+            job = get_report_jobs().get(key)
+            if job is None or job.state == FAILED:
+                if job is not None:
+                    st.error(f"Kesalahan: {job.error}")
+                if st.button("📥 Ekspor Laporan", use_container_width=True):
+                    start_report(key, include_raw_data)
+                    st.rerun()
+            elif not job.done:
+                show_report_progress(key)
+            else:
+                st.download_button(
+                    label="💾 Unduh Excel",
+                    data=job.data,
+                    file_name=f"income_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    use_container_width=True
+                )
+                st.caption(f"Laporan siap: {len(job.data) / 1024 / 1024:,.1f} MB, dibuat dalam {job.elapsed:.1f} s")
+            
+            if st.button("🗄️ Simpan ke Gudang", use_container_width=True,
+                         help="Simpan baris pesanan & settlement periode ini untuk analisis multi-bulan"):
                 try:
-                    excel_data = app.create_excel_report(
-                        st.session_state.merged_data,
-                        st.session_state.summary_data,
-                        st.session_state.cost_data
-                    )
-                    
-                    st.download_button(
-                        label="💾 Unduh Excel",
-                        data=excel_data,
-                        file_name=f"income_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
-                    )
+                    saved = save_to_warehouse()
+                    st.success(f"✅ {saved:,} baris pesanan disimpan ke gudang data")
                 except Exception as e:
                     st.error(f"Kesalahan: {str(e)}")
+
+            show_data_export()
         
         st.markdown("---")
         
@@ -1149,15 +1831,30 @@ def main():
         if st.session_state.cost_data:
             st.markdown("**💰 Data Biaya:**")
             st.write(f"Produk: {len(st.session_state.cost_data)}")
-            avg_cost = sum(st.session_state.cost_data.values()) / len(st.session_state.cost_data)
+            avg_cost = sum(current_costs(st.session_state.cost_data).values()) / len(st.session_state.cost_data)
             st.write(f"Biaya Rata-rata: Rp {avg_cost:,.0f}")
+        
+        # Snapshot hasil proses
+        show_snapshot_picker()
+        
+        # Cache unggahan
+        st.markdown("---")
+        st.markdown("**🗄️ Cache Unggahan:**")
+        cache_entries, cache_bytes = upload_cache.stats()
+        st.write(f"File: {cache_entries} ({cache_bytes / 1024 / 1024:,.1f} MB)")
+        if st.button("🧹 Bersihkan Cache", use_container_width=True):
+            removed = upload_cache.clear()
+            get_dataset_cache().clear()
+            st.success(f"✅ {removed} file cache dihapus")
     
     # Tab konten utama
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "📊 Dasbor", 
         "💸 Manajemen Biaya", 
         "📈 Analisis", 
-        "📋 Detail Data"
+        "📋 Detail Data",
+        "🗄️ Gudang Data",
+        "🧮 SQL"
     ])
     
     with tab1:
@@ -1165,100 +1862,30 @@ def main():
         
         st.markdown("---")
         
-        show_metrics_dashboard()
+        with perf.stage('Dasbor'):
+            show_metrics_dashboard()
     
     with tab2:
         show_cost_management()
     
     with tab3:
-        show_advanced_analytics()
+        with perf.stage('Analisis lanjutan'):
+            show_advanced_analytics()
     
     with tab4:
-        st.markdown("### 📋 Detail Data")
-        
-        if st.session_state.summary_data is not None:
-            # Tabel ringkasan dengan pencarian dan filter
-            st.markdown("**📊 Tabel Ringkasan Lengkap**")
-            
-            # Filter
-            filter_col1, filter_col2, filter_col3 = st.columns(3)
-            
-            with filter_col1:
-                min_revenue = st.number_input("Pendapatan Minimum", min_value=0, value=0)
-            with filter_col2:
-                min_profit = st.number_input("Profit Minimum", value=0)
-            with filter_col3:
-                min_margin = st.number_input("Margin Minimum %", min_value=0.0, max_value=100.0, value=0.0)
-            
-            # Terapkan filter
-            filtered_data = st.session_state.summary_data[
-                (st.session_state.summary_data['Revenue'] >= min_revenue) &
-                (st.session_state.summary_data['Profit'] >= min_profit) &
-                (st.session_state.summary_data['Profit Margin %'] >= min_margin)
-            ]
-            
-            # Format untuk tampilan
-            display_data = filtered_data.copy()
-            display_data['Revenue'] = display_data['Revenue'].apply(lambda x: f"Rp {x:,.0f}")
-            display_data['Total Cost'] = display_data['Total Cost'].apply(lambda x: f"Rp {x:,.0f}")
-            display_data['Profit'] = display_data['Profit'].apply(lambda x: f"Rp {x:,.0f}")
-            display_data['Share 60%'] = display_data['Share 60%'].apply(lambda x: f"Rp {x:,.0f}")
-            display_data['Share 40%'] = display_data['Share 40%'].apply(lambda x: f"Rp {x:,.0f}")
-            display_data['Profit Margin %'] = display_data['Profit Margin %'].apply(lambda x: f"{x:.1f}%")
-            
-            st.dataframe(display_data, use_container_width=True, hide_index=True)
-            
-            # Ringkasan statistik
-            st.markdown("**📊 Ringkasan Data Tersaring**")
-            st.info("ℹ️ **Catatan:** Metrik di bawah menunjukkan data produk tersaring saja. Untuk total bisnis akurat, lihat Dasbor Kinerja yang menangani perhitungan tingkat pesanan dengan benar.")
-            
-            summary_col1, summary_col2, summary_col3, summary_col4 = st.columns(4)
-            
-            with summary_col1:
-                st.metric("Produk Tersaring", len(filtered_data))
-            with summary_col2:
-                st.metric("Jumlah Pendapatan Produk", f"Rp {filtered_data['Revenue'].sum():,.0f}")
-            with summary_col3:
-                st.metric("Jumlah Profit Produk", f"Rp {filtered_data['Profit'].sum():,.0f}")
-            with summary_col4:
-                avg_margin = filtered_data['Profit Margin %'].mean()
-                st.metric("Margin Rata-rata", f"{avg_margin:.1f}%")
-            
-            # Tambahkan perbandingan dengan total bisnis aktual
-            if st.session_state.merged_data is not None:
-                st.markdown("---")
-                st.markdown("**🔍 Perbandingan Total Bisnis**")
-                
-                # Hitung total bisnis aktual (sama seperti Dasbor Kinerja)
-                unique_orders = st.session_state.merged_data.drop_duplicates(subset=['Order ID'])
-                actual_total_revenue = unique_orders['Total settlement amount'].sum()
-                actual_total_cost = st.session_state.summary_data['Total Cost'].sum()
-                actual_total_profit = actual_total_revenue - actual_total_cost
-                
-                comp_col1, comp_col2, comp_col3 = st.columns(3)
-                
-                with comp_col1:
-                    st.metric(
-                        "Total Pendapatan Aktual", 
-                        f"Rp {actual_total_revenue:,.0f}",
-                        help="Dihitung dari pesanan unik (metode Dasbor Kinerja)"
-                    )
-                with comp_col2:
-                    st.metric(
-                        "Total Profit Aktual", 
-                        f"Rp {actual_total_profit:,.0f}",
-                        help="Pendapatan dikurangi total biaya (metode Dasbor Kinerja)"
-                    )
-                with comp_col3:
-                    filter_coverage = (filtered_data['Revenue'].sum() / actual_total_revenue * 100) if actual_total_revenue > 0 else 0
-                    st.metric(
-                        "Cakupan Filter", 
-                        f"{filter_coverage:.1f}%",
-                        help="Persentase total pendapatan yang dicakup oleh produk tersaring"
-                    )
-        
-        else:
-            st.info("ℹ️ Tidak ada data untuk ditampilkan. Silakan unggah dan proses data Anda terlebih dahulu.")
+        show_filtered_data()
+    
+    with tab5:
+        show_warehouse()
+    
+    with tab6:
+        with perf.stage('Konsol SQL'):
+            show_sql_console()
+    
+    # Simpan catatan tahap rerun ini & tampilkan panel performa
+    save_perf_run()
+    with st.sidebar:
+        show_performance_panel()
 
 if __name__ == "__main__":
     main()
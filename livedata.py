@@ -5,13 +5,16 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime, timedelta
+import hashlib
 import io
-import re
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score
 import warnings
+
+from livedata_parsing import parse_live_columns
+
 warnings.filterwarnings('ignore')
 
 # Set page config
@@ -54,6 +57,9 @@ COLUMN_MAPPING = {
 # Required columns for validation
 REQUIRED_COLUMNS = ['Kreator', 'GMV_Live', 'Penonton_Live_Stream', 'Pesanan_SKU_Live']
 
+# Uploaded files kept parsed, scored & clustered (least recently used evicted first)
+LOAD_CACHE_ENTRIES = 8
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -138,60 +144,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def safe_numeric_conversion(value):
-    """Safely convert value to numeric, handling various formats"""
-    if pd.isna(value) or value == '' or value == '-':
-        return 0
-    
-    str_value = str(value).strip()
-    str_value = re.sub(r'[^\d.,\-]', '', str_value)
-    
-    if not str_value or str_value == '-':
-        return 0
-    
-    str_value = str_value.replace(',', '.')
-    
-    try:
-        return float(str_value)
-    except (ValueError, TypeError):
-        return 0
-
-def parse_duration(duration_str):
-    """Parse duration string to minutes"""
-    if pd.isna(duration_str) or duration_str == '' or duration_str == '-':
-        return 0
-    
-    duration_str = str(duration_str).strip()
-    
-    hours_match = re.search(r'(\d+)\s*h', duration_str, re.IGNORECASE)
-    minutes_match = re.search(r'(\d+)\s*m', duration_str, re.IGNORECASE)
-    
-    hours = int(hours_match.group(1)) if hours_match else 0
-    minutes = int(minutes_match.group(1)) if minutes_match else 0
-    
-    if hours == 0 and minutes == 0:
-        numbers = re.findall(r'\d+', duration_str)
-        if numbers:
-            minutes = int(numbers[0])
-            if len(numbers) > 1:
-                hours = int(numbers[0])
-                minutes = int(numbers[1])
-    
-    return hours * 60 + minutes
-
-def parse_percentage(value):
-    """Parse percentage string to float"""
-    if pd.isna(value) or value == '' or value == '-':
-        return 0.0
-    
-    str_value = str(value).strip()
-    str_value = str_value.replace('%', '').replace(',', '.')
-    
-    try:
-        return float(str_value)
-    except (ValueError, TypeError):
-        return 0.0
-
 def calculate_performance_scores(df):
     """Calculate comprehensive performance scores"""
     if len(df) == 0:
@@ -431,25 +383,8 @@ def load_data(uploaded_file):
         if 'Waktu_Live' in df.columns:
             df['Waktu_Live'] = pd.to_datetime(df['Waktu_Live'], errors='coerce')
         
-        numeric_columns = [
-            'GMV_Bruto', 'Produk_Added', 'Produk_Terjual', 'Pesanan_SKU_Created',
-            'Pesanan_SKU_Live', 'Produk_Sold_Live', 'Pembeli', 'Harga_Rata_Rata',
-            'GMV_Live', 'Penonton_Live_Stream', 'Dilihat', 'Avg_Watch_Time',
-            'Komentar_Live', 'Dibagikan', 'Suka_Live', 'New_Followers',
-            'Produk_Dilihat', 'Klik_Produk'
-        ]
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = df[col].apply(safe_numeric_conversion)
-        
-        if 'Durasi' in df.columns:
-            df['Durasi_Minutes'] = df['Durasi'].apply(parse_duration)
-        
-        percentage_columns = ['Conversion_Rate', 'CTR']
-        for col in percentage_columns:
-            if col in df.columns:
-                df[col] = df[col].apply(parse_percentage)
+        # Column-wise parsing (see livedata_parsing for the scalar reference)
+        df = parse_live_columns(df)
         
         # Calculate derived metrics
         df['Engagement_Rate'] = 0
@@ -486,6 +421,15 @@ def load_data(uploaded_file):
         st.error(f"❌ Error loading data: {str(e)}")
         return None
 
+@st.cache_data(max_entries=LOAD_CACHE_ENTRIES, show_spinner=False)
+def load_data_cached(digest, _data):
+    """load_data keyed by the upload's content hash, so filter reruns reuse scores & clusters"""
+    return load_data(io.BytesIO(_data))
+
+def file_digest(data):
+    """SHA-256 of the uploaded bytes"""
+    return hashlib.sha256(data).hexdigest()
+
 def safe_format_number(num):
     """Safely format numbers"""
     try:
@@ -559,8 +503,9 @@ def main():
     )
     
     if uploaded_file is not None:
+        data = uploaded_file.getvalue()
         with st.spinner("🔄 Processing data with AI analytics..."):
-            df = load_data(uploaded_file)
+            df = load_data_cached(file_digest(data), data)
         
         if df is not None and len(df) > 0:
             st.success(f"✅ Data loaded successfully! {len(df)} records processed with AI insights.")
@@ -0,0 +1,245 @@
+"""Parsing of numeric, duration and percentage columns in live-session exports.
+
+The scalar functions (`safe_numeric_conversion`, `parse_duration`,
+`parse_percentage`) are the reference behaviour. The `*_column` functions
+are the vectorized engine used by `livedata.load_data`: typed numeric
+columns are converted with NumPy, text cells are parsed column-wise with
+pyarrow compute kernels, and the few cells the engine cannot reproduce
+exactly (non-ASCII text, overlong digit runs, unusual float spellings)
+fall back to the scalar function, so both paths return identical values.
+Without pyarrow, text cells simply go through the scalar functions.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+NUMERIC_COLUMNS = [
+    'GMV_Bruto', 'Produk_Added', 'Produk_Terjual', 'Pesanan_SKU_Created',
+    'Pesanan_SKU_Live', 'Produk_Sold_Live', 'Pembeli', 'Harga_Rata_Rata',
+    'GMV_Live', 'Penonton_Live_Stream', 'Dilihat', 'Avg_Watch_Time',
+    'Komentar_Live', 'Dibagikan', 'Suka_Live', 'New_Followers',
+    'Produk_Dilihat', 'Klik_Produk'
+]
+PERCENTAGE_COLUMNS = ['Conversion_Rate', 'CTR']
+
+# RE2 patterns (pyarrow) with explicit ASCII classes; non-ASCII cells never reach them
+WHITESPACE = ' \t\n\r\x0b\x0c'
+NON_NUMERIC_CHARS = r'[^0-9.,\-]'
+HOURS_PATTERN = r'(?i)(?P<hours>[0-9]+)[ \t\n\r\f\v]*h'
+MINUTES_PATTERN = r'(?i)(?P<minutes>[0-9]+)[ \t\n\r\f\v]*m'
+FIRST_TWO_NUMBERS = r'(?P<first>[0-9]+)(?:[^0-9]+(?P<second>[0-9]+))?'
+# Longer digit runs could overflow int64 minutes; those cells use the scalar parser
+LONG_DIGIT_RUN = r'[0-9]{16}'
+# What float() accepts once everything except digits, '.' and '-' is stripped
+CLEAN_FLOAT = r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)'
+# Plain decimal/exponent notation; anything else goes through the scalar parser
+SIMPLE_FLOAT = r'[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?'
+
+
+def safe_numeric_conversion(value):
+    """Safely convert value to numeric, handling various formats"""
+    if pd.isna(value) or value == '' or value == '-':
+        return 0
+
+    str_value = str(value).strip()
+    str_value = re.sub(r'[^\d.,\-]', '', str_value)
+
+    if not str_value or str_value == '-':
+        return 0
+
+    str_value = str_value.replace(',', '.')
+
+    try:
+        return float(str_value)
+    except (ValueError, TypeError):
+        return 0
+
+def parse_duration(duration_str):
+    """Parse duration string to minutes"""
+    if pd.isna(duration_str) or duration_str == '' or duration_str == '-':
+        return 0
+
+    duration_str = str(duration_str).strip()
+
+    hours_match = re.search(r'(\d+)\s*h', duration_str, re.IGNORECASE)
+    minutes_match = re.search(r'(\d+)\s*m', duration_str, re.IGNORECASE)
+
+    hours = int(hours_match.group(1)) if hours_match else 0
+    minutes = int(minutes_match.group(1)) if minutes_match else 0
+
+    if hours == 0 and minutes == 0:
+        numbers = re.findall(r'\d+', duration_str)
+        if numbers:
+            minutes = int(numbers[0])
+            if len(numbers) > 1:
+                hours = int(numbers[0])
+                minutes = int(numbers[1])
+
+    return hours * 60 + minutes
+
+def parse_percentage(value):
+    """Parse percentage string to float"""
+    if pd.isna(value) or value == '' or value == '-':
+        return 0.0
+
+    str_value = str(value).strip()
+    str_value = str_value.replace('%', '').replace(',', '.')
+
+    try:
+        return float(str_value)
+    except (ValueError, TypeError):
+        return 0.0
+
+def numeric_column(series):
+    """Vectorized `safe_numeric_conversion` for a whole column (float64)"""
+    if _is_plain_numeric(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        result = np.where(np.isfinite(values), values, 0.0)
+        # str() switches to scientific notation here, which the scalar parser mangles
+        magnitude = np.abs(values)
+        scientific = np.isfinite(values) & ((magnitude >= 1e16) | ((magnitude > 0) & (magnitude < 1e-4)))
+        if scientific.any():
+            result[scientific] = [safe_numeric_conversion(value) for value in series[scientific]]
+        return pd.Series(result, index=series.index, name=series.name)
+
+    if pc is None:
+        return series.map(safe_numeric_conversion).astype('float64')
+    return pd.Series(_numeric_from_text(_as_text(series)), index=series.index, name=series.name)
+
+def duration_column(series):
+    """Vectorized `parse_duration` for a whole column (minutes, int64)"""
+    if pc is None:
+        return series.map(parse_duration)
+
+    values = _as_text(series)
+    text = _text_array(values)
+    irregular = ~_is_ascii(text) | _contains(text, LONG_DIGIT_RUN)
+    if irregular.any():
+        text = _blank(text, irregular)
+
+    hours, _ = _extract_int(text, HOURS_PATTERN, 'hours')
+    minutes, _ = _extract_int(text, MINUTES_PATTERN, 'minutes')
+
+    # Neither unit found (or both zero): first number is minutes, or hours then minutes
+    fallback = np.flatnonzero((hours == 0) & (minutes == 0))
+    if fallback.size:
+        subset = _take(text, fallback)
+        first, _ = _extract_int(subset, FIRST_TWO_NUMBERS, 'first')
+        second, has_second = _extract_int(subset, FIRST_TWO_NUMBERS, 'second')
+        hours[fallback] = np.where(has_second, first, 0)
+        minutes[fallback] = np.where(has_second, second, first)
+
+    # NaN, None & friends stringify without digits, so they already come out as 0
+    result = hours * 60 + minutes
+    if irregular.any():
+        parsed = [parse_duration(value) for value in values[irregular]]
+        if any(abs(value) > np.iinfo('int64').max for value in parsed):
+            result = result.astype(object)
+        result[irregular] = parsed
+    return pd.Series(result, index=series.index, name=series.name)
+
+def percentage_column(series):
+    """Vectorized `parse_percentage` for a whole column (float64)"""
+    if _is_plain_numeric(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        return pd.Series(np.where(np.isnan(values), 0.0, values), index=series.index, name=series.name)
+
+    if pc is None:
+        return series.map(parse_percentage).astype('float64')
+
+    missing = series.isna().to_numpy()
+    text = _text_array(_as_text(series))
+    ascii_text = _is_ascii(text)
+    text = _trim(_replace(_replace(text, '%', ''), ',', '.'))
+    simple = _fullmatch(text, SIMPLE_FLOAT) & ascii_text & ~missing
+
+    result = _to_float(text, simple)
+    irregular = ~simple & ~missing
+    if irregular.any():
+        result[irregular] = [parse_percentage(value) for value in series[irregular]]
+    return pd.Series(result, index=series.index, name=series.name)
+
+def parse_live_columns(df):
+    """Parse every numeric, duration and percentage column present in `df` in place"""
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = numeric_column(df[col])
+
+    if 'Durasi' in df.columns:
+        df['Durasi_Minutes'] = duration_column(df['Durasi'])
+
+    for col in PERCENTAGE_COLUMNS:
+        if col in df.columns:
+            df[col] = percentage_column(df[col])
+
+    return df
+
+
+def _is_plain_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+def _numeric_from_text(values):
+    """Strip non-numeric characters and convert; anything float() rejects becomes 0"""
+    text = _text_array(values)
+    ascii_text = _is_ascii(text)
+    cleaned = _replace(_replace(text, NON_NUMERIC_CHARS, '', regex=True), ',', '.')
+    result = _to_float(cleaned, _fullmatch(cleaned, CLEAN_FLOAT) & ascii_text)
+    if not ascii_text.all():
+        irregular = ~ascii_text
+        result[irregular] = [safe_numeric_conversion(value) for value in values[irregular]]
+    return result
+
+
+# pyarrow helpers. Values are the str() of every cell, exactly what the scalar
+# parsers work on.
+
+def _as_text(series):
+    return series.astype(str).to_numpy(dtype=object)
+
+def _text_array(values):
+    return pa.array(values, type=pa.string())
+
+def _take(text, positions):
+    return text.take(pa.array(positions))
+
+def _blank(text, mask):
+    """Replaces the cells in `mask` with empty strings"""
+    return pc.if_else(pa.array(mask), '', text)
+
+def _is_ascii(text):
+    return pc.string_is_ascii(text).to_numpy(zero_copy_only=False)
+
+def _contains(text, pattern):
+    return pc.match_substring_regex(text, pattern).to_numpy(zero_copy_only=False)
+
+def _fullmatch(text, pattern):
+    return pc.match_substring_regex(text, f'^(?:{pattern})$').to_numpy(zero_copy_only=False)
+
+def _replace(text, pattern, replacement, regex=False):
+    if regex:
+        return pc.replace_substring_regex(text, pattern, replacement)
+    return pc.replace_substring(text, pattern, replacement)
+
+def _trim(text):
+    return pc.utf8_trim(text, WHITESPACE)
+
+def _to_float(text, mask):
+    """float() of the cells in `mask` (already validated), 0.0 elsewhere"""
+    text = pc.if_else(pa.array(mask), text, '0')
+    return pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False).copy()
+
+def _extract_int(text, pattern, group):
+    """First match of `pattern` -> int of `group` (0 if unmatched) and the matched mask"""
+    fields = pc.extract_regex(text, pattern)
+    digits = fields.flatten()[fields.type.get_field_index(group)]
+    # Unmatched optional groups come back as empty strings
+    matched = pc.fill_null(pc.greater(pc.utf8_length(digits), 0), False)
+    values = pc.cast(pc.if_else(matched, digits, '0'), pa.int64())
+    return values.to_numpy(zero_copy_only=False).copy(), matched.to_numpy(zero_copy_only=False)
@@ -0,0 +1,90 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# Kolom teks dengan sedikit nilai unik yang berulang di setiap baris pesanan
+CATEGORY_COLUMNS = ['Seller SKU', 'Product Name', 'Variation', 'Order Status']
+
+
+def has_pyarrow():
+    """Cek apakah pyarrow tersedia untuk string berbasis Arrow"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def optimize_dtypes(df, category_columns=CATEGORY_COLUMNS):
+    """Mengubah DataFrame hasil unggahan ke tipe data yang hemat memori.
+
+    - Kolom pada `category_columns` menjadi categorical
+    - Kolom bilangan bulat di-downcast (mis. Quantity); kolom float yang
+      seluruhnya bulat (nominal Rupiah) menjadi integer terkecil yang muat
+    - Kolom teks lain (ID pesanan, tanggal berupa teks) menjadi string Arrow
+    """
+    string_dtype = 'string[pyarrow]' if has_pyarrow() else None
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in category_columns and series.dtype == object:
+            series = series.astype('category')
+        elif pd.api.types.is_bool_dtype(series):
+            pass
+        elif pd.api.types.is_numeric_dtype(series):
+            series = _downcast_numeric(series)
+        elif string_dtype and series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+            series = series.astype(string_dtype)
+        columns[col] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _downcast_numeric(series):
+    values = series.to_numpy()
+    if pd.api.types.is_float_dtype(series):
+        # Hanya jika tanpa NaN dan seluruhnya bulat (nominal Rupiah), agar tetap eksak
+        if not len(values) or np.isnan(values).any() or not np.all(np.mod(values, 1) == 0):
+            return series
+    elif not pd.api.types.is_integer_dtype(series):
+        return series
+    # groupby().sum() mempertahankan tipe integer kecil: tipe dipilih dari total
+    # absolut kolom agar penjumlahan apa pun tidak pernah overflow
+    total = float(np.abs(values.astype('float64')).sum())
+    for dtype in ('int8', 'int16', 'int32'):
+        if total < np.iinfo(dtype).max:
+            return series.astype(dtype)
+    if total < 2 ** 53:
+        return series.astype('int64')
+    return series
+
+
+def categories_to_object(df):
+    """Mengembalikan kolom categorical ke object (untuk tabel ringkasan yang kecil)"""
+    columns = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if not columns:
+        return df
+    return df.astype({col: object for col in columns})
+
+
+def memory_report(df):
+    """Perbandingan memori per kolom terhadap tipe bawaan pandas (object / 64-bit)"""
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        current = series.memory_usage(index=False, deep=True)
+        if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series):
+            baseline = series.astype(object).memory_usage(index=False, deep=True)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            baseline = len(series) * 8
+        else:
+            baseline = current
+        rows.append({
+            'Kolom': col,
+            'Tipe': str(series.dtype),
+            'MB': current / 1024 / 1024,
+            'MB (bawaan)': baseline / 1024 / 1024
+        })
+    report = pd.DataFrame(rows, columns=['Kolom', 'Tipe', 'MB', 'MB (bawaan)'])
+    report['Hemat %'] = np.where(
+        report['MB (bawaan)'] > 0,
+        (1 - report['MB'] / report['MB (bawaan)'].where(report['MB (bawaan)'] > 0)) * 100,
+        0.0
+    )
+    return report
@@ -0,0 +1,128 @@
+"""Instrumentasi ringan per tahap: waktu, jumlah baris & memori (tracemalloc).
+
+Pemakaian:
+    recorder = perf.start_run()          # di awal rerun
+    with perf.stage('Baca pesanan') as info:
+        df = ...
+        info['rows_out'] = len(df)
+    perf.finish_run()                    # di akhir rerun
+
+    @perf.timed('merge')                 # baris masuk/keluar diisi otomatis
+    def merge(...): ...
+
+Tanpa perekam aktif (mis. CLI batch), stage() & timed() tidak mencatat apa pun.
+Perekam aktif disimpan per thread, sehingga sesi Streamlit tidak saling tercampur.
+"""
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+_local = threading.local()
+
+
+class StageRecorder:
+    """Menampung catatan tahap untuk satu rerun"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.records = []
+        self.depth = 0
+
+    def add(self, record):
+        self.records.append(record)
+
+
+def start_run():
+    """Memulai perekam baru untuk thread ini"""
+    _local.recorder = StageRecorder()
+    return _local.recorder
+
+
+def finish_run():
+    """Menghentikan perekam thread ini dan mengembalikannya"""
+    recorder = getattr(_local, 'recorder', None)
+    _local.recorder = None
+    return recorder
+
+
+def current_recorder():
+    return getattr(_local, 'recorder', None)
+
+
+def memory_tracking_enabled():
+    return tracemalloc.is_tracing()
+
+
+def set_memory_tracking(enabled):
+    """Menyalakan/mematikan tracemalloc (berlaku untuk seluruh proses)"""
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Mencatat waktu, baris & delta memori sebuah tahap ke perekam aktif"""
+    info = {'rows_in': rows_in, 'rows_out': None}
+    recorder = current_recorder()
+    if recorder is None:
+        yield info
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        mem_before, _ = tracemalloc.get_traced_memory()
+        # Puncak direset per tahap; tahap bertingkat berbagi puncak yang sama
+        tracemalloc.reset_peak()
+    depth = recorder.depth
+    recorder.depth += 1
+    started = time.perf_counter()
+    try:
+        yield info
+    finally:
+        elapsed = time.perf_counter() - started
+        recorder.depth = depth
+        record = {
+            'stage': name,
+            'depth': depth,
+            'seconds': elapsed,
+            'rows_in': info['rows_in'],
+            'rows_out': info['rows_out'],
+            'mem_delta_mb': None,
+            'mem_peak_mb': None
+        }
+        if tracing and tracemalloc.is_tracing():
+            mem_after, mem_peak = tracemalloc.get_traced_memory()
+            record['mem_delta_mb'] = (mem_after - mem_before) / 1024 / 1024
+            record['mem_peak_mb'] = (mem_peak - mem_before) / 1024 / 1024
+        recorder.add(record)
+
+
+def timed(name):
+    """Dekorator stage(); baris masuk = DataFrame argumen pertama, baris keluar = hasil"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current_recorder() is None:
+                return fn(*args, **kwargs)
+            with stage(name, rows_in=_row_count(args)) as info:
+                result = fn(*args, **kwargs)
+                info['rows_out'] = _row_count((result,))
+                return result
+        return wrapper
+    return decorator
+
+
+def _row_count(values):
+    for value in values:
+        if isinstance(value, tuple):
+            count = _row_count(value)
+            if count is not None:
+                return count
+        elif hasattr(value, 'shape') and hasattr(value, 'columns'):
+            return len(value)
+    return None
@@ -0,0 +1,111 @@
+"""Pembuatan laporan Excel di thread latar dengan cache hasil.
+
+Tombol ekspor tidak memblokir sesi selama workbook ditulis: laporan dibuat di
+thread pekerja, sesi hanya memantau kemajuannya. Byte laporan yang sudah jadi
+disimpan per kunci (sidik jari hasil proses, isi data biaya & opsi laporan),
+sehingga unduhan ulang, juga dari sesi lain dengan data yang sama, langsung
+tersedia. Laporan selesai dibuang LRU saat total ukurannya melebihi anggaran.
+
+Pemakaian:
+    job = jobs.submit(key, lambda progress: build_bytes(progress))
+    job = jobs.get(key)   # job.state, job.progress, job.data
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING, RUNNING, DONE, FAILED = 'menunggu', 'berjalan', 'selesai', 'gagal'
+
+
+class ReportJob:
+    """Status satu pembuatan laporan; diperbarui oleh thread pekerja"""
+
+    def __init__(self, key):
+        self.key = key
+        self.state = PENDING
+        self.progress = 0.0
+        self.stage = ''
+        self.data = None
+        self.error = None
+        self.elapsed = None
+
+    @property
+    def done(self):
+        return self.state in (DONE, FAILED)
+
+    def update(self, fraction, stage):
+        """Callback kemajuan untuk create_excel_report"""
+        self.progress = min(max(fraction, 0.0), 1.0)
+        self.stage = stage
+
+
+class ReportJobs:
+    """Antrean pembuatan laporan (thread pekerja) dengan cache byte laporan berbatas memori"""
+
+    def __init__(self, max_workers=2, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='laporan')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, build):
+        """Menjalankan `build(progress)` (mengembalikan bytes) di thread pekerja.
+
+        Bila laporan untuk `key` sudah jadi atau sedang dibuat, job itu yang
+        dikembalikan; job yang gagal dijalankan ulang.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.state != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+            job = ReportJob(key)
+            self._jobs[key] = job
+        self._executor.submit(self._run, job, build)
+        return job
+
+    def get(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def stats(self):
+        """Jumlah laporan tersimpan, total byte & job yang sedang berjalan"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            'entries': sum(1 for job in jobs if job.state == DONE),
+            'bytes': sum(len(job.data) for job in jobs if job.data is not None),
+            'running': sum(1 for job in jobs if not job.done)
+        }
+
+    def _run(self, job, build):
+        job.state = RUNNING
+        started = time.perf_counter()
+        try:
+            job.data = build(job.update)
+            job.progress = 1.0
+            job.state = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.state = FAILED
+        finally:
+            job.elapsed = time.perf_counter() - started
+        with self._lock:
+            self._evict(keep=job.key)
+
+    def _evict(self, keep=None):
+        # Dipanggil dengan self._lock terkunci; urutan OrderedDict = LRU. Job yang belum
+        # selesai & laporan yang baru jadi (`keep`, belum sempat diunduh) tidak dibuang
+        total = sum(len(job.data) for job in self._jobs.values() if job.data is not None)
+        for key in list(self._jobs):
+            if total <= self.max_bytes:
+                break
+            job = self._jobs[key]
+            if not job.done or key == keep:
+                continue
+            del self._jobs[key]
+            total -= len(job.data) if job.data is not None else 0
@@ -0,0 +1,222 @@
+"""Kubus penjualan: kuantitas, pendapatan, biaya & jumlah pesanan per produk × hari.
+
+Dibangun sekali dari data gabungan (satu baris per item pesanan) di
+process_data. Setiap sel menyimpan total satu kombinasi (Seller SKU, Product
+Name, Variation) pada satu hari, dalam array NumPy padat berindeks kode
+integer. Ringkasan per produk, per SKU, penjualan harian & filter rentang
+tanggal dijawab dengan memotong kolom hari lalu menjumlahkan, tanpa
+mengelompokkan ulang baris pesanan.
+
+Pemakaian:
+    cube = SalesCube.from_lines(merged)
+    cube.by_product(start="2024-07-01", end="2024-07-15")
+    cube.sku_daily("SKU-001")
+"""
+import numpy as np
+import pandas as pd
+
+from memory_utils import categories_to_object
+
+PRODUCT_COLUMNS = ['Seller SKU', 'Product Name', 'Variation']
+
+# Kolom hari mencakup kuantil 1%–99% tanggal pesanan ditambah 31 hari di kedua sisi.
+# Tanggal di luar jendela itu (mis. satu baris bertahun 2000 karena salah input)
+# masuk kolom tanpa tanggal, agar array tidak melebar menjadi ribuan hari
+SPAN_QUANTILE = 0.01
+SPAN_MARGIN_DAYS = 31
+
+
+class SalesCube:
+    """Array padat [produk, hari]; kolom hari terakhir menampung baris tanpa tanggal pesanan
+    (juga baris bertanggal pencilan di luar jendela hari, jumlahnya di `out_of_range`).
+
+    Jumlah pesanan unik tidak bisa dijumlahkan antar produk (satu pesanan
+    berisi beberapa produk), jadi disimpan terpisah per sel, per SKU × hari
+    dan per hari. Tiap pesanan dihitung di hari baris pertamanya.
+    """
+
+    def __init__(self, products, sku_codes, skus, days, quantity, revenue, cost, lines, orders,
+                 sku_orders, day_orders, out_of_range=0):
+        self.products = products
+        self.sku_codes = sku_codes
+        self.skus = skus
+        self.days = days
+        self.quantity = quantity
+        self.revenue = revenue
+        self.cost = cost
+        self.lines = lines
+        self.orders = orders
+        self.sku_orders = sku_orders
+        self.day_orders = day_orders
+        self.out_of_range = out_of_range
+
+    @classmethod
+    def from_lines(cls, merged):
+        """Membangun kubus dari data gabungan (butuh 'Allocated Revenue' & 'Line Cost')"""
+        n = len(merged)
+        key_columns = [col for col in PRODUCT_COLUMNS if col in merged.columns]
+        # Urutan produk & SKU sama dengan groupby (sort=True) pada ringkasan sebelumnya
+        product_codes = merged.groupby(key_columns, observed=True, dropna=False).ngroup().to_numpy()
+        sku_line_codes = merged.groupby('Seller SKU', observed=True, dropna=False).ngroup().to_numpy()
+        first = _first_rows(product_codes)
+        product_columns = key_columns + ['Cost Source'] if 'Cost Source' in merged.columns else key_columns
+        products = categories_to_object(merged[product_columns].iloc[first].reset_index(drop=True))
+        sku_codes = sku_line_codes[first]
+        sku_first = _first_rows(sku_line_codes)
+        skus = pd.Index(merged['Seller SKU'].iloc[sku_first].astype(object).to_numpy(), name='Seller SKU')
+
+        # Kode hari: hari ke-i sejak hari pertama jendela; tanpa tanggal/pencilan -> kolom terakhir
+        out_of_range = 0
+        if 'Order Time' in merged.columns and merged['Order Time'].notna().any():
+            times = merged['Order Time'].to_numpy().astype('datetime64[D]')
+            dated = ~np.isnat(times)
+            first_day, last_day = _day_window(times[dated])
+            in_window = dated & (times >= first_day) & (times <= last_day)
+            out_of_range = int(dated.sum() - in_window.sum())
+            days = pd.date_range(first_day, last_day, freq='D')
+            day_codes = np.where(in_window, (times - first_day).astype('int64'), len(days))
+        else:
+            days = pd.DatetimeIndex([])
+            day_codes = np.zeros(n, dtype='int64')
+        n_columns = len(days) + 1
+
+        cells = product_codes.astype('int64') * n_columns + day_codes
+        shape = (len(products), n_columns)
+        order_codes = pd.factorize(merged['Order ID'])[0].astype('int64')
+        n_orders = max(int(order_codes.max()) + 1, 1) if n else 1
+
+        def total(column):
+            if column not in merged.columns:
+                return np.zeros(shape)
+            values = merged[column].to_numpy(dtype='float64', na_value=0.0)
+            summed = np.bincount(cells, values, minlength=shape[0] * shape[1]).reshape(shape)
+            # Kolom bilangan bulat tetap bulat (jumlah float64 eksak di bawah 2**53)
+            return summed.astype('int64') if pd.api.types.is_integer_dtype(merged[column]) else summed
+
+        def distinct_orders(group_codes, n_groups):
+            # Pasangan (grup, pesanan) pertama kali muncul dihitung di hari baris itu
+            first_seen = ~pd.Series(group_codes * n_orders + order_codes).duplicated().to_numpy()
+            flat = group_codes[first_seen] * n_columns + day_codes[first_seen]
+            return np.bincount(flat, minlength=n_groups * n_columns).reshape(n_groups, n_columns)
+
+        return cls(
+            products=products,
+            sku_codes=sku_codes,
+            skus=skus,
+            days=days,
+            quantity=total('Quantity'),
+            revenue=total('Allocated Revenue'),
+            cost=total('Line Cost'),
+            lines=np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape),
+            orders=distinct_orders(product_codes.astype('int64'), len(products)),
+            sku_orders=distinct_orders(sku_line_codes.astype('int64'), len(skus)),
+            day_orders=distinct_orders(np.zeros(n, dtype='int64'), 1)[0],
+            out_of_range=out_of_range
+        )
+
+    @property
+    def nbytes(self):
+        arrays = (self.quantity, self.revenue, self.cost, self.lines, self.orders, self.sku_orders,
+                  self.day_orders, self.sku_codes)
+        return sum(array.nbytes for array in arrays) + int(self.products.memory_usage(deep=True).sum())
+
+    @property
+    def date_range(self):
+        """(hari pertama, hari terakhir) atau (None, None) bila tidak ada tanggal pesanan"""
+        if not len(self.days):
+            return None, None
+        return self.days[0].date(), self.days[-1].date()
+
+    def columns(self, start=None, end=None):
+        """Potongan kolom hari untuk rentang tanggal inklusif; tanpa batas = semua baris termasuk tanpa tanggal"""
+        if start is None and end is None:
+            return slice(None)
+        lo = 0 if start is None else self.days.searchsorted(pd.Timestamp(start).normalize())
+        hi = len(self.days) if end is None else self.days.searchsorted(pd.Timestamp(end).normalize(), side='right')
+        return slice(lo, hi)
+
+    def by_product(self, start=None, end=None):
+        """Ringkasan per SKU/produk/variasi (TotalQty, Revenue, Total Cost, Cost Source) dalam rentang tanggal"""
+        window = self.columns(start, end)
+        sold = self.lines[:, window].sum(axis=1) > 0
+        summary = self.products[[col for col in self.products.columns if col != 'Cost Source']].copy()
+        summary['TotalQty'] = self.quantity[:, window].sum(axis=1)
+        summary['Revenue'] = self.revenue[:, window].sum(axis=1)
+        summary['Total Cost'] = self.cost[:, window].sum(axis=1)
+        if 'Cost Source' in self.products.columns:
+            summary['Cost Source'] = self.products['Cost Source']
+        return summary[sold].reset_index(drop=True)
+
+    def by_sku(self, start=None, end=None):
+        """Total Quantity, Total Orders, Total Revenue & Total Cost per Seller SKU dalam rentang tanggal"""
+        window = self.columns(start, end)
+        n_skus = len(self.skus)
+        summary = pd.DataFrame({
+            'Seller SKU': self.skus,
+            'Total Quantity': _sum_by(self.sku_codes, self.quantity[:, window].sum(axis=1), n_skus),
+            'Total Orders': self.sku_orders[:, window].sum(axis=1),
+            'Total Revenue': _sum_by(self.sku_codes, self.revenue[:, window].sum(axis=1), n_skus),
+            'Total Cost': _sum_by(self.sku_codes, self.cost[:, window].sum(axis=1), n_skus)
+        })
+        sold = _sum_by(self.sku_codes, self.lines[:, window].sum(axis=1), n_skus) > 0
+        return summary[sold].reset_index(drop=True)
+
+    def daily(self, start=None, end=None, sku=None):
+        """Penjualan harian (hari tanpa penjualan dilewati); `sku` membatasi ke satu Seller SKU"""
+        window = self.columns(start, end)
+        window = slice(*window.indices(len(self.days)))
+        rows = slice(None) if sku is None else self.sku_codes == self.skus.get_loc(sku)
+        lines = self.lines[rows, window].sum(axis=0)
+        daily = pd.DataFrame({
+            'Order Date': self.days[window].date,
+            'Daily Quantity': self.quantity[rows, window].sum(axis=0),
+            'Daily Orders': (self.day_orders[window] if sku is None
+                             else self.sku_orders[self.skus.get_loc(sku), window]),
+            'Daily Revenue': self.revenue[rows, window].sum(axis=0)
+        })
+        return daily[lines > 0].reset_index(drop=True)
+
+    def sku_daily(self, sku, start=None, end=None):
+        """Rincian harian satu SKU: kuantitas, pesanan, pendapatan, biaya & profit"""
+        window = self.columns(start, end)
+        window = slice(*window.indices(len(self.days)))
+        rows = self.sku_codes == self.skus.get_loc(sku)
+        daily = pd.DataFrame({
+            'Order Date': self.days[window].date,
+            'Quantity': self.quantity[rows, window].sum(axis=0),
+            'Orders': self.sku_orders[self.skus.get_loc(sku), window],
+            'Revenue': self.revenue[rows, window].sum(axis=0),
+            'Total Cost': self.cost[rows, window].sum(axis=0)
+        })
+        daily['Profit'] = daily['Revenue'] - daily['Total Cost']
+        return daily
+
+    def totals(self, start=None, end=None):
+        """Pesanan, kuantitas, pendapatan & biaya dalam rentang tanggal"""
+        window = self.columns(start, end)
+        return {
+            'orders': int(self.day_orders[window].sum()),
+            'quantity': self.quantity[:, window].sum(),
+            'revenue': self.revenue[:, window].sum(),
+            'cost': self.cost[:, window].sum()
+        }
+
+
+def _day_window(days):
+    """(hari pertama, hari terakhir) kolom hari untuk tanggal pesanan `days` (datetime64[D])"""
+    values = days.astype('int64')
+    low, high = np.quantile(values, [SPAN_QUANTILE, 1 - SPAN_QUANTILE], method='nearest')
+    # Dipersempit ke tanggal nyata terawal & terakhir di dalam jendela
+    kept = values[(values >= low - SPAN_MARGIN_DAYS) & (values <= high + SPAN_MARGIN_DAYS)]
+    return np.datetime64(int(kept.min()), 'D'), np.datetime64(int(kept.max()), 'D')
+
+
+def _first_rows(codes):
+    """Posisi baris pertama tiap kode 0..k-1, diurutkan menurut kode"""
+    rows = np.flatnonzero(~pd.Series(codes).duplicated().to_numpy())
+    return rows[np.argsort(codes[rows], kind='stable')]
+
+
+def _sum_by(codes, values, n_groups):
+    summed = np.bincount(codes, values, minlength=n_groups)
+    return summed.astype(values.dtype) if np.issubdtype(values.dtype, np.integer) else summed
@@ -0,0 +1,269 @@
+"""Penyimpanan frame per sesi dengan batas memori.
+
+Frame besar milik sesi (data pesanan, pendapatan, gabungan, agregat besar &
+kubus penjualan) disimpan di SessionDataStore, bukan langsung di
+st.session_state. SessionRegistry (satu per proses) memantau semua sesi:
+
+- sesi yang menganggur lebih dari `compress_after` detik: frame dikompresi
+  menjadi Arrow IPC + LZ4 di memori
+- menganggur lebih dari `spill_after` detik, atau total memori semua sesi
+  melebihi anggaran: frame dipindah ke disk (sesi paling lama lebih dulu)
+
+Frame dipulihkan otomatis saat diakses lewat get(). Frame yang bisa dimuat
+ulang dari sumber lain (mis. cache Parquet unggahan) cukup dilepas tanpa
+ditulis ke disk.
+"""
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from shared_cache import SessionToken, estimate_bytes
+from snapshots import read_ipc, snapshots_available, write_ipc
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+HOT, COMPRESSED, SPILLED, RELEASED = 'memori', 'terkompresi', 'disk', 'dilepas'
+
+
+class _Slot:
+    __slots__ = ('value', 'state', 'rows', 'hot_bytes', 'stored_bytes', 'shared_key', 'reload', 'path')
+
+    def __init__(self, value, shared_key=None, reload=None):
+        self.value = value
+        self.state = HOT
+        # Nilai selain frame (mis. SalesCube) dicatat tanpa jumlah baris
+        self.rows = len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else 0
+        self.hot_bytes = estimate_bytes(value)
+        self.stored_bytes = 0
+        self.shared_key = shared_key
+        self.reload = reload
+        self.path = None
+
+    def memory_bytes(self):
+        if self.state == HOT:
+            return self.hot_bytes
+        return self.stored_bytes if self.state == COMPRESSED else 0
+
+
+class SessionDataStore:
+    """Frame milik satu sesi, masing-masing di memori, terkompresi, di disk, atau dilepas"""
+
+    def __init__(self, spill_dir=".session_spill", release=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.token = SessionToken()
+        self.last_active = time.time()
+        # Hasil process_data per sesi {kunci: (kunci_cache_bersama, hasil)}
+        self.process_cache = OrderedDict()
+        self.spill_dir = os.path.join(spill_dir, self.id)
+        # release(kunci, token): melepas referensi cache bersama saat frame dikompresi/dipindah
+        self._release = release
+        self._slots = {}
+        self._lock = threading.RLock()
+        weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    def touch(self):
+        self.last_active = time.time()
+
+    def put(self, name, df, shared_key=None, reload=None):
+        """Menyimpan frame. `reload()` (opsional) memuat ulang frame tanpa perlu ditulis ke disk.
+
+        Nilai selain DataFrame (mis. SalesCube) wajib punya `reload`: nilai itu
+        dilepas, bukan dikompresi atau ditulis ke disk.
+        """
+        if reload is None and not isinstance(df, pd.DataFrame):
+            raise TypeError("Nilai selain DataFrame memerlukan reload")
+        with self._lock:
+            self.drop(name)
+            self._slots[name] = _Slot(df, shared_key, reload)
+
+    def has(self, name):
+        return name in self._slots
+
+    def get(self, name, default=None):
+        """Mengembalikan frame, memulihkannya ke memori bila sedang dikompresi/di disk"""
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None:
+                return default
+            if slot.state == COMPRESSED:
+                slot.value = read_ipc(pa.BufferReader(slot.value))
+            elif slot.state == SPILLED:
+                with pa.memory_map(slot.path, 'r') as source:
+                    slot.value = read_ipc(source)
+                _remove(slot.path)
+                slot.path = None
+            elif slot.state == RELEASED:
+                slot.value = slot.reload()
+            slot.state = HOT
+            slot.stored_bytes = 0
+            return slot.value
+
+    def drop(self, name):
+        with self._lock:
+            slot = self._slots.pop(name, None)
+            if slot is not None:
+                self._release_shared(slot)
+                if slot.path:
+                    _remove(slot.path)
+
+    def compress(self, names=None):
+        """Mengompresi frame di memori (Arrow IPC + LZ4); mengembalikan byte yang dibebaskan.
+
+        Tanpa `names` (seluruh sesi) cache hasil proses sesi ini ikut dikosongkan.
+        """
+        freed = 0
+        with self._lock:
+            if names is None:
+                self._clear_process_cache()
+            for name, slot in self._selected(names):
+                if slot.state != HOT or pa is None:
+                    continue
+                before = slot.memory_bytes()
+                if slot.reload is not None:
+                    self._release_slot(slot)
+                else:
+                    sink = pa.BufferOutputStream()
+                    write_ipc(sink, slot.value, compression='lz4')
+                    slot.value = sink.getvalue()
+                    slot.stored_bytes = slot.value.size
+                    slot.state = COMPRESSED
+                    self._release_shared(slot)
+                freed += before - slot.memory_bytes()
+        return freed
+
+    def spill(self, names=None):
+        """Memindahkan frame ke disk (atau melepasnya bila bisa dimuat ulang); mengembalikan byte yang dibebaskan"""
+        freed = 0
+        with self._lock:
+            if names is None:
+                self._clear_process_cache()
+            for name, slot in self._selected(names):
+                if slot.state in (SPILLED, RELEASED) or pa is None:
+                    continue
+                before = slot.memory_bytes()
+                if slot.reload is not None:
+                    self._release_slot(slot)
+                else:
+                    os.makedirs(self.spill_dir, exist_ok=True)
+                    path = os.path.join(self.spill_dir, f"{name}.arrow")
+                    with pa.OSFile(path, 'wb') as sink:
+                        if slot.state == COMPRESSED:
+                            sink.write(slot.value)
+                        else:
+                            write_ipc(sink, slot.value, compression='lz4')
+                    slot.value = None
+                    slot.path = path
+                    slot.stored_bytes = os.path.getsize(path)
+                    slot.state = SPILLED
+                    self._release_shared(slot)
+                freed += before - slot.memory_bytes()
+        return freed
+
+    def memory_bytes(self):
+        """Perkiraan memori frame sesi ini (frame terkompresi dihitung ukuran kompresinya)"""
+        with self._lock:
+            slots = list(self._slots.values())
+            cached = [result for _, result in self.process_cache.values()]
+        # Hasil proses di cache merujuk frame gabungan yang sama: dihitung sekali
+        counted = {id(slot.value) for slot in slots if slot.state == HOT}
+        return sum(slot.memory_bytes() for slot in slots) + estimate_bytes(cached, counted)
+
+    def usage(self):
+        """Pemakaian memori per frame sesi ini"""
+        with self._lock:
+            rows = [{
+                'Frame': name,
+                'Status': slot.state,
+                'Baris': slot.rows,
+                'MB Memori': slot.memory_bytes() / 1024 / 1024,
+                'MB Disk': (slot.stored_bytes if slot.state == SPILLED else 0) / 1024 / 1024
+            } for name, slot in self._slots.items()]
+        return pd.DataFrame(rows, columns=['Frame', 'Status', 'Baris', 'MB Memori', 'MB Disk'])
+
+    def _selected(self, names):
+        if names is None:
+            return list(self._slots.items())
+        names = [names] if isinstance(names, str) else names
+        return [(name, self._slots[name]) for name in names if name in self._slots]
+
+    def _release_slot(self, slot):
+        slot.value = None
+        slot.state = RELEASED
+        self._release_shared(slot)
+
+    def _release_shared(self, slot):
+        if slot.shared_key is not None and self._release is not None:
+            self._release(slot.shared_key, self.token)
+
+    def _clear_process_cache(self):
+        # Hasil proses yang di-cache ikut memegang data gabungan; dihitung ulang/diambil dari cache bersama bila perlu
+        for shared_key, _ in self.process_cache.values():
+            if self._release is not None:
+                self._release(shared_key, self.token)
+        self.process_cache.clear()
+
+
+class SessionRegistry:
+    """Daftar semua SessionDataStore dalam proses, menegakkan kebijakan sesi menganggur & anggaran memori"""
+
+    def __init__(self, max_bytes=4 * 1024 * 1024 * 1024, compress_after=5 * 60, spill_after=30 * 60):
+        self.max_bytes = max_bytes
+        self.compress_after = compress_after
+        self.spill_after = spill_after
+        self._stores = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def register(self, store):
+        with self._lock:
+            self._stores[store.id] = store
+        return store
+
+    def stores(self):
+        with self._lock:
+            return list(self._stores.values())
+
+    def enforce(self, current=None):
+        """Mengompresi/memindahkan frame sesi menganggur; `current` (sesi yang sedang berjalan) dilewati"""
+        if not snapshots_available():
+            return
+        now = time.time()
+        others = sorted((store for store in self.stores() if store is not current), key=lambda s: s.last_active)
+        for store in others:
+            idle = now - store.last_active
+            if idle > self.spill_after:
+                store.spill()
+            elif idle > self.compress_after:
+                store.compress()
+
+        total = sum(store.memory_bytes() for store in self.stores())
+        for store in others:
+            if total <= self.max_bytes:
+                break
+            total -= store.spill()
+
+    def usage(self):
+        """Ringkasan memori per sesi (sesi paling aktif lebih dulu)"""
+        now = time.time()
+        rows = [{
+            'Sesi': store.id,
+            'Menganggur (menit)': (now - store.last_active) / 60,
+            'Frame': len(store.usage()),
+            'MB Memori': store.memory_bytes() / 1024 / 1024
+        } for store in sorted(self.stores(), key=lambda s: s.last_active, reverse=True)]
+        return pd.DataFrame(rows, columns=['Sesi', 'Menganggur (menit)', 'Frame', 'MB Memori'])
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,157 @@
+"""Cache dataset bersama antar sesi dalam satu proses server.
+
+Sesi yang mengunggah file yang sama (hash konten sama) memakai satu objek
+DataFrame hasil baca/proses yang sama, bukan salinan masing-masing. Setiap
+sesi memegang referensi lewat token sesi; entri yang masih dipegang tidak
+pernah dibuang, entri tanpa pemegang dibuang LRU saat total ukuran melebihi
+anggaran memori. Token dipegang secara weakref, sehingga referensi sesi yang
+sudah berakhir (state sesi dibersihkan) otomatis lepas.
+
+Nilai di cache dipakai bersama: jangan diubah di tempat (buat salinan dulu).
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class SessionToken:
+    """Penanda pemegang referensi untuk satu sesi (disimpan di state sesi)"""
+
+    __slots__ = ('__weakref__',)
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'holders', 'last_used')
+
+    def __init__(self, value, size):
+        self.value = value
+        self.size = size
+        self.holders = weakref.WeakSet()
+        self.last_used = time.time()
+
+
+class SharedDatasetCache:
+    """Cache LRU berbatas memori dengan hitungan referensi per sesi"""
+
+    def __init__(self, max_bytes=2 * 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Satu kunci per entri yang sedang dimuat, agar sesi bersamaan tidak menghitung ulang
+        self._loading = {}
+
+    def acquire(self, key, token, loader):
+        """Mengembalikan (nilai, dari_cache) untuk `key` dan mencatat `token` sebagai pemegang.
+
+        `loader()` hanya dipanggil sekali untuk key yang sama walaupun beberapa
+        sesi memintanya bersamaan.
+        """
+        value = self._get(key, token)
+        if value is not None:
+            return value, True
+
+        with self._lock:
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        with load_lock:
+            # Sesi lain mungkin sudah selesai memuat selagi kita menunggu
+            value = self._get(key, token)
+            if value is not None:
+                return value, True
+            try:
+                value = loader()
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            entry = _Entry(value, estimate_bytes(value))
+            entry.holders.add(token)
+            # Entri dimasukkan sebelum kunci muat dilepas: pemanggil baru yang tidak
+            # lagi menemukan kunci muat pasti menemukan entrinya (tidak memuat ulang)
+            with self._lock:
+                self._entries[key] = entry
+                self._loading.pop(key, None)
+                self.misses += 1
+                self._evict()
+        return value, False
+
+    def release(self, key, token):
+        """Melepas referensi `token` pada `key` (entri tetap ada sampai dibuang LRU)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.holders.discard(token)
+            # Juga membuang entri milik sesi yang sudah berakhir
+            self._evict()
+
+    def clear(self):
+        """Membuang semua entri yang tidak sedang dipegang, mengembalikan jumlahnya"""
+        with self._lock:
+            unused = [key for key, entry in self._entries.items() if not len(entry.holders)]
+            for key in unused:
+                del self._entries[key]
+        return len(unused)
+
+    def stats(self):
+        """Jumlah entri, total byte, entri yang dipegang & jumlah pemegang, hit/miss"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            'entries': len(entries),
+            'bytes': sum(entry.size for entry in entries),
+            'held': sum(1 for entry in entries if len(entry.holders)),
+            'references': sum(len(entry.holders) for entry in entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _get(self, key, token):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.holders.add(token)
+            entry.last_used = time.time()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def _evict(self):
+        # Dipanggil dengan self._lock terkunci; urutan OrderedDict = LRU
+        total = sum(entry.size for entry in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if len(entry.holders):
+                continue
+            del self._entries[key]
+            total -= entry.size
+
+
+def estimate_bytes(value, seen=None):
+    """Perkiraan memori DataFrame/Series di dalam nilai (tuple, list & dict ditelusuri).
+
+    Objek dengan id di `seen` (sudah dihitung di tempat lain) dilewati.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        # Objek yang sama dirujuk dua kali (mis. ringkasan & aggregates['by_product'])
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if hasattr(value, 'nbytes'):
+        # Array NumPy & objek yang melaporkan ukurannya sendiri (mis. SalesCube)
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(item, seen) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_bytes(item, seen) for item in value)
+    return 0
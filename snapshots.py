@@ -0,0 +1,214 @@
+"""Snapshot hasil proses (data gabungan, ringkasan & agregat) di disk.
+
+Setiap snapshot adalah satu folder berisi file Arrow IPC per tabel, dicatat
+di manifest.json. Saat dibuka, file dipetakan ke memori (memory-map) dan
+kolom numerik dibaca tanpa salinan, sehingga sesi setelah restart server
+bisa langsung melanjutkan tanpa unggah & proses ulang.
+
+Pemakaian:
+    store = SnapshotStore()
+    store.save(key, merged, summary, aggregates, label="pesanan.xlsx + income.xlsx")
+    for entry in store.entries(): ...
+    merged, summary, aggregates = store.load(entry['id'])
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from sales_cube import SalesCube
+from upload_cache import normalize_mixed_columns
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MANIFEST_NAME = "manifest.json"
+# Tabel DataFrame di dalam dict agregat; 'by_product' adalah ringkasan itu sendiri
+AGGREGATE_TABLES = ['orders', 'by_sku', 'daily', 'matched', 'order_only', 'settlement_only', 'reconciliation']
+
+_manifest_lock = threading.Lock()
+
+
+def snapshots_available():
+    """Snapshot memerlukan pyarrow"""
+    return pa is not None
+
+
+class SnapshotStore:
+    """Penyimpanan snapshot Arrow IPC dengan manifest, dibatasi jumlah snapshot terbaru"""
+
+    def __init__(self, snapshot_dir=".snapshots", max_snapshots=10, compression='lz4'):
+        self.snapshot_dir = snapshot_dir
+        self.max_snapshots = max_snapshots
+        # lz4: ±3x lebih kecil, dekompresi cepat. None: kolom numerik dibaca langsung
+        # dari memory-map tanpa salinan (tercepat, file terbesar)
+        self.compression = compression
+
+    def save(self, key, merged, summary, aggregates, label=""):
+        """Menyimpan snapshot (atau menyegarkan waktu snapshot yang sama); mengembalikan entri manifest"""
+        existing = self._find(key)
+        if existing is not None:
+            return self._touch(existing)
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        folder = os.path.join(self.snapshot_dir, key)
+        tmp_folder = f"{folder}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_folder, exist_ok=True)
+        try:
+            tables = {'merged': merged, 'summary': summary, 'totals': pd.DataFrame([aggregates['totals']])}
+            tables.update({name: aggregates[name] for name in AGGREGATE_TABLES if name in aggregates})
+            for name, df in tables.items():
+                self._write_table(os.path.join(tmp_folder, f"{name}.arrow"), df)
+            shutil.rmtree(folder, ignore_errors=True)
+            os.replace(tmp_folder, folder)
+        except Exception:
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+            raise
+
+        entry = {
+            'id': key,
+            'label': label,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'last_used': time.time(),
+            'rows': len(merged),
+            'products': len(summary),
+            'date_column': aggregates.get('date_column'),
+            'bytes': _folder_size(folder)
+        }
+        with _manifest_lock:
+            manifest = [item for item in self._read_manifest() if item['id'] != key]
+            manifest.append(entry)
+            self._write_manifest(manifest)
+        self.evict()
+        return entry
+
+    def load(self, key):
+        """Membuka snapshot lewat memory-map; mengembalikan (merged, summary, aggregates)"""
+        entry = self._find(key)
+        if entry is None:
+            raise KeyError(key)
+        folder = os.path.join(self.snapshot_dir, key)
+        merged = self._read_table(os.path.join(folder, 'merged.arrow'))
+        summary = self._read_table(os.path.join(folder, 'summary.arrow'))
+        totals = self._read_table(os.path.join(folder, 'totals.arrow')).iloc[0].to_dict()
+        totals = {name: None if _is_missing(value) else value for name, value in totals.items()}
+        # Snapshot lama belum memiliki tabel rekonsiliasi
+        aggregates = {
+            name: self._read_table(os.path.join(folder, f"{name}.arrow")) for name in AGGREGATE_TABLES
+            if os.path.exists(os.path.join(folder, f"{name}.arrow"))
+        }
+        aggregates.update({'by_product': summary, 'totals': totals, 'date_column': entry.get('date_column')})
+        # Kubus penjualan tidak disimpan: dibangun ulang dari data gabungan (jauh lebih cepat dari proses penuh)
+        aggregates['cube'] = SalesCube.from_lines(merged)
+        self._touch(entry)
+        return merged, summary, aggregates
+
+    def entries(self):
+        """Entri manifest, terbaru lebih dulu"""
+        return sorted(self._read_manifest(), key=lambda item: item['last_used'], reverse=True)
+
+    def delete(self, key):
+        with _manifest_lock:
+            manifest = self._read_manifest()
+            self._write_manifest([item for item in manifest if item['id'] != key])
+        shutil.rmtree(os.path.join(self.snapshot_dir, key), ignore_errors=True)
+
+    def evict(self):
+        """Menghapus snapshot yang paling lama tidak dipakai di atas batas jumlah"""
+        for entry in self.entries()[self.max_snapshots:]:
+            self.delete(entry['id'])
+
+    def _write_table(self, path, df):
+        with pa.OSFile(path, 'wb') as sink:
+            write_ipc(sink, df, compression=self.compression)
+
+    @staticmethod
+    def _read_table(path):
+        with pa.memory_map(path, 'r') as source:
+            return read_ipc(source)
+
+    def _find(self, key):
+        return next((item for item in self._read_manifest() if item['id'] == key), None)
+
+    def _touch(self, entry):
+        with _manifest_lock:
+            manifest = self._read_manifest()
+            for item in manifest:
+                if item['id'] == entry['id']:
+                    item['last_used'] = time.time()
+                    entry = item
+            self._write_manifest(manifest)
+        return entry
+
+    def _manifest_path(self):
+        return os.path.join(self.snapshot_dir, MANIFEST_NAME)
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return []
+        # Entri yang foldernya hilang (dihapus manual) diabaikan
+        return [item for item in manifest if os.path.isdir(os.path.join(self.snapshot_dir, item['id']))]
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = self._manifest_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def write_ipc(sink, df, compression=None):
+    """Menulis DataFrame sebagai file Arrow IPC ke `sink` (file atau buffer pyarrow)"""
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Kolom object bercampur (mis. SKU angka & teks): samakan menjadi teks
+        table = pa.Table.from_pandas(normalize_mixed_columns(df))
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+def read_ipc(source):
+    """Membaca file Arrow IPC dari `source` (memory-map atau buffer) menjadi DataFrame"""
+    table = pa.ipc.open_file(source).read_all()
+    # Kolom string[pyarrow] dibungkus langsung dari buffer Arrow; to_pandas()
+    # akan mengubahnya menjadi string Python satu per satu
+    metadata = table.schema.pandas_metadata or {}
+    # Kolom indeks (mis. Order ID pada tabel rekonsiliasi) tetap dibangun oleh to_pandas()
+    index_columns = [name for name in metadata.get('index_columns', []) if isinstance(name, str)]
+    arrow_strings = [
+        column['field_name'] for column in metadata.get('columns', [])
+        if column.get('numpy_type') == 'string' and column['field_name'] in table.column_names
+        and pa.types.is_large_string(table.schema.field(column['field_name']).type)
+    ]
+    if not arrow_strings:
+        return table.to_pandas(split_blocks=True)
+    df = table.drop_columns([name for name in arrow_strings if name not in index_columns]).to_pandas(split_blocks=True)
+    if len(index_columns) == 1 and index_columns[0] in arrow_strings:
+        df.index = pd.Index(pd.arrays.ArrowStringArray(table.column(index_columns[0])), name=df.index.name)
+    for name in arrow_strings:
+        if name not in index_columns:
+            df[name] = pd.Series(pd.arrays.ArrowStringArray(table.column(name)), index=df.index)
+    return df[[name for name in table.column_names if name not in index_columns]]
+
+
+def _folder_size(folder):
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+
+def _is_missing(value):
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,170 @@
+"""Konsol SQL ad-hoc atas tabel hasil proses sesi.
+
+Tabel (data gabungan, ringkasan, daftar biaya, ...) didaftarkan ke mesin SQL
+tertanam di memori. DuckDB (bila terpasang) membaca DataFrame langsung tanpa
+salinan dan mengeksekusi kueri secara vektor per kolom; tanpa DuckDB dipakai
+SQLite bawaan Python (tabel disalin sekali ke database memori).
+
+Nama kolom diubah ke snake_case seperti di gudang data ("Seller SKU" ->
+seller_sku). Hanya satu pernyataan SELECT/WITH per kueri; hasil diambil per
+halaman (LIMIT/OFFSET di atas kueri pengguna) dan kueri dihentikan setelah
+batas waktu.
+
+Pemakaian:
+    console = SqlConsole({'merged_data': merged, 'summary_data': summary})
+    page = console.run("SELECT seller_sku, SUM(quantity) FROM merged_data GROUP BY 1", page=0)
+    page['frame'], page['total_rows']
+"""
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+PAGE_SIZE = 100
+TIMEOUT_SECONDS = 10
+
+# Jumlah instruksi VM SQLite di antara pemeriksaan batas waktu
+_SQLITE_PROGRESS_STEPS = 10_000
+
+# SELECT/WITH di awal kueri, setelah komentar "-- ..." atau "/* ... */" bila ada
+_READ_ONLY = re.compile(r'^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*(select|with)\b', re.IGNORECASE | re.DOTALL)
+
+
+def engine_name():
+    return "DuckDB" if duckdb is not None else "SQLite"
+
+
+def sql_column_names(columns):
+    """Nama kolom snake_case yang unik ("Order created time(UTC)" -> order_created_time_utc)"""
+    names = []
+    for column in columns:
+        name = re.sub(r'[^0-9a-z]+', '_', str(column).lower()).strip('_') or 'column'
+        if name[0].isdigit():
+            name = f"c_{name}"
+        base, suffix = name, 2
+        while name in names:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        names.append(name)
+    return names
+
+
+def table_schema(df):
+    """Kolom (nama SQL) & tipe sebuah tabel untuk ditampilkan di UI"""
+    return pd.DataFrame({'Kolom': sql_column_names(df.columns), 'Tipe': df.dtypes.astype(str).to_numpy()})
+
+
+class SqlConsole:
+    """Koneksi SQL memori berisi tabel-tabel sesi; satu kueri berjalan pada satu waktu"""
+
+    def __init__(self, tables):
+        self.engine = engine_name()
+        self._pending = {}
+        self._result = None
+        self._lock = threading.Lock()
+        if duckdb is not None:
+            self._conn = duckdb.connect(':memory:')
+        else:
+            # Rerun Streamlit berjalan di thread yang berbeda-beda; akses diserialkan lewat self._lock
+            self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+
+        for name, df in tables.items():
+            df = df.set_axis(sql_column_names(df.columns), axis=1, copy=False)
+            if duckdb is not None:
+                self._conn.register(name, df)
+            else:
+                # SQLite perlu menyalin tabel: baru dilakukan saat tabel pertama kali dipakai kueri
+                self._pending[name] = df
+
+        if duckdb is not None:
+            # Kueri hanya boleh membaca tabel sesi, bukan file/URL di server
+            self._conn.execute("SET enable_external_access = false")
+
+    def run(self, sql, page=0, page_size=PAGE_SIZE, timeout=TIMEOUT_SECONDS):
+        """Menjalankan satu kueri SELECT/WITH dan mengembalikan satu halaman hasil.
+
+        Hasil kueri terakhir disimpan sebagai tabel sementara, sehingga pindah
+        halaman tidak menjalankan ulang kueri. Mengembalikan dict frame,
+        total_rows, page, pages & elapsed (detik). ValueError untuk kueri yang
+        bukan SELECT atau kesalahan SQL, TimeoutError bila melewati `timeout` detik.
+        """
+        sql = sql.strip().rstrip(';').strip()
+        if not _READ_ONLY.match(sql):
+            raise ValueError("Hanya kueri SELECT/WITH yang diizinkan")
+
+        started = time.perf_counter()
+        with self._lock:
+            if self._result is None or self._result[0] != sql:
+                self._load_tables(sql)
+                self._execute("DROP TABLE IF EXISTS _result", timeout)
+                self._result = None
+                # Kueri pengguna dibungkus subkueri: pernyataan kedua (mis. "; DROP ...") gagal diurai.
+                # Baris baru sebelum ")" agar komentar "--" di akhir kueri tidak ikut menutupnya
+                self._execute(f"CREATE TEMP TABLE _result AS SELECT * FROM ({sql}\n) AS q", timeout)
+                total = self._fetch("SELECT COUNT(*) AS n FROM _result", timeout).iloc[0, 0]
+                self._result = (sql, int(total))
+            total_rows = self._result[1]
+            pages = max((total_rows + page_size - 1) // page_size, 1)
+            page = min(max(page, 0), pages - 1)
+            frame = self._fetch(
+                f"SELECT * FROM _result LIMIT {int(page_size)} OFFSET {int(page * page_size)}", timeout
+            )
+        return {
+            'frame': frame,
+            'total_rows': total_rows,
+            'page': page,
+            'pages': pages,
+            'elapsed': time.perf_counter() - started
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _load_tables(self, sql):
+        for name in [name for name in self._pending if re.search(rf'\b{re.escape(name)}\b', sql, re.IGNORECASE)]:
+            self._pending.pop(name).to_sql(name, self._conn, index=False)
+
+    def _fetch(self, sql, timeout):
+        cursor = self._execute(sql, timeout)
+        if duckdb is not None:
+            return cursor.df()
+        columns = [description[0] for description in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def _execute(self, sql, timeout):
+        if duckdb is not None:
+            return self._execute_duckdb(sql, timeout)
+        return self._execute_sqlite(sql, timeout)
+
+    def _execute_duckdb(self, sql, timeout):
+        timer = threading.Timer(timeout, self._conn.interrupt)
+        timer.start()
+        try:
+            return self._conn.execute(sql)
+        except duckdb.InterruptException:
+            raise TimeoutError(f"Kueri dihentikan setelah {timeout} detik") from None
+        except duckdb.Error as e:
+            raise ValueError(str(e)) from None
+        finally:
+            timer.cancel()
+
+    def _execute_sqlite(self, sql, timeout):
+        deadline = time.monotonic() + timeout
+        # Nilai kembali bukan nol menghentikan kueri (OperationalError "interrupted")
+        self._conn.set_progress_handler(lambda: time.monotonic() > deadline, _SQLITE_PROGRESS_STEPS)
+        try:
+            return self._conn.execute(sql)
+        except sqlite3.Error as e:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Kueri dihentikan setelah {timeout} detik") from None
+            raise ValueError(str(e)) from None
+        finally:
+            self._conn.set_progress_handler(None, 0)
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import generate_exports  # noqa: E402
+from income_core import IncomeApp  # noqa: E402
+from memory_utils import optimize_dtypes  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """IncomeApp dengan file biaya sementara (product_costs.json repo tidak disentuh)"""
+    return IncomeApp(cost_file=str(tmp_path / "product_costs.json"))
+
+
+@pytest.fixture(scope="session")
+def exports():
+    """(pesanan, pendapatan, cost_data) sintetis seperti di benchmark"""
+    orders, income, cost_data = generate_exports(5_000, seed=7)[:3]
+    return optimize_dtypes(orders), optimize_dtypes(income), cost_data
+
+
+@pytest.fixture(scope="session")
+def processed(exports):
+    """Hasil process_data atas data sintetis"""
+    orders, income, cost_data = exports
+    return IncomeApp(cost_file="").process_data(orders, income, cost_data)
+
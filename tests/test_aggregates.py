@@ -0,0 +1,23 @@
+import numpy as np
+
+
+def test_orders_table_has_one_row_per_order(processed):
+    merged, _, aggregates = processed
+    orders = aggregates['orders']
+    assert orders['Order ID'].is_unique
+    assert set(orders['Order ID']) == set(merged['Order ID'])
+    assert orders['Lines'].sum() == len(merged)
+    assert orders['Quantity'].sum() == merged['Quantity'].sum()
+    settlement = merged.drop_duplicates('Order ID').set_index('Order ID')['Total settlement amount']
+    np.testing.assert_array_equal(orders.set_index('Order ID')['Revenue'].to_numpy(),
+                                  settlement.loc[orders['Order ID']].to_numpy())
+
+
+def test_totals_come_from_the_orders_table(processed):
+    _, summary, aggregates = processed
+    orders, totals = aggregates['orders'], aggregates['totals']
+    assert totals['total_orders'] == len(orders)
+    assert totals['total_qty'] == orders['Quantity'].sum()
+    assert np.isclose(totals['total_revenue'], orders['Revenue'].sum())
+    assert np.isclose(totals['total_profit'], totals['total_revenue'] - summary['Total Cost'].sum())
+    assert aggregates['by_product'] is summary
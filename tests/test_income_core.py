@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from income_core import DEFAULT_COST_KEY, cost_key
+
+
+def make_orders(rows):
+    """Data pesanan selesai dari tuple (Order ID, Seller SKU, Variation, Product Name, Quantity, waktu)"""
+    return pd.DataFrame(rows, columns=[
+        'Order ID', 'Seller SKU', 'Variation', 'Product Name', 'Quantity', 'Order created time(UTC)'
+    ]).assign(**{'Order Status': 'Selesai'})
+
+
+def make_income(amounts):
+    """Data pendapatan dari {Order ID: nominal settlement}"""
+    return pd.DataFrame({
+        'Order/adjustment ID': list(amounts),
+        'Total settlement amount': [float(amount) for amount in amounts.values()]
+    })
+
+
+def test_allocation_sums_to_settlement(processed):
+    merged, _, _ = processed
+    per_order = merged.groupby('Order ID', observed=True).agg(
+        allocated=('Allocated Revenue', 'sum'),
+        settlement=('Total settlement amount', 'first')
+    )
+    np.testing.assert_array_equal(per_order['allocated'].to_numpy(), per_order['settlement'].to_numpy())
+
+
+def test_allocation_rounds_to_whole_rupiah(app):
+    orders = make_orders([
+        ('A', 'S1', 'Hitam', 'Dompet', 1, '01/07/2024 10:00:00'),
+        ('A', 'S2', 'Hitam', 'Tas', 1, '01/07/2024 10:00:00'),
+        ('A', 'S3', 'Hitam', 'Strap', 1, '01/07/2024 10:00:00')
+    ])
+    merged, _, _ = app.process_data(orders, make_income({'A': 100}), {})
+    allocated = merged['Allocated Revenue'].to_numpy()
+    assert allocated.sum() == 100
+    assert np.array_equal(allocated, np.round(allocated))
+
+
+def test_cost_revisions_as_of_order_time(app):
+    orders = make_orders([
+        ('A', 'S1', 'Hitam', 'Dompet', 1, '05/07/2024 10:00:00'),
+        ('B', 'S1', 'Hitam', 'Dompet', 1, '15/07/2024 10:00:00'),
+        ('C', 'S1', 'Hitam', 'Dompet', 2, '25/07/2024 10:00:00'),
+        ('D', 'S1', 'Hitam', 'Dompet', 1, None)
+    ])
+    cost_data = {'Dompet': [{'from': '2024-07-10', 'cost': 100}, {'from': '2024-07-20', 'cost': 150}]}
+    merged, _, _ = app.process_data(orders, make_income({key: 1000 for key in 'ABCD'}), cost_data)
+    unit_cost = merged.set_index('Order ID')['Unit Cost']
+    # Sebelum revisi pertama: revisi paling awal; tanpa tanggal: revisi terbaru
+    assert unit_cost.to_dict() == {'A': 100.0, 'B': 100.0, 'C': 150.0, 'D': 150.0}
+    assert merged.set_index('Order ID').loc['C', 'Line Cost'] == 300.0
+
+
+def test_cost_key_precedence(app):
+    orders = make_orders([
+        ('A', 'S1', 'Hitam', 'Dompet', 1, '01/07/2024 10:00:00'),
+        ('B', 'S1', 'Putih', 'Dompet', 1, '01/07/2024 10:00:00'),
+        ('C', 'S2', 'Hitam', 'Dompet', 1, '01/07/2024 10:00:00'),
+        ('D', 'S3', 'Hitam', 'Tas', 1, '01/07/2024 10:00:00')
+    ])
+    income = make_income({key: 1000 for key in 'ABCD'})
+    cost_data = {
+        cost_key('S1', 'Hitam'): 40,
+        cost_key('S1'): 30,
+        'Dompet': 20,
+        DEFAULT_COST_KEY: 10
+    }
+    merged, _, _ = app.process_data(orders, income, cost_data)
+    lines = merged.set_index('Order ID')
+    assert lines['Unit Cost'].to_dict() == {'A': 40.0, 'B': 30.0, 'C': 20.0, 'D': 10.0}
+    assert lines['Cost Source'].astype(str).to_dict() == {
+        'A': 'SKU + Variation', 'B': 'SKU', 'C': 'Product Name', 'D': 'Default'
+    }
+
+    del cost_data[DEFAULT_COST_KEY]
+    merged, _, _ = app.process_data(orders, income, cost_data)
+    lines = merged.set_index('Order ID')
+    assert lines.loc['D', 'Unit Cost'] == 0.0
+    assert lines.loc['D', 'Cost Source'] == 'None'
+
+
+def test_empty_cost_data(app, exports):
+    orders, income, _ = exports
+    merged, summary, aggregates = app.process_data(orders, income, {})
+    assert (merged['Unit Cost'] == 0).all()
+    assert (merged['Cost Source'] == 'None').all()
+    assert summary['Total Cost'].sum() == 0
+    assert aggregates['totals']['total_cost'] == 0
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parents[1] / "income_streamlit.py")
+
+
+def fragment_app():
+    from collections import deque
+
+    import streamlit as st
+
+    import income_streamlit as ui
+
+    if 'perf_runs' not in st.session_state:
+        st.session_state.perf_runs = deque(maxlen=20)
+        st.session_state.perf_run_id = 0
+
+    @ui.timed_fragment('Fragmen: uji')
+    def table():
+        st.write('tabel')
+
+    @ui.timed_fragment('Fragmen: berkala', run_every=1)
+    def progress():
+        st.write('kemajuan')
+
+    table()
+    progress()
+
+
+def top_stages(run):
+    return [r['stage'] for r in run['records'] if r['depth'] == 0]
+
+
+def test_fragment_without_active_run_is_recorded_as_its_own_run():
+    at = AppTest.from_function(fragment_app, default_timeout=60)
+    at.run()
+    at.run()
+    assert not at.exception
+    stages = [top_stages(run) for run in at.session_state.perf_runs]
+    # Fragmen biasa bertambah tiap rerun, fragmen berkala hanya menyimpan yang terbaru
+    assert stages == [['Fragmen: uji'], ['Fragmen: uji'], ['Fragmen: berkala']]
+
+
+def test_fragments_are_stages_of_the_full_rerun():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    assert not at.exception
+    stages = [r['stage'] for r in at.session_state.perf_runs[-1]['records']]
+    for name in ('Fragmen: dasbor', 'Fragmen: analisis lanjutan', 'Fragmen: detail data', 'Fragmen: gudang data'):
+        assert name in stages
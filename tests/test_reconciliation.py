@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from income_core import RECONCILIATION_STATUSES
+
+
+def test_reconciliation_splits(exports, processed):
+    orders, income, _ = exports
+    merged, _, aggregates = processed
+    reconciliation = aggregates['reconciliation'].set_index('Status')
+    assert list(reconciliation.index) == RECONCILIATION_STATUSES
+
+    completed = set(orders.loc[orders['Order Status'] == 'Selesai', 'Order ID'])
+    settled = set(income['Order/adjustment ID'])
+    assert set(aggregates['matched'].index) == completed & settled
+    assert set(aggregates['order_only'].index) == completed - settled
+    assert set(aggregates['settlement_only'].index) == settled - completed
+    for status, name in zip(RECONCILIATION_STATUSES, ('matched', 'order_only', 'settlement_only')):
+        assert reconciliation.loc[status, 'Orders'] == len(aggregates[name])
+    assert reconciliation.loc['Matched', 'Orders'] == aggregates['totals']['total_orders']
+
+    # Semua nominal settlement terbagi ke status Matched & Settlement Only
+    assert np.isclose(reconciliation['Settlement Amount'].sum(), income['Total settlement amount'].sum())
+    assert np.isclose(
+        reconciliation.loc['Matched', 'Settlement Amount'],
+        merged.drop_duplicates('Order ID')['Total settlement amount'].sum()
+    )
+    assert reconciliation.loc['Matched', 'Lines'] + reconciliation.loc['Order Only', 'Lines'] == \
+        (orders['Order Status'] == 'Selesai').sum()
+
+
+def test_matched_difference(processed):
+    _, _, aggregates = processed
+    matched = aggregates['matched']
+    np.testing.assert_allclose(
+        matched['Difference'].to_numpy(),
+        (matched['Total settlement amount'] - matched['Order Amount']).to_numpy()
+    )
+    reconciliation = aggregates['reconciliation'].set_index('Status')
+    assert np.isclose(reconciliation.loc['Matched', 'Order Amount'], matched['Order Amount'].sum())
+
+
+def test_settlement_only_carries_other_order_status(exports, processed):
+    orders, _, _ = exports
+    _, _, aggregates = processed
+    settlement_only = aggregates['settlement_only']
+    statuses = orders.drop_duplicates('Order ID').set_index('Order ID')['Order Status'].astype(object)
+    known = settlement_only.index.isin(statuses.index)
+    assert known.any()
+    assert (settlement_only.loc[known, 'Order Status'] == statuses.loc[settlement_only.index[known]]).all()
+    assert settlement_only.loc[~known, 'Order Status'].isna().all()
+
+
+def test_workbook_has_reconciliation_sheets(app, processed):
+    merged, summary, aggregates = processed
+    report = app.create_excel_report(merged, summary, {}, aggregates)
+    with report:
+        sheets = pd.ExcelFile(report).sheet_names
+    assert {'Rekonsiliasi', 'Pesanan Cocok', 'Pesanan Tanpa Settlement', 'Settlement Tanpa Pesanan'} <= set(sheets)
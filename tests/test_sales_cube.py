@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from sales_cube import SalesCube
+
+
+def test_by_product_matches_groupby(processed):
+    merged, _, aggregates = processed
+    cube = aggregates['cube']
+    expected = merged.groupby(['Seller SKU', 'Product Name', 'Variation'], observed=True).agg(
+        TotalQty=('Quantity', 'sum'), Revenue=('Allocated Revenue', 'sum')
+    )
+    summary = cube.by_product().set_index(['Seller SKU', 'Product Name', 'Variation'])
+    assert len(summary) == len(expected)
+    np.testing.assert_array_equal(summary.loc[expected.index, 'TotalQty'].to_numpy(), expected['TotalQty'].to_numpy())
+    np.testing.assert_allclose(summary.loc[expected.index, 'Revenue'].to_numpy(), expected['Revenue'].to_numpy())
+
+
+def test_date_range_totals(processed):
+    merged, _, aggregates = processed
+    cube = aggregates['cube']
+    start, end = pd.Timestamp('2024-07-10'), pd.Timestamp('2024-07-20')
+    in_range = merged['Order Time'].dt.normalize().between(start, end)
+    totals = cube.totals(start, end)
+    assert totals['quantity'] == merged.loc[in_range, 'Quantity'].sum()
+    assert np.isclose(totals['revenue'], merged.loc[in_range, 'Allocated Revenue'].sum())
+    assert totals['orders'] == merged.loc[in_range, 'Order ID'].nunique()
+
+
+def test_outlier_date_does_not_widen_the_cube(processed):
+    merged, _, aggregates = processed
+    outlier = merged.iloc[:1].assign(**{'Order ID': 'OUTLIER', 'Order Time': pd.Timestamp('2000-01-01 10:00')})
+    cube = SalesCube.from_lines(pd.concat([merged, outlier], ignore_index=True))
+    assert cube.date_range == aggregates['cube'].date_range
+    assert cube.lines.shape == aggregates['cube'].lines.shape
+    assert cube.out_of_range == 1
+    # Baris pencilan tetap ikut total seluruh periode, tidak di rentang tanggal mana pun
+    assert cube.totals()['quantity'] == aggregates['cube'].totals()['quantity'] + outlier['Quantity'].sum()
+    first_day, last_day = cube.date_range
+    assert cube.totals(first_day, last_day) == aggregates['cube'].totals(first_day, last_day)
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from sales_cube import SalesCube
+from session_store import COMPRESSED, HOT, RELEASED, SPILLED, SessionDataStore
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionDataStore(spill_dir=str(tmp_path))
+
+
+def test_compress_round_trip(store, processed):
+    merged, _, _ = processed
+    store.put('merged_data', merged)
+    freed = store.compress(['merged_data'])
+    assert freed > 0
+    assert store.usage().set_index('Frame').loc['merged_data', 'Status'] == COMPRESSED
+    pd.testing.assert_frame_equal(store.get('merged_data'), merged)
+    assert store.usage().set_index('Frame').loc['merged_data', 'Status'] == HOT
+
+
+def test_spill_round_trip(store, processed):
+    _, _, aggregates = processed
+    order_only = aggregates['order_only']
+    store.put('aggregate_order_only', order_only)
+    store.compress()
+    store.spill()
+    assert store.usage().set_index('Frame').loc['aggregate_order_only', 'Status'] == SPILLED
+    assert store.memory_bytes() == 0
+    pd.testing.assert_frame_equal(store.get('aggregate_order_only'), order_only)
+
+
+def test_reloadable_value_is_released(store, processed):
+    merged, _, aggregates = processed
+    store.put('aggregate_cube', aggregates['cube'], reload=lambda: SalesCube.from_lines(merged))
+    store.spill()
+    assert store.usage().set_index('Frame').loc['aggregate_cube', 'Status'] == RELEASED
+    cube = store.get('aggregate_cube')
+    pd.testing.assert_frame_equal(cube.by_sku(), aggregates['cube'].by_sku())
+
+
+def test_non_frame_needs_reload(store, processed):
+    _, _, aggregates = processed
+    with pytest.raises(TypeError):
+        store.put('aggregate_cube', aggregates['cube'])
@@ -0,0 +1,48 @@
+import pytest
+
+from sql_console import SqlConsole, sql_column_names
+
+
+@pytest.fixture
+def console(processed):
+    merged, summary, _ = processed
+    return SqlConsole({'merged_data': merged, 'summary_data': summary})
+
+
+def test_column_names_are_snake_case():
+    assert sql_column_names(['Seller SKU', 'Order created time(UTC)', '60% Share', 'Seller SKU']) == [
+        'seller_sku', 'order_created_time_utc', 'c_60_share', 'seller_sku_2'
+    ]
+
+
+@pytest.mark.parametrize('sql', [
+    "DELETE FROM merged_data",
+    "DROP TABLE merged_data",
+    "ATTACH DATABASE 'x.db' AS x",
+    "PRAGMA table_info(merged_data)"
+])
+def test_rejects_statements_other_than_select(console, sql):
+    with pytest.raises(ValueError):
+        console.run(sql)
+
+
+def test_rejects_second_statement(console):
+    with pytest.raises(ValueError):
+        console.run("SELECT 1; DROP TABLE merged_data")
+    assert console.run("SELECT COUNT(*) AS n FROM merged_data")['frame'].iloc[0, 0] > 0
+
+
+def test_select_with_leading_comment_and_paging(console, processed):
+    merged, _, _ = processed
+    page = console.run("-- semua baris\nSELECT order_id FROM merged_data", page=1, page_size=100)
+    assert page['total_rows'] == len(merged)
+    assert page['page'] == 1
+    assert len(page['frame']) == min(100, len(merged) - 100)
+
+
+def test_timeout(console):
+    endless = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT MAX(i) FROM n"
+    with pytest.raises(TimeoutError):
+        console.run(endless, timeout=0.2)
+    # Koneksi tetap bisa dipakai setelah kueri dihentikan
+    assert console.run("SELECT 1 AS one")['frame'].iloc[0, 0] == 1
@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+import pytest
+
+import upload_cache as upload_cache_module
+from upload_cache import UploadCache, normalize_mixed_columns
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return UploadCache(cache_dir=str(tmp_path / "cache"))
+
+
+def frame(n=100, offset=0):
+    return pd.DataFrame({'Order ID': [f"O{offset + i}" for i in range(n)], 'Quantity': range(n)})
+
+
+def test_content_hash_depends_on_content_and_variant():
+    assert UploadCache.content_hash(b"a", "v1") == UploadCache.content_hash(b"a", "v1")
+    assert UploadCache.content_hash(b"a", "v1") != UploadCache.content_hash(b"b", "v1")
+    assert UploadCache.content_hash(b"a", "v1") != UploadCache.content_hash(b"a", "v2")
+
+
+def test_miss_then_hit(cache):
+    calls = []
+
+    def reader():
+        calls.append(1)
+        return frame()
+
+    df, from_cache = cache.load("k", reader)
+    assert not from_cache
+    cached, from_cache = cache.load("k", reader)
+    assert from_cache
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(cached, df)
+    assert cache.get("other") is None
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    cache.put("k", frame())
+    with open(cache._path("k"), "wb") as f:
+        f.write(b"bukan parquet")
+    assert cache.get("k") is None
+    assert not os.path.exists(cache._path("k"))
+
+
+def test_lru_eviction(cache):
+    for i, key in enumerate("abc"):
+        cache.put(key, frame(offset=i))
+        os.utime(cache._path(key), (1_000 + i, 1_000 + i))
+    # Akses memperbarui waktu pakai: b menjadi entri paling lama
+    assert cache.get("a") is not None
+    sizes = {key: os.path.getsize(cache._path(key)) for key in "abc"}
+    cache.max_bytes = sizes["a"] + sizes["c"]
+    cache.evict()
+    assert [key for key in "abc" if os.path.exists(cache._path(key))] == ["a", "c"]
+
+
+def test_clear_and_stats(cache):
+    cache.put("a", frame())
+    cache.put("b", frame())
+    entries, size = cache.stats()
+    assert entries == 2 and size > 0
+    assert cache.clear() == 2
+    assert cache.stats() == (0, 0)
+
+
+def test_mixed_columns_same_frame_on_miss_and_hit(cache):
+    # SKU angka & teks dalam satu kolom tidak bisa ditulis Arrow apa adanya
+    df = pd.DataFrame({'Seller SKU': [1001, 'DSM-2', None], 'Quantity': [1, 2, 3]})
+    missed, from_cache = cache.load("k", lambda: df)
+    assert not from_cache
+    hit, from_cache = cache.load("k", lambda: df)
+    assert from_cache
+    pd.testing.assert_frame_equal(missed, hit)
+    assert missed['Seller SKU'].tolist()[:2] == ['1001', 'DSM-2']
+    assert pd.isna(missed['Seller SKU'].iloc[2])
+    pd.testing.assert_frame_equal(normalize_mixed_columns(df), missed)
+
+
+def test_hit_survives_concurrent_eviction(cache, monkeypatch):
+    cache.put("k", frame())
+    read_parquet = pd.read_parquet
+
+    def read_then_evict(path, *args, **kwargs):
+        df = read_parquet(path, *args, **kwargs)
+        os.remove(path)
+        return df
+
+    monkeypatch.setattr(upload_cache_module.pd, "read_parquet", read_then_evict)
+    pd.testing.assert_frame_equal(cache.get("k"), frame())
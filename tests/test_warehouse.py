@@ -0,0 +1,87 @@
+import multiprocessing
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from warehouse import Warehouse
+
+
+@pytest.fixture
+def warehouse(tmp_path, exports, processed):
+    _, income, _ = exports
+    merged, _, _ = processed
+    store = Warehouse(str(tmp_path / "warehouse.sqlite"))
+    settlements = income.groupby('Order/adjustment ID', as_index=False, observed=True)['Total settlement amount'].sum()
+    store.upsert(merged, settlements)
+    return store
+
+
+def scan(store, sql, params=()):
+    with sqlite3.connect(store.path) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def monthly_from_lines(store, where="1", params=()):
+    summary = scan(store, f"""
+        SELECT substr(order_time, 1, 7) AS Month, COUNT(DISTINCT order_id) AS Orders, SUM(quantity) AS Quantity,
+               SUM(allocated_revenue) AS Revenue, SUM(line_cost) AS "Total Cost"
+        FROM order_lines WHERE {where} GROUP BY 1 ORDER BY 1
+    """, params)
+    summary['Profit'] = summary['Revenue'] - summary['Total Cost']
+    return summary
+
+
+def test_rollups_match_order_lines(warehouse):
+    pd.testing.assert_frame_equal(warehouse.monthly_summary(), monthly_from_lines(warehouse), check_dtype=False)
+    sku = scan(warehouse, "SELECT seller_sku FROM order_lines LIMIT 1").iloc[0, 0]
+    pd.testing.assert_frame_equal(
+        warehouse.monthly_summary(start='2024-07-10', end='2024-07-20', sku=sku),
+        monthly_from_lines(warehouse, "seller_sku = ? AND order_time >= '2024-07-10' AND order_time < '2024-07-21'",
+                           (sku,)),
+        check_dtype=False
+    )
+    stats = warehouse.stats()
+    assert stats['lines'] == scan(warehouse, "SELECT COUNT(*) FROM order_lines").iloc[0, 0]
+    assert stats['orders'] == scan(warehouse, "SELECT COUNT(DISTINCT order_id) FROM order_lines").iloc[0, 0]
+
+
+def test_upsert_replaces_orders_and_bumps_version(warehouse, processed):
+    merged, _, _ = processed
+    version = warehouse.version()
+    changed = merged[merged['Order ID'].isin(merged['Order ID'].unique()[:20])].assign(
+        Quantity=lambda df: df['Quantity'] * 2
+    )
+    warehouse.upsert(changed, pd.DataFrame(columns=['Order/adjustment ID', 'Total settlement amount']))
+    assert warehouse.version() == version + 1
+    assert warehouse.stats()['lines'] == len(merged)
+    pd.testing.assert_frame_equal(warehouse.monthly_summary(), monthly_from_lines(warehouse), check_dtype=False)
+
+
+def _upsert_worker(path, part, settlements, barrier):
+    barrier.wait()
+    return Warehouse(path).upsert(part, settlements)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="butuh start method fork")
+def test_concurrent_upserts_wait_for_the_write_lock(tmp_path, exports, processed):
+    _, income, _ = exports
+    merged, _, _ = processed
+    path = str(tmp_path / "warehouse.sqlite")
+    Warehouse(path)
+    settlements = income.groupby('Order/adjustment ID', as_index=False, observed=True)['Total settlement amount'].sum()
+    order_ids = merged['Order ID'].unique()
+    parts = [merged[merged['Order ID'].isin(order_ids[start::4])] for start in range(4)]
+
+    context = multiprocessing.get_context('fork')
+    barrier = context.Manager().Barrier(len(parts))
+    with ProcessPoolExecutor(len(parts), mp_context=context) as pool:
+        futures = [pool.submit(_upsert_worker, path, part, settlements, barrier) for part in parts]
+        written = [future.result() for future in futures]
+
+    assert written == [len(part) for part in parts]
+    store = Warehouse(path)
+    assert store.version() == len(parts)
+    assert store.stats()['lines'] == len(merged)
+    pd.testing.assert_frame_equal(store.monthly_summary(), monthly_from_lines(store), check_dtype=False)
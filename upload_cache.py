@@ -0,0 +1,133 @@
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+
+class UploadCache:
+    """Cache Parquet di disk untuk file unggahan, dikunci dengan hash konten file"""
+
+    def __init__(self, cache_dir=".upload_cache", max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def content_hash(data, variant=""):
+        """Menghitung hash SHA-256 dari isi file (dan varian cara baca)"""
+        digest = hashlib.sha256(data)
+        digest.update(variant.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def get(self, key):
+        """Mengambil DataFrame dari cache, atau None jika belum ada"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+        except Exception:
+            # File rusak/terpotong: buang dan anggap miss
+            self._remove(path)
+            return None
+        # Perbarui waktu akses untuk kebijakan LRU; file bisa saja baru dibuang
+        # eviksi proses/sesi lain, DataFrame yang sudah terbaca tetap dipakai
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return df
+
+    def put(self, key, df):
+        """Menyimpan DataFrame ke cache lalu menjalankan eviksi LRU.
+
+        Mengembalikan DataFrame sebagaimana tersimpan (kolom object bercampur
+        menjadi teks, sama dengan hasil get berikutnya), atau None bila gagal ditulis.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            try:
+                df.to_parquet(tmp_path, index=False)
+            except Exception:
+                # Kolom object bercampur (mis. SKU angka & teks) tidak bisa
+                # ditulis Arrow; samakan menjadi teks dengan tetap menjaga NaN
+                df = normalize_mixed_columns(df)
+                df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            return None
+        self.evict()
+        return df
+
+    def load(self, key, reader):
+        """Mengembalikan (DataFrame, dari_cache) untuk kunci hash konten tertentu.
+
+        Saat miss dikembalikan frame yang tersimpan, sehingga unggahan yang sama
+        menghasilkan tipe kolom yang sama dari cache maupun dari Excel.
+        """
+        df = self.get(key)
+        if df is not None:
+            return df, True
+        df = reader()
+        stored = self.put(key, df)
+        return (df if stored is None else stored), False
+
+    def evict(self):
+        """Menghapus entri yang paling lama tidak dipakai sampai ukuran cache di bawah batas"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Menghapus semua entri cache, mengembalikan jumlah file yang dihapus"""
+        entries = self._entries()
+        for path, _, _ in entries:
+            self._remove(path)
+        return len(entries)
+
+    def stats(self):
+        """Mengembalikan (jumlah entri, total ukuran dalam byte)"""
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".parquet"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def normalize_mixed_columns(df):
+    """Menyamakan kolom object bercampur menjadi teks (NaN tetap NaN) agar bisa ditulis Arrow"""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        df[col] = values.where(values.isna(), values.astype(str))
+    return df
@@ -0,0 +1,338 @@
+"""Gudang data lokal (SQLite) untuk baris pesanan & settlement lintas periode.
+
+Hasil process_data tiap periode di-upsert ke satu file SQLite, sehingga
+pertanyaan multi-bulan (tren bulanan, riwayat SKU) dijawab lewat kueri
+berindeks tanpa membaca ulang setahun file Excel. Upsert juga memperbarui
+tabel rollup harian (total per hari & per SKU per hari) untuk hari yang
+tersentuh; ringkasan bulanan, SKU teratas & statistik dibaca dari rollup,
+bukan memindai seluruh baris pesanan.
+
+Pemakaian:
+    store = Warehouse("income_warehouse.sqlite")
+    store.upsert(merged, app.aggregate_settlements(income_data))
+    store.monthly_summary(start="2024-01-01", end="2024-12-31")
+"""
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+DEFAULT_PATH = "income_warehouse.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_lines (
+    order_id TEXT NOT NULL,
+    line_no INTEGER NOT NULL,
+    seller_sku TEXT,
+    product_name TEXT,
+    variation TEXT,
+    quantity INTEGER,
+    order_time TEXT,
+    allocated_revenue REAL,
+    unit_cost REAL,
+    line_cost REAL,
+    cost_source TEXT,
+    PRIMARY KEY (order_id, line_no)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_order_lines_sku ON order_lines (seller_sku, order_time);
+CREATE INDEX IF NOT EXISTS idx_order_lines_time ON order_lines (order_time);
+CREATE TABLE IF NOT EXISTS settlements (
+    order_id TEXT PRIMARY KEY,
+    settlement_amount REAL,
+    settlement_rows INTEGER,
+    updated_at TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_sales (
+    day TEXT PRIMARY KEY,
+    lines INTEGER,
+    orders INTEGER,
+    quantity INTEGER,
+    revenue REAL,
+    cost REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_sku (
+    day TEXT NOT NULL,
+    seller_sku TEXT,
+    product_name TEXT,
+    orders INTEGER,
+    quantity INTEGER,
+    revenue REAL,
+    cost REAL
+);
+CREATE INDEX IF NOT EXISTS idx_daily_sku_day
+    ON daily_sku (day, seller_sku, product_name, quantity, revenue, cost);
+CREATE INDEX IF NOT EXISTS idx_daily_sku_sku ON daily_sku (seller_sku, day);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+) WITHOUT ROWID;
+"""
+
+# Rollup harian dari order_lines; hari '' menampung baris tanpa waktu pesanan.
+# Semua baris satu pesanan berwaktu sama, jadi jumlah pesanan per hari bisa dijumlahkan antar hari
+ROLLUP_SQL = {
+    'daily_sales': """
+        INSERT INTO daily_sales (day, lines, orders, quantity, revenue, cost)
+        SELECT COALESCE(substr(order_time, 1, 10), ''), COUNT(*), COUNT(DISTINCT order_id),
+               SUM(quantity), SUM(allocated_revenue), SUM(line_cost)
+        FROM order_lines WHERE {where}
+        GROUP BY 1
+    """,
+    'daily_sku': """
+        INSERT INTO daily_sku (day, seller_sku, product_name, orders, quantity, revenue, cost)
+        SELECT COALESCE(substr(order_time, 1, 10), ''), seller_sku, MAX(product_name), COUNT(DISTINCT order_id),
+               SUM(quantity), SUM(allocated_revenue), SUM(line_cost)
+        FROM order_lines WHERE {where}
+        GROUP BY 1, seller_sku
+    """
+}
+
+# Kolom merged -> kolom tabel order_lines (kolom yang tidak ada diisi NULL)
+LINE_COLUMNS = {
+    'Order ID': 'order_id',
+    'Seller SKU': 'seller_sku',
+    'Product Name': 'product_name',
+    'Variation': 'variation',
+    'Quantity': 'quantity',
+    'Order Time': 'order_time',
+    'Allocated Revenue': 'allocated_revenue',
+    'Unit Cost': 'unit_cost',
+    'Line Cost': 'line_cost',
+    'Cost Source': 'cost_source'
+}
+TABLE_LINE_COLUMNS = ['order_id', 'line_no', *list(LINE_COLUMNS.values())[1:]]
+
+# Waktu disimpan sebagai teks ISO agar urutan teks = urutan waktu (indeks rentang tanggal)
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class Warehouse:
+    """Penyimpanan SQLite untuk baris pesanan hasil proses & settlement per Order ID"""
+
+    def __init__(self, path=DEFAULT_PATH, timeout=60):
+        self.path = path
+        self.timeout = timeout
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+            conn.execute("BEGIN IMMEDIATE")
+            # Gudang lama belum punya rollup: dibangun sekali dari order_lines
+            has_lines, has_rollup = conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM order_lines), EXISTS (SELECT 1 FROM daily_sales)"
+            ).fetchone()
+            if has_lines and not has_rollup:
+                self._refresh_rollups(conn, "1", ())
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        # WAL: pembaca (dasbor) tidak terblokir saat periode lain sedang ditulis
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Cache halaman 64 MB: upsert ratusan ribu baris menyentuh banyak halaman indeks
+        conn.execute("PRAGMA cache_size=-65536")
+        return conn
+
+    def upsert(self, merged, settlements=None):
+        """Menyimpan baris pesanan (& settlement) satu periode; mengembalikan jumlah baris pesanan.
+
+        Baris pesanan diganti per Order ID (jumlah baris item suatu pesanan bisa
+        berubah antar ekspor), settlement di-upsert per Order ID. Rollup harian
+        dihitung ulang untuk hari baris lama & baru, dan versi gudang dinaikkan.
+        """
+        lines = self._line_rows(merged)
+        order_ids = dict.fromkeys(row[0] for row in lines)
+        time_index = TABLE_LINE_COLUMNS.index('order_time')
+        new_times = [row[time_index] for row in lines if row[time_index] is not None]
+        with closing(self._connect()) as conn, conn:
+            # Kunci tulis diambil di awal: transaksi DEFERRED yang membaca lalu menulis gagal
+            # langsung (SQLITE_BUSY, tanpa menunggu timeout) bila pekerja lain menulis lebih dulu
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (order_id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM incoming")
+            conn.executemany("INSERT OR IGNORE INTO incoming VALUES (?)", ((order_id,) for order_id in order_ids))
+            # Hari yang tersentuh: hari baris lama pesanan yang diganti & hari baris baru
+            old_first, old_last, old_undated = conn.execute(
+                "SELECT MIN(order_time), MAX(order_time), COUNT(*) - COUNT(order_time) FROM order_lines "
+                "WHERE order_id IN (SELECT order_id FROM incoming)"
+            ).fetchone()
+            conn.execute("DELETE FROM order_lines WHERE order_id IN (SELECT order_id FROM incoming)")
+            conn.executemany(
+                f"INSERT INTO order_lines ({', '.join(TABLE_LINE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(TABLE_LINE_COLUMNS))})",
+                lines
+            )
+            dated = [time for time in (old_first, old_last, min(new_times, default=None),
+                                       max(new_times, default=None)) if time is not None]
+            if dated:
+                first, last = min(dated)[:10], max(dated)[:10]
+                end = (pd.Timestamp(last) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+                self._refresh_rollups(conn, "order_time >= ? AND order_time < ?", (first, end),
+                                      "day >= ? AND day < ?")
+            if old_undated or len(new_times) < len(lines):
+                self._refresh_rollups(conn, "order_time IS NULL", (), "day = ''")
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('version', 1) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+            )
+            if settlements is not None:
+                conn.executemany(
+                    """
+                    INSERT INTO settlements (order_id, settlement_amount, settlement_rows, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (order_id) DO UPDATE SET
+                        settlement_amount = excluded.settlement_amount,
+                        settlement_rows = excluded.settlement_rows,
+                        updated_at = excluded.updated_at
+                    """,
+                    self._settlement_rows(settlements)
+                )
+        return len(lines)
+
+    def version(self):
+        """Penghitung perubahan gudang (naik setiap upsert); kunci cache hasil kueri"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _refresh_rollups(conn, line_filter, params, day_filter="1"):
+        """Menghitung ulang rollup harian untuk baris order_lines yang cocok `line_filter`"""
+        for table, sql in ROLLUP_SQL.items():
+            conn.execute(f"DELETE FROM {table} WHERE {day_filter}", params)
+            conn.execute(sql.format(where=line_filter), params)
+
+    def _line_rows(self, merged):
+        """Baris (order_id, line_no, ...) dengan nilai Python biasa untuk executemany"""
+        columns = {
+            'order_id': _column_values(merged['Order ID'].astype(str)),
+            'line_no': merged.groupby('Order ID', sort=False, observed=True).cumcount().tolist()
+        }
+        for source, target in list(LINE_COLUMNS.items())[1:]:
+            if source not in merged.columns:
+                columns[target] = [None] * len(merged)
+            elif source == 'Order Time':
+                columns[target] = _column_values(merged[source].dt.strftime(TIME_FORMAT))
+            else:
+                columns[target] = _column_values(merged[source])
+        return list(zip(*columns.values()))
+
+    def _settlement_rows(self, settlements):
+        updated_at = datetime.now().strftime(TIME_FORMAT)
+        rows = zip(
+            _column_values(settlements['Order/adjustment ID'].astype(str)),
+            _column_values(settlements['Total settlement amount']),
+            _column_values(settlements['Settlement Rows']) if 'Settlement Rows' in settlements.columns
+            else [1] * len(settlements),
+        )
+        return [(*row, updated_at) for row in rows]
+
+    def query(self, sql, params=()):
+        """Menjalankan kueri baca dan mengembalikan DataFrame"""
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def monthly_summary(self, start=None, end=None, sku=None):
+        """Pesanan, kuantitas, pendapatan, biaya & profit per bulan (opsional untuk satu SKU)"""
+        where, params = _day_filters(start, end, sku)
+        summary = self.query(
+            f"""
+            SELECT NULLIF(substr(day, 1, 7), '') AS Month,
+                   SUM(orders) AS Orders,
+                   SUM(quantity) AS Quantity,
+                   SUM(revenue) AS Revenue,
+                   SUM(cost) AS "Total Cost"
+            FROM {'daily_sku' if sku is not None else 'daily_sales'} {where}
+            GROUP BY substr(day, 1, 7)
+            ORDER BY Month
+            """,
+            params
+        )
+        summary['Profit'] = summary['Revenue'] - summary['Total Cost']
+        return summary
+
+    def top_skus(self, start=None, end=None, limit=20):
+        """SKU dengan pendapatan terbesar dalam rentang tanggal"""
+        where, params = _day_filters(start, end)
+        summary = self.query(
+            f"""
+            SELECT seller_sku AS "Seller SKU",
+                   MAX(product_name) AS "Product Name",
+                   SUM(quantity) AS "Total Quantity",
+                   SUM(revenue) AS "Total Revenue",
+                   SUM(cost) AS "Total Cost"
+            FROM daily_sku {where}
+            GROUP BY seller_sku
+            ORDER BY "Total Revenue" DESC
+            LIMIT ?
+            """,
+            (*params, int(limit))
+        )
+        summary['Profit'] = summary['Total Revenue'] - summary['Total Cost']
+        return summary
+
+    def lines(self, start=None, end=None, sku=None, limit=None):
+        """Baris pesanan tersimpan (diurutkan menurut waktu pesanan)"""
+        where, params = _filters(start, end, sku)
+        sql = f"SELECT * FROM order_lines {where} ORDER BY order_time, order_id, line_no"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (*params, int(limit))
+        return self.query(sql, params)
+
+    def stats(self):
+        """Jumlah baris & pesanan, rentang tanggal (hari) dan ukuran file gudang"""
+        with closing(self._connect()) as conn:
+            lines, orders, first, last = conn.execute(
+                "SELECT SUM(lines), SUM(orders), MIN(NULLIF(day, '')), MAX(NULLIF(day, '')) FROM daily_sales"
+            ).fetchone()
+            settlements = conn.execute("SELECT COUNT(*) FROM settlements").fetchone()[0]
+        size = sum(
+            os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path)
+        )
+        return {
+            'lines': lines or 0,
+            'orders': orders or 0,
+            'settlements': settlements,
+            'first_order': first,
+            'last_order': last,
+            'bytes': size
+        }
+
+
+def _column_values(series):
+    """Nilai kolom sebagai list objek Python (NaN/NA -> None) untuk sqlite3"""
+    values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
+
+
+def _filters(start=None, end=None, sku=None):
+    """Klausa WHERE untuk rentang tanggal (inklusif) & SKU, memakai indeks order_time/seller_sku"""
+    clauses, params = [], []
+    if sku is not None:
+        clauses.append("seller_sku = ?")
+        params.append(str(sku))
+    if start is not None:
+        clauses.append("order_time >= ?")
+        params.append(pd.Timestamp(start).strftime(TIME_FORMAT))
+    if end is not None:
+        clauses.append("order_time < ?")
+        params.append((pd.Timestamp(end).normalize() + pd.Timedelta(days=1)).strftime(TIME_FORMAT))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, tuple(params)
+
+
+def _day_filters(start=None, end=None, sku=None):
+    """Klausa WHERE rollup harian untuk rentang tanggal (inklusif) & SKU"""
+    clauses, params = [], []
+    if sku is not None:
+        clauses.append("seller_sku = ?")
+        params.append(str(sku))
+    if start is not None:
+        clauses.append("day >= ?")
+        params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+    if end is not None:
+        clauses.append("day < ?")
+        params.append((pd.Timestamp(end).normalize() + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, tuple(params)